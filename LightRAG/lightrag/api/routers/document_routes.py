@@ -3,6 +3,7 @@ This module contains all document-related routes for the LightRAG API.
 """
 
 import asyncio
+import json
 from lightrag.utils import logger, get_pinyin_sort_key
 import aiofiles
 import shutil
@@ -17,13 +18,19 @@ from fastapi import (
     Depends,
     File,
     HTTPException,
+    Request,
     UploadFile,
 )
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 
 from lightrag import LightRAG
 from lightrag.base import DeletionResult, DocProcessingStatus, DocStatus
-from lightrag.utils import generate_track_id
+from lightrag.utils import (
+    compute_mdhash_id,
+    generate_track_id,
+    sanitize_text_for_encoding,
+)
 from lightrag.api.utils_api import get_combined_auth_dependency
 from ..config import global_args
 
@@ -61,6 +68,14 @@ router = APIRouter(
 # Temporary file prefix
 temp_prefix = "__tmp__"
 
+# Seconds between in-process status checks for /track_status/{track_id}/stream,
+# and between keep-alive comments while nothing changes
+TRACK_STATUS_STREAM_INTERVAL = 0.2
+TRACK_STATUS_STREAM_KEEPALIVE = 15.0
+# Seconds a track_id may stay without documents before the stream completes empty;
+# content that was already indexed is never recorded under the new track_id
+TRACK_STATUS_STREAM_EMPTY_GRACE = 5.0
+
 
 def sanitize_filename(filename: str, input_dir: Path) -> str:
     """
@@ -207,6 +222,26 @@ class InsertTextsRequest(BaseModel):
         }
 
 
+class ExistingDocument(BaseModel):
+    """A submitted text whose content is already stored
+
+    Attributes:
+        doc_id: ID of the stored document
+        track_id: Tracking ID the stored document was inserted under
+        status: Processing status of the stored document
+        file_source: Source given for the text in this request, if any
+    """
+
+    doc_id: str = Field(description="ID of the stored document")
+    track_id: str = Field(
+        description="Tracking ID the stored document was inserted under"
+    )
+    status: str = Field(description="Processing status of the stored document")
+    file_source: Optional[str] = Field(
+        default=None, description="Source given for the text in this request"
+    )
+
+
 class InsertResponse(BaseModel):
     """Response model for document insertion operations
 
@@ -214,6 +249,7 @@ class InsertResponse(BaseModel):
         status: Status of the operation (success, duplicated, partial_success, failure)
         message: Detailed message describing the operation result
         track_id: Tracking ID for monitoring processing status
+        existing_documents: Submitted texts that were already stored and are not re-inserted
     """
 
     status: Literal["success", "duplicated", "partial_success", "failure"] = Field(
@@ -221,6 +257,10 @@ class InsertResponse(BaseModel):
     )
     message: str = Field(description="Message describing the operation result")
     track_id: str = Field(description="Tracking ID for monitoring processing status")
+    existing_documents: Optional[List[ExistingDocument]] = Field(
+        default=None,
+        description="Submitted texts that were already stored, with their document and tracking IDs",
+    )
 
     class Config:
         json_schema_extra = {
@@ -1669,6 +1709,27 @@ def create_document_routes(
             HTTPException: If an error occurs during text processing (500).
         """
         try:
+            # Identical content is skipped by the pipeline and never recorded under a
+            # new track_id, so hand back the existing document's track_id instead
+            doc_id = compute_mdhash_id(
+                sanitize_text_for_encoding(request.text), prefix="doc-"
+            )
+            existing_doc = await rag.doc_status.get_by_id(doc_id)
+            if existing_doc and existing_doc.get("track_id"):
+                return InsertResponse(
+                    status="duplicated",
+                    message=f"Text already exists as document {doc_id}.",
+                    track_id=existing_doc["track_id"],
+                    existing_documents=[
+                        ExistingDocument(
+                            doc_id=doc_id,
+                            track_id=existing_doc["track_id"],
+                            status=str(existing_doc.get("status")),
+                            file_source=request.file_source,
+                        )
+                    ],
+                )
+
             # Generate track_id for text insertion
             track_id = generate_track_id("insert")
 
@@ -1715,21 +1776,68 @@ def create_document_routes(
             HTTPException: If an error occurs during text processing (500).
         """
         try:
+            # As in /text, identical content is not re-inserted; report the stored
+            # documents so they are not waited for under the new track_id
+            file_sources = request.file_sources or []
+            doc_ids = [
+                compute_mdhash_id(sanitize_text_for_encoding(text), prefix="doc-")
+                for text in request.texts
+            ]
+            # get_by_ids drops missing IDs in some backends, so look up one by one
+            existing_docs = await asyncio.gather(
+                *(rag.doc_status.get_by_id(doc_id) for doc_id in doc_ids)
+            )
+            texts = []
+            new_file_sources = []
+            existing_documents = []
+            for index, (text, doc_id, existing_doc) in enumerate(
+                zip(request.texts, doc_ids, existing_docs)
+            ):
+                file_source = file_sources[index] if index < len(file_sources) else None
+                if existing_doc and existing_doc.get("track_id"):
+                    existing_documents.append(
+                        ExistingDocument(
+                            doc_id=doc_id,
+                            track_id=existing_doc["track_id"],
+                            status=str(existing_doc.get("status")),
+                            file_source=file_source,
+                        )
+                    )
+                else:
+                    texts.append(text)
+                    new_file_sources.append(
+                        file_source if file_source is not None else "unknown_source"
+                    )
+
+            if not texts:
+                return InsertResponse(
+                    status="duplicated",
+                    message=f"All {len(existing_documents)} texts already exist.",
+                    track_id=existing_documents[0].track_id,
+                    existing_documents=existing_documents,
+                )
+
             # Generate track_id for texts insertion
             track_id = generate_track_id("insert")
 
             background_tasks.add_task(
                 pipeline_index_texts,
                 rag,
-                request.texts,
-                file_sources=request.file_sources,
+                texts,
+                file_sources=new_file_sources if file_sources else request.file_sources,
                 track_id=track_id,
             )
 
+            message = (
+                "Texts successfully received. Processing will continue in background."
+            )
+            if existing_documents:
+                message = f"{len(texts)} texts received, {len(existing_documents)} already exist. Processing will continue in background."
             return InsertResponse(
                 status="success",
-                message="Texts successfully received. Processing will continue in background.",
+                message=message,
                 track_id=track_id,
+                existing_documents=existing_documents or None,
             )
         except Exception as e:
             logger.error(f"Error /documents/texts: {str(e)}")
@@ -2343,6 +2451,107 @@ def create_document_routes(
             logger.error(traceback.format_exc())
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.get(
+        "/track_status/{track_id}/stream",
+        dependencies=[Depends(combined_auth)],
+    )
+    async def stream_track_status(track_id: str, request: Request):
+        """
+        Stream processing status changes for a tracking ID as server-sent events.
+
+        A `status` event carrying the status summary is sent whenever the documents
+        under the track_id change state, followed by a single `complete` event once
+        every document is processed or failed; the stream then closes. A track_id that
+        has no documents after TRACK_STATUS_STREAM_EMPTY_GRACE seconds (for example a
+        duplicate insert) completes with an empty `documents` list. Document status
+        is watched in-process, so clients learn about completion within
+        TRACK_STATUS_STREAM_INTERVAL seconds without polling over HTTP.
+
+        Args:
+            track_id (str): The tracking ID returned from upload, text, or texts endpoints
+            request (Request): The incoming request, used to detect client disconnects
+
+        Returns:
+            StreamingResponse: A text/event-stream response
+
+        Raises:
+            HTTPException: If track_id is invalid (400).
+        """
+        if not track_id or not track_id.strip():
+            raise HTTPException(status_code=400, detail="Track ID cannot be empty")
+        track_id = track_id.strip()
+
+        async def event_generator():
+            last_summary = None
+            idle_time = 0.0
+            elapsed = 0.0
+            while not await request.is_disconnected():
+                docs_by_track_id = await rag.aget_docs_by_track_id(track_id)
+                status_summary = {}
+                for doc_status in docs_by_track_id.values():
+                    status_key = str(doc_status.status)
+                    status_summary[status_key] = status_summary.get(status_key, 0) + 1
+
+                if status_summary != last_summary:
+                    last_summary = status_summary
+                    idle_time = 0.0
+                    payload = {
+                        "track_id": track_id,
+                        "total_count": len(docs_by_track_id),
+                        "status_summary": status_summary,
+                    }
+                    yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+
+                    finished = docs_by_track_id and all(
+                        doc_status.status in (DocStatus.PROCESSED, DocStatus.FAILED)
+                        for doc_status in docs_by_track_id.values()
+                    )
+                    if finished:
+                        payload["documents"] = [
+                            {
+                                "id": doc_id,
+                                "file_path": doc_status.file_path,
+                                "status": doc_status.status,
+                            }
+                            for doc_id, doc_status in docs_by_track_id.items()
+                        ]
+                        payload["errors"] = {
+                            doc_id: doc_status.error_msg
+                            for doc_id, doc_status in docs_by_track_id.items()
+                            if doc_status.status == DocStatus.FAILED
+                        }
+                        yield f"event: complete\ndata: {json.dumps(payload)}\n\n"
+                        return
+                elif (
+                    not docs_by_track_id and elapsed >= TRACK_STATUS_STREAM_EMPTY_GRACE
+                ):
+                    payload = {
+                        "track_id": track_id,
+                        "total_count": 0,
+                        "status_summary": {},
+                        "documents": [],
+                        "errors": {},
+                    }
+                    yield f"event: complete\ndata: {json.dumps(payload)}\n\n"
+                    return
+                elif idle_time >= TRACK_STATUS_STREAM_KEEPALIVE:
+                    idle_time = 0.0
+                    yield ": keep-alive\n\n"
+
+                await asyncio.sleep(TRACK_STATUS_STREAM_INTERVAL)
+                idle_time += TRACK_STATUS_STREAM_INTERVAL
+                elapsed += TRACK_STATUS_STREAM_INTERVAL
+
+        return StreamingResponse(
+            event_generator(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Accel-Buffering": "no",  # Ensure proper handling of streaming response when proxied by Nginx
+            },
+        )
+
     @router.post(
         "/paginated",
         response_model=PaginatedDocsResponse,
@@ -0,0 +1,637 @@
+import asyncio
+import base64
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, final
+
+import numpy as np
+
+from lightrag.utils import (
+    logger,
+    compute_mdhash_id,
+)
+
+from lightrag.base import BaseVectorStorage
+from .shared_storage import (
+    get_storage_lock,
+    get_update_flag,
+    set_all_update_flags,
+)
+
+_DTYPES = {"float16": np.float16, "float32": np.float32}
+# Rewrite both files once dead rows exceed this share of the matrix
+_COMPACT_DEAD_RATIO = 0.25
+_COMPACT_MIN_DEAD_ROWS = 1024
+# Rows scored or copied per step, bounds the float32 scratch memory
+_CHUNK_ROWS = 65536
+
+
+def _dumps(record: Any) -> bytes:
+    return (
+        json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    ).encode("utf-8")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+@final
+@dataclass
+class MmapVectorDBStorage(BaseVectorStorage):
+    """Vector storage over a memory-mapped matrix file.
+
+    Normalized vectors are kept as one contiguous float16/float32 matrix in
+    vdb_<namespace>.<generation>.matrix, mapped read-only with numpy.memmap, so
+    loading costs no decoding and a batch of vectors is a single fancy-index.
+    Metadata lives in vdb_<namespace>.meta.jsonl: a header line naming the matrix
+    file, then one line per matrix row and lines listing deleted rows.
+
+    Both files are append-only between compactions: index_done_callback appends
+    the new rows and records, and other processes reload by reading only what
+    was appended. Once enough rows are dead both files are rewritten under a new
+    generation. An existing NanoVectorDB vdb_<namespace>.json is imported on
+    first start.
+    """
+
+    def __post_init__(self):
+        # Use global config value if specified, otherwise use default
+        kwargs = self.global_config.get("vector_db_storage_cls_kwargs", {})
+        cosine_threshold = kwargs.get("cosine_better_than_threshold")
+        if cosine_threshold is None:
+            raise ValueError(
+                "cosine_better_than_threshold must be specified in vector_db_storage_cls_kwargs"
+            )
+        self.cosine_better_than_threshold = cosine_threshold
+
+        # Precision of newly created matrix files; existing files keep theirs
+        dtype_name = kwargs.get("vector_dtype", "float32")
+        if dtype_name not in _DTYPES:
+            raise ValueError(
+                f"vector_dtype must be one of {sorted(_DTYPES)}, got {dtype_name}"
+            )
+        self._default_dtype = np.dtype(_DTYPES[dtype_name])
+
+        working_dir = self.global_config["working_dir"]
+        if self.workspace:
+            # Include workspace in the file path for data isolation
+            workspace_dir = os.path.join(working_dir, self.workspace)
+            self.final_namespace = f"{self.workspace}_{self.namespace}"
+        else:
+            # Default behavior when workspace is empty
+            self.final_namespace = self.namespace
+            self.workspace = "_"
+            workspace_dir = working_dir
+
+        os.makedirs(workspace_dir, exist_ok=True)
+        self._workspace_dir = workspace_dir
+        self._meta_file = os.path.join(
+            workspace_dir, f"vdb_{self.namespace}.meta.jsonl"
+        )
+        self._legacy_file = os.path.join(workspace_dir, f"vdb_{self.namespace}.json")
+
+        self._max_batch_size = self.global_config["embedding_batch_num"]
+        self._dim = self.embedding_func.embedding_dim
+
+        self._storage_lock = None
+        self.storage_updated = None
+        self._reset()
+
+    def _reset(self):
+        # Matrix file of the current generation, None until the first write
+        self._matrix_name = None
+        self._dtype = self._default_dtype
+        self._matrix = np.empty((0, self._dim), dtype=self._dtype)
+        # Rows appended since the last write, held in memory
+        self._tail = np.empty((0, self._dim), dtype=self._dtype)
+        # Metadata per row, None for dead rows
+        self._rows: list[dict[str, Any] | None] = []
+        self._live = np.zeros(0, dtype=bool)
+        self._id_to_row: dict[str, int] = {}
+        # Persisted rows deleted since the last write
+        self._deleted: list[int] = []
+        self._meta_offset = 0
+
+    @property
+    def _persisted_rows(self) -> int:
+        return len(self._matrix)
+
+    def _is_dirty(self) -> bool:
+        return len(self._tail) > 0 or bool(self._deleted)
+
+    async def initialize(self):
+        """Initialize storage data"""
+        # Get the update flag for cross-process update notification
+        self.storage_updated = await get_update_flag(self.final_namespace)
+        # Get the storage lock for use in other methods
+        self._storage_lock = get_storage_lock(enable_logging=False)
+        async with self._storage_lock:
+            if not os.path.exists(self._meta_file) and os.path.exists(
+                self._legacy_file
+            ):
+                await asyncio.to_thread(self._import_legacy)
+            else:
+                self._load()
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} loaded {len(self._id_to_row)} vectors for {self.namespace}"
+        )
+
+    def _map(self, name: str | None, rows: int) -> np.ndarray:
+        if not rows:
+            return np.empty((0, self._dim), dtype=self._dtype)
+        return np.memmap(
+            os.path.join(self._workspace_dir, name),
+            dtype=self._dtype,
+            mode="r",
+            shape=(rows, self._dim),
+        )
+
+    def _load(self):
+        """Read the files, appending to the loaded state when they only grew"""
+        if not os.path.exists(self._meta_file):
+            self._reset()
+            return
+        with open(self._meta_file, "rb") as f:
+            header = json.loads(f.readline())
+            if header["matrix"] != self._matrix_name or self._is_dirty():
+                # New generation, or local changes to discard: start over
+                self._reset()
+                self._meta_offset = f.tell()
+            else:
+                f.seek(self._meta_offset)
+            lines = f.read()
+
+        if header["embedding_dim"] != self._dim:
+            raise ValueError(
+                f"Embedding dim mismatch for {self.namespace}, expected: {self._dim}, but loaded: {header['embedding_dim']}"
+            )
+        self._matrix_name = header["matrix"]
+        self._dtype = np.dtype(header["dtype"])
+
+        # A record cut short by a crashed writer is dropped and overwritten
+        complete = lines[: lines.rfind(b"\n") + 1]
+        self._meta_offset += len(complete)
+        first_new_row = len(self._rows)
+        for line in complete.splitlines():
+            record = json.loads(line)
+            if record is not None and "__deleted__" in record:
+                for row in record["__deleted__"]:
+                    self._kill(row)
+                self._deleted.clear()
+            else:
+                self._append_row(record)
+
+        matrix_path = os.path.join(self._workspace_dir, self._matrix_name)
+        row_bytes = self._dim * self._dtype.itemsize
+        available = os.path.getsize(matrix_path) // row_bytes
+        if available < len(self._rows):
+            logger.warning(
+                f"[{self.workspace}] {self.namespace} has {len(self._rows)} rows of metadata but {available} vectors, ignoring the rest"
+            )
+            for row in range(available, len(self._rows)):
+                self._kill(row)
+            del self._rows[available:]
+        self._live = np.concatenate(
+            [
+                self._live[:first_new_row],
+                np.array(
+                    [meta is not None for meta in self._rows[first_new_row:]],
+                    dtype=bool,
+                ),
+            ]
+        )
+        self._deleted.clear()
+        self._matrix = self._map(self._matrix_name, len(self._rows))
+        self._tail = np.empty((0, self._dim), dtype=self._dtype)
+
+    def _import_legacy(self):
+        """Carry over the vectors of a NanoVectorDBStorage namespace"""
+        with open(self._legacy_file, encoding="utf-8") as f:
+            storage = json.load(f)
+        if storage["embedding_dim"] != self._dim:
+            raise ValueError(
+                f"Embedding dim mismatch for {self.namespace}, expected: {self._dim}, but loaded: {storage['embedding_dim']}"
+            )
+        matrix = np.frombuffer(
+            base64.b64decode(storage["matrix"]), dtype=np.float32
+        ).reshape(-1, self._dim)
+        rows = [
+            {k: v for k, v in dp.items() if k != "vector"} for dp in storage["data"]
+        ]
+        self._write_generation(rows, [_normalize(matrix)])
+        self._reset()
+        self._load()
+        logger.info(
+            f"[{self.workspace}] Imported {len(rows)} vectors into {self.namespace} from {self._legacy_file}"
+        )
+
+    def _append_row(self, meta: dict[str, Any] | None):
+        row = len(self._rows)
+        self._rows.append(meta)
+        if meta is not None:
+            previous = self._id_to_row.get(meta["__id__"])
+            if previous is not None:
+                self._kill(previous)
+            self._id_to_row[meta["__id__"]] = row
+
+    def _kill(self, row: int):
+        meta = self._rows[row]
+        if meta is None:
+            return
+        self._rows[row] = None
+        if row < len(self._live):
+            self._live[row] = False
+        if self._id_to_row.get(meta["__id__"]) == row:
+            del self._id_to_row[meta["__id__"]]
+        if row < self._persisted_rows:
+            self._deleted.append(row)
+
+    def _check_updated(self):
+        """Pick up changes written by another process; caller holds the storage lock"""
+        if self.storage_updated.value:
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} reloading {self.namespace} due to update by another process"
+            )
+            self._load()
+            # Reset update flag
+            self.storage_updated.value = False
+
+    async def _refresh(self):
+        async with self._storage_lock:
+            self._check_updated()
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+        """
+        if not data:
+            return
+
+        current_time = int(time.time())
+        list_data = [
+            {
+                "__id__": k,
+                "__created_at__": current_time,
+                **{k1: v1 for k1, v1 in v.items() if k1 in self.meta_fields},
+            }
+            for k, v in data.items()
+        ]
+        contents = [v["content"] for v in data.values()]
+        batches = [
+            contents[i : i + self._max_batch_size]
+            for i in range(0, len(contents), self._max_batch_size)
+        ]
+
+        # Execute embedding outside of lock to avoid long lock times
+        embedding_tasks = [self.embedding_func(batch) for batch in batches]
+        embeddings_list = await asyncio.gather(*embedding_tasks)
+
+        embeddings = np.concatenate(embeddings_list)
+        if len(embeddings) != len(list_data):
+            # sometimes the embedding is not returned correctly. just log it.
+            logger.error(
+                f"[{self.workspace}] embedding is not 1-1 with data, {len(embeddings)} != {len(list_data)}"
+            )
+            return
+
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        async with self._storage_lock:
+            self._check_updated()
+            for meta in list_data:
+                self._append_row(meta)
+            self._tail = np.concatenate([self._tail, vectors.astype(self._dtype)])
+            self._live = np.concatenate(
+                [self._live, np.ones(len(list_data), dtype=bool)]
+            )
+
+    def _scores(self, embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row, dead rows included"""
+        scores = []
+        for block in (self._matrix, self._tail):
+            for start in range(0, len(block), _CHUNK_ROWS):
+                chunk = block[start : start + _CHUNK_ROWS]
+                scores.append(chunk.astype(np.float32, copy=False) @ embedding)
+        if not scores:
+            return np.empty(0, dtype=np.float32)
+        return np.concatenate(scores)
+
+    async def query(
+        self, query: str, top_k: int, query_embedding: list[float] = None
+    ) -> list[dict[str, Any]]:
+        # Use provided embedding or compute it
+        if query_embedding is not None:
+            embedding = query_embedding
+        else:
+            # Execute embedding outside of lock to avoid improve cocurrent
+            embedding = await self.embedding_func(
+                [query], _priority=5
+            )  # higher priority for query
+            embedding = embedding[0]
+
+        await self._refresh()
+        embedding = _normalize(np.asarray(embedding, dtype=np.float32))
+        scores = self._scores(embedding)
+        scores[~self._live] = -np.inf
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for row in top:
+            score = float(scores[row])
+            if score < self.cosine_better_than_threshold:
+                break
+            meta = self._rows[row]
+            results.append(
+                {
+                    **meta,
+                    "id": meta["__id__"],
+                    "distance": score,
+                    "created_at": meta.get("__created_at__"),
+                }
+            )
+        return results
+
+    @property
+    async def client_storage(self):
+        await self._refresh()
+        return {"data": [meta for meta in self._rows if meta is not None]}
+
+    async def delete(self, ids: list[str]):
+        """Delete vectors with specified IDs
+
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+
+        Args:
+            ids: List of vector IDs to be deleted
+        """
+        async with self._storage_lock:
+            self._check_updated()
+            for id in ids:
+                row = self._id_to_row.get(id)
+                if row is not None:
+                    self._kill(row)
+        logger.debug(
+            f"[{self.workspace}] Successfully deleted {len(ids)} vectors from {self.namespace}"
+        )
+
+    async def delete_entity(self, entity_name: str) -> None:
+        """
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+        """
+        entity_id = compute_mdhash_id(entity_name, prefix="ent-")
+        logger.debug(
+            f"[{self.workspace}] Attempting to delete entity {entity_name} with ID {entity_id}"
+        )
+        await self.delete([entity_id])
+
+    async def delete_entity_relation(self, entity_name: str) -> None:
+        """
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+        """
+        async with self._storage_lock:
+            self._check_updated()
+            relations = [
+                row
+                for row, meta in enumerate(self._rows)
+                if meta is not None
+                and (
+                    meta.get("src_id") == entity_name
+                    or meta.get("tgt_id") == entity_name
+                )
+            ]
+            for row in relations:
+                self._kill(row)
+        logger.debug(
+            f"[{self.workspace}] Deleted {len(relations)} relations for {entity_name}"
+        )
+
+    async def index_done_callback(self) -> bool:
+        """Append new rows and records to disk, compacting when many rows are dead"""
+        async with self._storage_lock:
+            # Check if storage was updated by another process
+            if self.storage_updated.value:
+                # Storage was updated by another process, reload data instead of saving
+                logger.warning(
+                    f"[{self.workspace}] Storage for {self.namespace} was updated by another process, reloading..."
+                )
+                self._load()
+                # Reset update flag
+                self.storage_updated.value = False
+                return False  # Return error
+
+            if not self._is_dirty():
+                return True
+
+            try:
+                dead_rows = len(self._rows) - len(self._id_to_row)
+                if self._matrix_name is None or (
+                    dead_rows >= _COMPACT_MIN_DEAD_ROWS
+                    and dead_rows > len(self._rows) * _COMPACT_DEAD_RATIO
+                ):
+                    await asyncio.to_thread(self._compact)
+                    self._reset()
+                    self._load()
+                else:
+                    self._meta_offset = await asyncio.to_thread(self._append)
+                    self._matrix = self._map(self._matrix_name, len(self._rows))
+                    self._tail = self._tail[:0]
+                    self._deleted = []
+                # Notify other processes that data has been updated
+                await set_all_update_flags(self.final_namespace)
+                # Reset own update flag to avoid self-reloading
+                self.storage_updated.value = False
+                return True  # Return success
+            except Exception as e:
+                logger.error(
+                    f"[{self.workspace}] Error saving data for {self.namespace}: {e}"
+                )
+                return False  # Return error
+
+    def _append(self) -> int:
+        """Append the tail rows and their records to the current generation"""
+        row_bytes = self._dim * self._dtype.itemsize
+        matrix_path = os.path.join(self._workspace_dir, self._matrix_name)
+        with open(matrix_path, "r+b") as f:
+            # Drop anything a crashed writer left past the last complete write
+            f.truncate(self._persisted_rows * row_bytes)
+            f.seek(0, os.SEEK_END)
+            f.write(np.ascontiguousarray(self._tail).tobytes())
+
+        records = []
+        if self._deleted:
+            records.append(_dumps({"__deleted__": self._deleted}))
+        records.extend(_dumps(meta) for meta in self._rows[self._persisted_rows :])
+        with open(self._meta_file, "r+b") as f:
+            f.truncate(self._meta_offset)
+            f.seek(0, os.SEEK_END)
+            f.write(b"".join(records))
+            return f.tell()
+
+    def _compact(self):
+        """Write the live rows to a new generation"""
+        live = np.flatnonzero(self._live)
+        persisted = self._persisted_rows
+        in_matrix = live[live < persisted]
+        in_tail = live[live >= persisted] - persisted
+
+        def blocks():
+            for start in range(0, len(in_matrix), _CHUNK_ROWS):
+                yield self._matrix[in_matrix[start : start + _CHUNK_ROWS]]
+            yield self._tail[in_tail]
+
+        self._write_generation([self._rows[row] for row in live], blocks())
+
+    def _write_generation(self, rows: list[dict[str, Any]], blocks):
+        """Write a new matrix file and switch the metadata file over to it"""
+        previous = self._matrix_name
+        name = f"vdb_{self.namespace}.{time.time_ns():x}.matrix"
+        with open(os.path.join(self._workspace_dir, name), "wb") as f:
+            for block in blocks:
+                f.write(np.ascontiguousarray(block, dtype=self._dtype).tobytes())
+
+        header = {"embedding_dim": self._dim, "dtype": self._dtype.name, "matrix": name}
+        tmp_file = self._meta_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(_dumps(header))
+            for meta in rows:
+                f.write(_dumps(meta))
+        os.replace(tmp_file, self._meta_file)
+        if previous is not None:
+            self._remove_matrix(previous)
+
+    def _remove_matrix(self, name: str):
+        """Delete an unused matrix file; failing to only leaves a stray file behind"""
+        try:
+            os.remove(os.path.join(self._workspace_dir, name))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(
+                f"[{self.workspace}] Could not remove old vector matrix {name}: {e}"
+            )
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        """Get vector data by its ID
+
+        Args:
+            id: The unique identifier of the vector
+
+        Returns:
+            The vector data if found, or None if not found
+        """
+        results = await self.get_by_ids([id])
+        return results[0] if results else None
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        """Get multiple vector data by their IDs
+
+        Args:
+            ids: List of unique identifiers
+
+        Returns:
+            List of vector data objects that were found
+        """
+        if not ids:
+            return []
+
+        await self._refresh()
+        results = []
+        for id in ids:
+            row = self._id_to_row.get(id)
+            if row is not None:
+                meta = self._rows[row]
+                results.append(
+                    {
+                        **meta,
+                        "id": meta["__id__"],
+                        "created_at": meta.get("__created_at__"),
+                    }
+                )
+        return results
+
+    async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
+        """Get vectors by their IDs, returning only ID and vector data for efficiency
+
+        Vectors are returned normalized to unit length.
+
+        Args:
+            ids: List of unique identifiers
+
+        Returns:
+            Dictionary mapping IDs to their vector embeddings
+            Format: {id: [vector_values], ...}
+        """
+        if not ids:
+            return {}
+
+        await self._refresh()
+        found = [id for id in ids if id in self._id_to_row]
+        rows = np.fromiter(
+            (self._id_to_row[id] for id in found), dtype=np.int64, count=len(found)
+        )
+        in_matrix = rows < self._persisted_rows
+        if in_matrix.all():
+            vectors = self._matrix[rows].astype(np.float32)
+        else:
+            vectors = np.empty((len(rows), self._dim), dtype=np.float32)
+            vectors[in_matrix] = self._matrix[rows[in_matrix]]
+            vectors[~in_matrix] = self._tail[rows[~in_matrix] - self._persisted_rows]
+        return dict(zip(found, vectors.tolist()))
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all vector data from storage and clean up resources
+
+        This method will:
+        1. Remove the metadata and matrix files if they exist
+        2. Reset the in-memory state
+        3. Update flags to notify other processes
+        4. Changes is persisted to disk immediately
+
+        This method is intended for use in scenarios where all data needs to be removed,
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+        try:
+            async with self._storage_lock:
+                self._check_updated()
+                matrix_name = self._matrix_name
+                if os.path.exists(self._meta_file):
+                    os.remove(self._meta_file)
+                if matrix_name is not None:
+                    self._remove_matrix(matrix_name)
+                self._reset()
+
+                # Notify other processes that data has been updated
+                await set_all_update_flags(self.final_namespace)
+                # Reset own update flag to avoid self-reloading
+                self.storage_updated.value = False
+
+                logger.info(
+                    f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}(file:{self._meta_file})"
+                )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
@@ -0,0 +1,419 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, final
+
+from lightrag.base import (
+    BaseKVStorage,
+)
+from lightrag.utils import (
+    generate_cache_key,
+    load_json,
+    logger,
+)
+from lightrag.exceptions import StorageNotInitializedError
+
+# Marks a key deleted in the dirty buffer until the next flush
+_DELETED = object()
+# SQLite's default limit on host parameters per statement is 999
+_MAX_QUERY_PARAMS = 500
+# Compact once free pages exceed this share of the file
+_COMPACT_FREE_RATIO = 0.25
+_COMPACT_MIN_FREE_PAGES = 256
+
+
+@final
+@dataclass
+class SqliteKVStorage(BaseKVStorage):
+    """KV storage backed by an embedded SQLite database per namespace.
+
+    Records are read on demand instead of being loaded at startup. Upserts and
+    deletes are buffered and index_done_callback writes only the dirty keys in
+    one transaction, so a pipeline batch costs O(changed records) of disk I/O
+    rather than a rewrite of the whole namespace. Space freed by overwrites and
+    deletes is reclaimed by an incremental vacuum in a background thread; every
+    SQLite call runs in a worker thread so the event loop never waits on it.
+
+    Committed records are visible to every process opening the same database;
+    buffered changes are visible to the writing process until they are flushed.
+    An existing kv_store_<namespace>.json is imported on first start.
+    """
+
+    def __post_init__(self):
+        working_dir = self.global_config["working_dir"]
+        if self.workspace:
+            # Include workspace in the file path for data isolation
+            workspace_dir = os.path.join(working_dir, self.workspace)
+            self.final_namespace = f"{self.workspace}_{self.namespace}"
+        else:
+            # Default behavior when workspace is empty
+            workspace_dir = working_dir
+            self.final_namespace = self.namespace
+            self.workspace = "_"
+
+        os.makedirs(workspace_dir, exist_ok=True)
+        self._file_name = os.path.join(
+            workspace_dir, f"kv_store_{self.namespace}.sqlite"
+        )
+        self._json_file_name = os.path.join(
+            workspace_dir, f"kv_store_{self.namespace}.json"
+        )
+
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        self._storage_lock = None
+        # Changes not yet written, and changes being written by a running flush
+        self._dirty: dict[str, Any] = {}
+        self._flushing: dict[str, Any] = {}
+        self._compaction_task = None
+
+    async def initialize(self):
+        """Open the database; records are loaded lazily"""
+        if self._conn is not None:
+            return
+        self._storage_lock = asyncio.Lock()
+        self._conn = await asyncio.to_thread(self._open)
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} KV opened {self.namespace} at {self._file_name}"
+        )
+
+    def _open(self) -> sqlite3.Connection:
+        is_new = not os.path.exists(self._file_name)
+        conn = sqlite3.connect(self._file_name, check_same_thread=False)
+        if is_new:
+            # Must be set before the first table is created
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        conn.commit()
+        if is_new and os.path.exists(self._json_file_name):
+            self._import_json(conn)
+        return conn
+
+    def _import_json(self, conn: sqlite3.Connection):
+        """Carry over the records of a JsonKVStorage namespace"""
+        loaded_data = load_json(self._json_file_name) or {}
+        if self.namespace.endswith("_cache"):
+            loaded_data = self._migrate_legacy_cache_structure(loaded_data)
+        conn.executemany(
+            "INSERT OR REPLACE INTO kv (id, data) VALUES (?, ?)",
+            ((key, self._encode(value)) for key, value in loaded_data.items()),
+        )
+        conn.commit()
+        logger.info(
+            f"[{self.workspace}] Imported {len(loaded_data)} records into {self.namespace} from {self._json_file_name}"
+        )
+
+    def _migrate_legacy_cache_structure(self, data: dict) -> dict:
+        """Flatten legacy {mode: {hash: entry}} caches as JsonKVStorage does on load"""
+        if not data:
+            return data
+        first_key = next(iter(data.keys()))
+        if ":" in first_key and len(first_key.split(":")) == 3:
+            return data
+
+        migrated_data = {}
+        migration_count = 0
+        for key, value in data.items():
+            if isinstance(value, dict) and all(
+                isinstance(v, dict) and "return" in v for v in value.values()
+            ):
+                for cache_hash, cache_entry in value.items():
+                    cache_type = cache_entry.get("cache_type", "extract")
+                    migrated_data[generate_cache_key(key, cache_type, cache_hash)] = (
+                        cache_entry
+                    )
+                    migration_count += 1
+            else:
+                migrated_data[key] = value
+
+        if migration_count > 0:
+            logger.info(
+                f"[{self.workspace}] Migrated {migration_count} legacy cache entries to flattened structure"
+            )
+        return migrated_data
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    def _select(self, sql: str, ids: list[str]) -> list[tuple]:
+        """Run a SELECT ... WHERE id IN (...) over ids in parameter-limited chunks"""
+        rows = []
+        with self._conn_lock:
+            for start in range(0, len(ids), _MAX_QUERY_PARAMS):
+                chunk = ids[start : start + _MAX_QUERY_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(self._conn.execute(sql.format(placeholders), chunk))
+        return rows
+
+    def _pending(self, id: str) -> Any:
+        """Buffered value for a key: a dict, _DELETED, or None when not buffered"""
+        if id in self._dirty:
+            return self._dirty[id]
+        return self._flushing.get(id)
+
+    async def _read(self, ids: list[str]) -> dict[str, Any]:
+        """Current values of the keys that exist, buffered changes first"""
+        if self._conn is None:
+            raise StorageNotInitializedError("SqliteKVStorage")
+        values = {}
+        missing = []
+        for id in ids:
+            pending = self._pending(id)
+            if pending is None:
+                missing.append(id)
+            elif pending is not _DELETED:
+                # Buffered dicts are live; hand out copies
+                values[id] = dict(pending)
+        if missing:
+            rows = await asyncio.to_thread(
+                self._select, "SELECT id, data FROM kv WHERE id IN ({})", missing
+            )
+            for id, data in rows:
+                values[id] = json.loads(data)
+        return values
+
+    @staticmethod
+    def _with_defaults(id: str, value: dict[str, Any]) -> dict[str, Any]:
+        # Ensure time fields are present, provide default values for old data
+        value.setdefault("create_time", 0)
+        value.setdefault("update_time", 0)
+        # Ensure _id field contains the clean ID
+        value["_id"] = id
+        return value
+
+    async def get_all(self) -> dict[str, Any]:
+        """Get all data from storage
+
+        Returns:
+            Dictionary containing all stored data
+        """
+        async with self._storage_lock:
+            rows = await asyncio.to_thread(self._select_all)
+            result = {id: json.loads(data) for id, data in rows}
+            for buffer in (self._flushing, self._dirty):
+                for id, value in buffer.items():
+                    if value is _DELETED:
+                        result.pop(id, None)
+                    else:
+                        result[id] = dict(value)
+            for value in result.values():
+                if value:
+                    value.setdefault("create_time", 0)
+                    value.setdefault("update_time", 0)
+            return result
+
+    def _select_all(self) -> list[tuple]:
+        with self._conn_lock:
+            return self._conn.execute("SELECT id, data FROM kv").fetchall()
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        async with self._storage_lock:
+            value = (await self._read([id])).get(id)
+            if value:
+                value = self._with_defaults(id, value)
+            return value
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        async with self._storage_lock:
+            values = await self._read(list(dict.fromkeys(ids)))
+            results = []
+            for id in ids:
+                value = values.get(id)
+                # Duplicate ids get their own copies
+                results.append(self._with_defaults(id, dict(value)) if value else None)
+            return results
+
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        async with self._storage_lock:
+            return set(keys) - await self._existing_keys(list(keys))
+
+    async def _existing_keys(self, ids: list[str]) -> set[str]:
+        existing = set()
+        missing = []
+        for id in ids:
+            pending = self._pending(id)
+            if pending is None:
+                missing.append(id)
+            elif pending is not _DELETED:
+                existing.add(id)
+        if missing:
+            rows = await asyncio.to_thread(
+                self._select, "SELECT id FROM kv WHERE id IN ({})", missing
+            )
+            existing.update(id for (id,) in rows)
+        return existing
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """
+        Importance notes:
+        1. Changes are buffered and written to SQLite during the next index_done_callback
+        2. Only the upserted keys are written
+        """
+        if not data:
+            return
+
+        current_time = int(time.time())  # Get current Unix timestamp
+
+        logger.debug(
+            f"[{self.workspace}] Inserting {len(data)} records to {self.namespace}"
+        )
+        if self._storage_lock is None:
+            raise StorageNotInitializedError("SqliteKVStorage")
+        async with self._storage_lock:
+            existing = await self._existing_keys(list(data))
+            # Add timestamps to data based on whether key exists
+            for k, v in data.items():
+                # For text_chunks namespace, ensure llm_cache_list field exists
+                if self.namespace.endswith("text_chunks"):
+                    if "llm_cache_list" not in v:
+                        v["llm_cache_list"] = []
+
+                # Add timestamps based on whether key exists
+                if k in existing:  # Key exists, only update update_time
+                    v["update_time"] = current_time
+                else:  # New key, set both create_time and update_time
+                    v["create_time"] = current_time
+                    v["update_time"] = current_time
+
+                v["_id"] = k
+
+            self._dirty.update(data)
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete specific records from storage by their IDs
+
+        Importance notes:
+        1. Deletions are buffered and written to SQLite during the next index_done_callback
+
+        Args:
+            ids (list[str]): List of document IDs to be deleted from storage
+
+        Returns:
+            None
+        """
+        async with self._storage_lock:
+            for doc_id in ids:
+                self._dirty[doc_id] = _DELETED
+
+    async def index_done_callback(self) -> None:
+        """Write the dirty keys in a single transaction"""
+        async with self._storage_lock:
+            if not self._dirty:
+                return
+            # Reads keep seeing these changes through _flushing until they are committed
+            self._flushing, self._dirty = self._dirty, {}
+            changes = self._flushing
+            try:
+                await asyncio.to_thread(self._write, changes)
+            except Exception:
+                # Keep the changes buffered for the next attempt
+                changes.update(self._dirty)
+                self._dirty = changes
+                raise
+            finally:
+                self._flushing = {}
+
+        logger.debug(
+            f"[{self.workspace}] Process {os.getpid()} KV wrote {len(changes)} changed records to {self.namespace}"
+        )
+        await self._schedule_compaction()
+
+    def _write(self, changes: dict[str, Any]):
+        upserts = [
+            (id, self._encode(value))
+            for id, value in changes.items()
+            if value is not _DELETED
+        ]
+        deletes = [(id,) for id, value in changes.items() if value is _DELETED]
+        with self._conn_lock:
+            try:
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO kv (id, data) VALUES (?, ?)", upserts
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM kv WHERE id = ?", deletes)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    async def _schedule_compaction(self):
+        if self._compaction_task is not None and not self._compaction_task.done():
+            return
+        free_pages, total_pages = await asyncio.to_thread(self._page_counts)
+        if self._compaction_task is not None and not self._compaction_task.done():
+            # Another flush scheduled one meanwhile
+            return
+        if (
+            free_pages >= _COMPACT_MIN_FREE_PAGES
+            and free_pages > total_pages * _COMPACT_FREE_RATIO
+        ):
+            self._compaction_task = asyncio.create_task(
+                asyncio.to_thread(self._compact)
+            )
+
+    def _page_counts(self) -> tuple[int, int]:
+        with self._conn_lock:
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            total_pages = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        return free_pages, total_pages
+
+    def _compact(self):
+        """Release free pages and fold the WAL back into the database file"""
+        with self._conn_lock:
+            # executescript steps the pragma to completion; execute() would
+            # free a single page
+            self._conn.executescript("PRAGMA incremental_vacuum;")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.debug(f"[{self.workspace}] Compacted {self._file_name}")
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all data from storage and clean up resources
+
+        This method will:
+        1. Discard buffered changes
+        2. Delete every record from the database and reclaim the space
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+        try:
+            async with self._storage_lock:
+                self._dirty.clear()
+                await asyncio.to_thread(self._delete_all)
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}"
+            )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def _delete_all(self):
+        with self._conn_lock:
+            self._conn.execute("DELETE FROM kv")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    async def finalize(self):
+        """Write buffered changes and close the database"""
+        if self._conn is None:
+            return
+        await self.index_done_callback()
+        if self._compaction_task is not None:
+            await self._compaction_task
+        with self._conn_lock:
+            self._conn.close()
+        self._conn = None
@@ -0,0 +1,262 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+
+import numpy as np
+import pytest
+
+from lightrag.kg import shared_storage
+from lightrag.kg.mmap_vector_db_impl import MmapVectorDBStorage
+
+DIM = 16
+
+
+class FakeEmbedding:
+    """Deterministic vector per text"""
+
+    embedding_dim = DIM
+
+    async def __call__(self, texts, **kwargs):
+        return np.stack([embed(text) for text in texts])
+
+
+def embed(text):
+    seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+    return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+@pytest.fixture(autouse=True)
+def share_data():
+    shared_storage.initialize_share_data(1)
+    yield
+    shared_storage.finalize_share_data()
+
+
+def make_storage(working_dir, namespace="chunks", **kwargs):
+    return MmapVectorDBStorage(
+        namespace=namespace,
+        workspace="",
+        global_config={
+            "working_dir": str(working_dir),
+            "embedding_batch_num": 32,
+            "vector_db_storage_cls_kwargs": {
+                "cosine_better_than_threshold": 0.2,
+                **kwargs,
+            },
+        },
+        embedding_func=FakeEmbedding(),
+        meta_fields={"content", "src_id", "tgt_id"},
+    )
+
+
+async def open_storage(working_dir, namespace="chunks", **kwargs):
+    storage = make_storage(working_dir, namespace, **kwargs)
+    await storage.initialize()
+    return storage
+
+
+def records(count, prefix="id"):
+    return {f"{prefix}{i}": {"content": f"text {prefix}{i}"} for i in range(count)}
+
+
+def meta_lines(storage):
+    with open(storage._meta_file, "rb") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_writes_append_rows_and_deleted_records(tmp_path):
+    async def run():
+        storage = await open_storage(tmp_path)
+        await storage.upsert(records(10))
+        assert await storage.index_done_callback()
+        matrix_name = storage._matrix_name
+
+        await storage.delete(["id2"])
+        await storage.upsert({"id1": {"content": "updated"}})
+        assert await storage.index_done_callback()
+        assert storage._matrix_name == matrix_name
+        return storage
+
+    storage = asyncio.run(run())
+    lines = meta_lines(storage)
+    assert lines[0]["matrix"] == storage._matrix_name
+    assert [line["__id__"] for line in lines[1:11]] == [f"id{i}" for i in range(10)]
+    # Deleting id2 and replacing id1 kills rows 2 and 1
+    assert sorted(lines[11]["__deleted__"]) == [1, 2]
+    assert lines[12]["__id__"] == "id1" and lines[12]["content"] == "updated"
+    matrix_path = os.path.join(str(tmp_path), storage._matrix_name)
+    assert os.path.getsize(matrix_path) == 11 * DIM * 4
+
+
+def test_second_instance_reloads_only_appended_records(tmp_path):
+    async def run():
+        writer = await open_storage(tmp_path)
+        reader = await open_storage(tmp_path)
+        await writer.upsert(records(100))
+        assert await writer.index_done_callback()
+        assert (await reader.query("text id7", 1))[0]["id"] == "id7"
+        offset = reader._meta_offset
+
+        await writer.upsert({"id1": {"content": "text id7"}})
+        await writer.delete(["id2"])
+        assert await writer.index_done_callback()
+        results = await reader.query("text id7", 2)
+        assert {result["id"] for result in results} == {"id1", "id7"}
+        assert reader._meta_offset > offset
+        assert await reader.get_by_id("id2") is None
+        assert len(reader._id_to_row) == 99
+        vectors = await reader.get_vectors_by_ids(["id7", "id1", "missing"])
+        assert set(vectors) == {"id7", "id1"}
+        assert np.allclose(vectors["id7"], vectors["id1"], atol=1e-6)
+
+    asyncio.run(run())
+
+
+def test_dirty_instance_reloads_instead_of_overwriting(tmp_path):
+    async def run():
+        writer = await open_storage(tmp_path)
+        other = await open_storage(tmp_path)
+        await other.upsert({"local": {"content": "local"}})
+        await writer.upsert({"remote": {"content": "remote"}})
+        assert await writer.index_done_callback()
+
+        assert not await other.index_done_callback()
+        assert "local" not in other._id_to_row
+        assert "remote" in other._id_to_row
+
+    asyncio.run(run())
+
+
+def test_entity_relations_are_deleted(tmp_path):
+    async def run():
+        storage = await open_storage(tmp_path)
+        await storage.upsert(
+            {
+                "r1": {"content": "E to F", "src_id": "E", "tgt_id": "F"},
+                "r2": {"content": "G to H", "src_id": "G", "tgt_id": "H"},
+            }
+        )
+        await storage.delete_entity_relation("F")
+        return await storage.get_by_id("r1"), await storage.get_by_id("r2")
+
+    deleted, kept = asyncio.run(run())
+    assert deleted is None
+    assert kept["src_id"] == "G"
+
+
+def test_compaction_switches_to_a_new_generation(tmp_path):
+    async def run():
+        writer = await open_storage(tmp_path)
+        reader = await open_storage(tmp_path)
+        await writer.upsert(records(3000, "big"))
+        assert await writer.index_done_callback()
+        old_matrix = writer._matrix_name
+
+        await writer.delete([f"big{i}" for i in range(2000)])
+        assert await writer.index_done_callback()
+        assert writer._matrix_name != old_matrix
+        assert len(writer._rows) == len(writer._id_to_row) == 1000
+        assert not os.path.exists(os.path.join(str(tmp_path), old_matrix))
+        assert len(meta_lines(writer)) == 1001
+
+        assert (await reader.query("text big2500", 1))[0]["id"] == "big2500"
+        assert reader._matrix_name == writer._matrix_name
+        assert len(reader._rows) == 1000
+
+    asyncio.run(run())
+
+
+def test_failed_removal_of_old_matrix_is_not_fatal(tmp_path, monkeypatch):
+    async def run():
+        storage = await open_storage(tmp_path)
+        await storage.upsert(records(3000))
+        assert await storage.index_done_callback()
+        old_matrix = storage._matrix_name
+
+        def fail(path):
+            raise PermissionError(path)
+
+        monkeypatch.setattr(os, "remove", fail)
+        await storage.delete([f"id{i}" for i in range(2000)])
+        assert await storage.index_done_callback()
+        monkeypatch.undo()
+        assert storage._matrix_name != old_matrix
+        assert len(storage._id_to_row) == 1000
+
+    asyncio.run(run())
+
+
+def test_torn_tail_of_a_crashed_write_is_dropped(tmp_path):
+    async def run():
+        storage = await open_storage(tmp_path)
+        await storage.upsert(records(20))
+        assert await storage.index_done_callback()
+        with open(storage._meta_file, "ab") as f:
+            f.write(b'{"__id__":"broken')
+        with open(os.path.join(str(tmp_path), storage._matrix_name), "ab") as f:
+            f.write(b"\0" * 100)
+
+        recovered = await open_storage(tmp_path)
+        assert len(recovered._id_to_row) == 20
+        await recovered.upsert({"after": {"content": "after crash"}})
+        assert await recovered.index_done_callback()
+
+        reopened = await open_storage(tmp_path)
+        assert len(reopened._id_to_row) == 21
+        assert (await reopened.query("after crash", 1))[0]["id"] == "after"
+
+    asyncio.run(run())
+
+
+def test_nano_vectordb_file_is_imported(tmp_path):
+    vectors = np.stack([embed("e1"), embed("e2")])
+    legacy = {
+        "embedding_dim": DIM,
+        "data": [
+            {"__id__": "e1", "__created_at__": 1, "content": "e1", "vector": "xxx"},
+            {"__id__": "e2", "__created_at__": 2, "content": "e2"},
+        ],
+        "matrix": base64.b64encode(vectors.tobytes()).decode(),
+    }
+    (tmp_path / "vdb_entities.json").write_text(json.dumps(legacy))
+
+    async def run():
+        storage = await open_storage(tmp_path, "entities")
+        return await storage.query("e2", 1)
+
+    results = asyncio.run(run())
+    assert results[0]["id"] == "e2"
+    assert results[0]["distance"] == pytest.approx(1, abs=1e-5)
+    assert "vector" not in results[0]
+
+
+def test_float16_matrix(tmp_path):
+    async def run():
+        storage = await open_storage(tmp_path, "f16", vector_dtype="float16")
+        await storage.upsert(records(5))
+        assert await storage.index_done_callback()
+
+        # The file keeps its precision whatever the configured default
+        reopened = await open_storage(tmp_path, "f16")
+        assert reopened._dtype == np.float16
+        return await reopened.query("text id3", 1), reopened
+
+    results, reopened = asyncio.run(run())
+    assert results[0]["id"] == "id3"
+    assert results[0]["distance"] == pytest.approx(1, abs=1e-2)
+    matrix_path = os.path.join(str(tmp_path), reopened._matrix_name)
+    assert os.path.getsize(matrix_path) == 5 * DIM * 2
+
+
+def test_drop_removes_files(tmp_path):
+    async def run():
+        storage = await open_storage(tmp_path)
+        await storage.upsert(records(5))
+        assert await storage.index_done_callback()
+        assert (await storage.drop())["status"] == "success"
+        return await storage.query("text id1", 5)
+
+    assert asyncio.run(run()) == []
+    assert not any(name.startswith("vdb_chunks") for name in os.listdir(tmp_path))
@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+import pytest
+
+from lightrag.kg.sqlite_kv_impl import SqliteKVStorage
+from lightrag.utils import generate_cache_key
+
+
+def make_storage(working_dir, namespace="text_chunks"):
+    return SqliteKVStorage(
+        namespace=namespace,
+        workspace="",
+        global_config={"working_dir": str(working_dir)},
+        embedding_func=None,
+    )
+
+
+async def open_storage(working_dir, namespace="text_chunks"):
+    storage = make_storage(working_dir, namespace)
+    await storage.initialize()
+    return storage
+
+
+def test_changes_are_buffered_until_flush(tmp_path):
+    async def run():
+        writer = await open_storage(tmp_path)
+        reader = await open_storage(tmp_path)
+        await writer.upsert({"a": {"content": "first"}, "b": {"content": "second"}})
+
+        # Visible to the writer at once, to other connections after the flush
+        assert (await writer.get_by_id("a"))["content"] == "first"
+        assert await writer.filter_keys({"a", "c"}) == {"c"}
+        assert await reader.get_by_id("a") is None
+        await writer.index_done_callback()
+        assert (await reader.get_by_id("a"))["content"] == "first"
+
+        await writer.delete(["a"])
+        assert await writer.get_by_id("a") is None
+        assert await reader.get_by_id("a") is not None
+        await writer.index_done_callback()
+        assert [
+            value and value["content"]
+            for value in await reader.get_by_ids(["a", "b", "b"])
+        ] == [
+            None,
+            "second",
+            "second",
+        ]
+        await writer.finalize()
+        await reader.finalize()
+
+    asyncio.run(run())
+
+
+def test_upsert_sets_timestamps_and_chunk_fields(tmp_path):
+    async def run():
+        storage = await open_storage(tmp_path)
+        await storage.upsert({"a": {"content": "first"}})
+        await storage.index_done_callback()
+        created = (await storage.get_by_id("a"))["create_time"]
+        await storage.upsert({"a": {"content": "second"}})
+        value = await storage.get_by_id("a")
+        await storage.finalize()
+        return created, value
+
+    created, value = asyncio.run(run())
+    assert created > 0
+    assert value["update_time"] >= created
+    assert value["llm_cache_list"] == []
+    assert value["_id"] == "a"
+
+
+def test_failed_flush_keeps_changes_for_the_next_attempt(tmp_path, monkeypatch):
+    async def run():
+        storage = await open_storage(tmp_path)
+        await storage.upsert({"a": {"content": "first"}})
+        write = storage._write
+
+        def fail(changes):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(storage, "_write", fail)
+        with pytest.raises(OSError):
+            await storage.index_done_callback()
+        assert (await storage.get_by_id("a"))["content"] == "first"
+
+        monkeypatch.setattr(storage, "_write", write)
+        await storage.upsert({"b": {"content": "second"}})
+        await storage.index_done_callback()
+        await storage.finalize()
+
+        reopened = await open_storage(tmp_path)
+        records = await reopened.get_all()
+        await reopened.finalize()
+        return records
+
+    records = asyncio.run(run())
+    assert {key: value["content"] for key, value in records.items()} == {
+        "a": "first",
+        "b": "second",
+    }
+
+
+def test_reopen_sees_flushed_records_and_drop(tmp_path):
+    async def run():
+        storage = await open_storage(tmp_path)
+        await storage.upsert({f"k{i}": {"content": str(i)} for i in range(1200)})
+        # finalize flushes what is still buffered
+        await storage.finalize()
+
+        reopened = await open_storage(tmp_path)
+        values = await reopened.get_by_ids([f"k{i}" for i in range(1200)])
+        assert [value["content"] for value in values] == [str(i) for i in range(1200)]
+        assert (await reopened.drop())["status"] == "success"
+        await reopened.finalize()
+
+        dropped = await open_storage(tmp_path)
+        records = await dropped.get_all()
+        await dropped.finalize()
+        return records
+
+    assert asyncio.run(run()) == {}
+
+
+def test_json_namespace_is_imported_on_first_start(tmp_path):
+    records = {"a": {"content": "legacy", "create_time": 1, "update_time": 2}}
+    (tmp_path / "kv_store_text_chunks.json").write_text(json.dumps(records))
+
+    async def run():
+        storage = await open_storage(tmp_path)
+        value = await storage.get_by_id("a")
+        await storage.finalize()
+        return value
+
+    assert asyncio.run(run()) == {**records["a"], "_id": "a"}
+
+
+def test_legacy_cache_is_flattened_on_import(tmp_path):
+    legacy = {
+        "default": {
+            "hash1": {"return": "extracted", "cache_type": "extract"},
+            "hash2": {"return": "answer", "cache_type": "query"},
+        }
+    }
+    (tmp_path / "kv_store_llm_response_cache.json").write_text(json.dumps(legacy))
+
+    async def run():
+        storage = await open_storage(tmp_path, "llm_response_cache")
+        records = await storage.get_all()
+        await storage.finalize()
+        return records
+
+    records = asyncio.run(run())
+    assert set(records) == {
+        generate_cache_key("default", "extract", "hash1"),
+        generate_cache_key("default", "query", "hash2"),
+    }
+    assert records["default:extract:hash1"]["return"] == "extracted"
@@ -1,7 +1,9 @@
-from fastapi import FastAPI, Request, HTTPException, Depends, status
+from fastapi import FastAPI, Request, HTTPException, Depends, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 import uvicorn
 from pydantic import BaseModel
 import blockchain
@@ -11,26 +13,542 @@ import os
 from datetime import datetime, timedelta
 import jwt
 import hashlib
-from typing import Optional, Dict, List
+import hmac
+from typing import Optional, Dict, List, Iterator, Iterable, Tuple, AsyncIterator, Callable, Awaitable
 import asyncio
 import aiohttp
+import zlib
+import sqlite3
+import bisect
+import threading
+import random
+import uuid
+import re
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # JWT Configuration
 JWT_SECRET = "your-secret-key-change-in-production"
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_TIME = timedelta(hours=24)
 
+# Deployment: with API_WORKERS > 1, uvicorn runs several worker processes that
+# share the block log, contracts, users and analysis jobs through their files
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+SHARED_STATE = API_WORKERS > 1
+
+# Persistent block log (set BLOCKCHAIN_LOG_PATH to an empty string for an in-memory chain)
+BLOCKCHAIN_LOG_PATH = os.getenv("BLOCKCHAIN_LOG_PATH", os.path.join(os.getcwd(), "data", "blockchain.log"))
+BLOCKCHAIN_LOG_SYNC_EVERY = int(os.getenv("BLOCKCHAIN_LOG_SYNC_EVERY", "1"))
+BLOCKCHAIN_LOG_SYNC_INTERVAL = float(os.getenv("BLOCKCHAIN_LOG_SYNC_INTERVAL", "1.0"))
+
+def create_blockchain():
+    """Open the persistent chain, or an in-memory one when no log path is configured"""
+    if not BLOCKCHAIN_LOG_PATH:
+        return blockchain.Blockchain()
+    os.makedirs(os.path.dirname(BLOCKCHAIN_LOG_PATH) or ".", exist_ok=True)
+    return blockchain.Blockchain(BLOCKCHAIN_LOG_PATH, BLOCKCHAIN_LOG_SYNC_EVERY, SHARED_STATE)
+
 # Create blockchain instance using C++ module
-chain = blockchain.Blockchain()
+chain = create_blockchain()
+
+# Background chain audit configuration (seconds between full audits, 0 disables)
+BLOCKCHAIN_AUDIT_INTERVAL = int(os.getenv("BLOCKCHAIN_AUDIT_INTERVAL", "300"))
+BLOCKCHAIN_AUDIT_SLICE = int(os.getenv("BLOCKCHAIN_AUDIT_SLICE", "10000"))
+
+# Metrics, exposed in OpenMetrics text format on /metrics
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def render_metric_labels(names: Tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+class Histogram:
+    """Latency histogram (seconds) per label set. Observations land in one
+    bucket each; buckets are made cumulative when rendered."""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> per-bucket counts (last one +Inf) followed by the sum
+        self.series: Dict[tuple, List[float]] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float, *labels):
+        position = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            counts = self.series.get(labels)
+            if counts is None:
+                counts = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[position] += 1
+            counts[-1] += seconds
+
+    @contextmanager
+    def time(self, *labels):
+        """Observe the duration of the with-block, including awaits inside it"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} histogram", f"# UNIT {self.name} seconds", f"# HELP {self.name} {self.documentation}"]
+        with self.lock:
+            series = sorted((labels, list(counts)) for labels, counts in self.series.items())
+        for labels, counts in series:
+            total = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                total += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{render_metric_labels(self.label_names + ('le',), labels + (le,))} {total}")
+            label_text = render_metric_labels(self.label_names, labels)
+            lines.append(f"{self.name}_count{label_text} {total}")
+            lines.append(f"{self.name}_sum{label_text} {counts[-1]}")
+        return lines
+
+class Gauge:
+    """Gauge per label set, either tracked with inc/dec or read from a callback
+    returning {label values: value} at render time"""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                 callback: Optional[Callable[[], Dict[tuple, float]]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.callback = callback
+        self.values: Dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track(self, *labels):
+        """Count the with-block as in flight"""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} gauge", f"# HELP {self.name} {self.documentation}"]
+        if self.callback is not None:
+            values = self.callback()
+        else:
+            with self.lock:
+                values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{render_metric_labels(self.label_names, labels)} {value}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: List = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+http_request_seconds = metrics.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template and status code.", ("method", "route", "status")))
+http_requests_in_flight = metrics.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled.", ("method",)))
+lightrag_phase_seconds = metrics.register(Histogram(
+    "lightrag_phase_duration_seconds", "LightRAG call latency by phase (insert, wait for indexing, query).", ("phase",)))
+lightrag_in_flight = metrics.register(Gauge(
+    "lightrag_in_flight", "LightRAG calls currently outstanding, by phase.", ("phase",)))
+blockchain_call_seconds = metrics.register(Histogram(
+    "blockchain_call_duration_seconds", "Latency of calls into the C++ blockchain module.", ("call",)))
+metrics.register(Gauge("blockchain_blocks", "Blocks in the chain.", callback=lambda: {(): chain.getChainSize()}))
+
+# Contract repository (set CONTRACTS_DB_PATH to an empty string for an in-memory store)
+CONTRACTS_DB_PATH = os.getenv("CONTRACTS_DB_PATH", os.path.join(os.getcwd(), "data", "contracts.db"))
+
+class ContractConflictError(Exception):
+    """A contract was saved by another worker since it was read"""
+
+class ContractRepository:
+    """Contract store with the dict interface of the old contracts_db, backed by
+    SQLite in WAL mode and kept in memory with secondary indexes.
+    
+    Contracts are returned as live dicts; after mutating one in place, assign it
+    back (contracts_db[contract_id] = contract) to persist it and refresh the
+    indexes. Each index maps a key to contract sequence numbers in creation order,
+    so listings cost O(result) and page by contract ID.
+    
+    Every write stamps the row with a store-wide version, so refresh() can pull
+    in just the rows other processes changed, and a save over a row that changed
+    underneath raises ContractConflictError instead of losing the other write.
+    """
+
+    def __init__(self, path: str):
+        self.path = path or ":memory:"
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS contracts ("
+            "seq INTEGER PRIMARY KEY, contract_id TEXT UNIQUE NOT NULL, uploader_company TEXT, "
+            "other_company TEXT, uploader TEXT, status TEXT, created_at TEXT, data TEXT NOT NULL)"
+        )
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(contracts)")}
+        if "version" not in columns:
+            self.connection.execute("ALTER TABLE contracts ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS contracts_version ON contracts (version)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.connection.commit()
+        self.contracts: Dict[str, Dict] = {}
+        self.seqs: Dict[str, int] = {}
+        self.ids_by_seq: Dict[int, str] = {}
+        self.versions: Dict[str, int] = {}
+        self.indexed_keys: Dict[str, set] = {}
+        self.indexes: Dict[tuple, List[int]] = {}
+        self.loaded_version = 0
+        self.data_version = None
+        self.refreshed = 0
+        self.conflicts = 0
+        self.load()
+
+    def load(self):
+        """Rebuild the in-memory contracts and indexes from SQLite"""
+        with self.lock:
+            self.contracts.clear()
+            self.seqs.clear()
+            self.ids_by_seq.clear()
+            self.versions.clear()
+            self.indexed_keys.clear()
+            self.indexes.clear()
+            self.loaded_version = 0
+            self.data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            rows = self.connection.execute("SELECT seq, contract_id, version, data FROM contracts ORDER BY seq")
+            for seq, contract_id, version, data in rows:
+                self.apply(seq, contract_id, version, json.loads(data))
+
+    def apply(self, seq: int, contract_id: str, version: int, contract: Dict):
+        self.contracts[contract_id] = contract
+        self.seqs[contract_id] = seq
+        self.ids_by_seq[seq] = contract_id
+        self.versions[contract_id] = version
+        self.loaded_version = max(self.loaded_version, version)
+        self.index(contract_id)
+
+    def refresh(self) -> int:
+        """Load contracts other processes wrote since the last load or refresh;
+        returns how many changed. A single PRAGMA when nothing did."""
+        with self.lock:
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self.data_version:
+                return 0
+            self.data_version = data_version
+            changed = 0
+            rows = self.connection.execute(
+                "SELECT seq, contract_id, version, data FROM contracts WHERE version > ? ORDER BY version",
+                (self.loaded_version,)
+            ).fetchall()
+            for seq, contract_id, version, data in rows:
+                if self.versions.get(contract_id) == version:
+                    self.loaded_version = max(self.loaded_version, version)
+                    continue
+                self.apply(seq, contract_id, version, json.loads(data))
+                changed += 1
+            self.refreshed += changed
+            return changed
+
+    @staticmethod
+    def index_keys(contract: Dict) -> set:
+        companies = {contract.get("uploader_company"), contract.get("other_company")}
+        companies.discard(None)
+        contract_status = contract.get("status")
+        keys = {("uploader_status", contract.get("uploader"), contract_status)}
+        for company in companies:
+            keys.add(("company", company))
+            keys.add(("company_status", company, contract_status))
+        return keys
+
+    def index(self, contract_id: str):
+        """Move a contract between index entries to match its current fields"""
+        seq = self.seqs[contract_id]
+        keys = self.index_keys(self.contracts[contract_id])
+        previous = self.indexed_keys.get(contract_id, set())
+        for key in previous - keys:
+            entries = self.indexes[key]
+            del entries[bisect.bisect_left(entries, seq)]
+            if not entries:
+                del self.indexes[key]
+        for key in keys - previous:
+            bisect.insort(self.indexes.setdefault(key, []), seq)
+        self.indexed_keys[contract_id] = keys
+
+    def save(self, contract: Dict):
+        """Insert or update a contract, persisting it and refreshing its indexes.
+        Raises ContractConflictError if another process saved it since it was read."""
+        contract_id = contract["contract_id"]
+        fields = (contract.get("uploader_company"), contract.get("other_company"), contract.get("uploader"),
+                  contract.get("status"), contract.get("created_at"), json.dumps(contract))
+        next_version = "(SELECT COALESCE(MAX(version), 0) + 1 FROM contracts)"
+        with self.lock:
+            seq = self.seqs.get(contract_id)
+            if seq is None:
+                # SQLite picks the sequence number, so concurrent writers never collide
+                try:
+                    cursor = self.connection.execute(
+                        "INSERT INTO contracts (contract_id, uploader_company, other_company, uploader, status, created_at, data, version) "
+                        f"VALUES (?, ?, ?, ?, ?, ?, ?, {next_version})",
+                        (contract_id, *fields)
+                    )
+                except sqlite3.IntegrityError:
+                    self.connection.rollback()
+                    raise
+                seq = cursor.lastrowid
+            else:
+                cursor = self.connection.execute(
+                    "UPDATE contracts SET uploader_company = ?, other_company = ?, uploader = ?, status = ?, "
+                    f"created_at = ?, data = ?, version = {next_version} WHERE seq = ? AND version = ?",
+                    (*fields, seq, self.versions[contract_id])
+                )
+                if cursor.rowcount == 0:
+                    self.connection.rollback()
+                    self.conflicts += 1
+                    self.refresh()
+                    # The caller may have mutated the cached dict; reload the stored row
+                    seq, version, data = self.connection.execute(
+                        "SELECT seq, version, data FROM contracts WHERE contract_id = ?", (contract_id,)
+                    ).fetchone()
+                    self.apply(seq, contract_id, version, json.loads(data))
+                    raise ContractConflictError(f"Contract {contract_id} was modified concurrently")
+            version = self.connection.execute("SELECT version FROM contracts WHERE seq = ?", (seq,)).fetchone()[0]
+            self.connection.commit()
+            self.contracts[contract_id] = contract
+            self.seqs[contract_id] = seq
+            self.ids_by_seq[seq] = contract_id
+            self.versions[contract_id] = version
+            self.index(contract_id)
+
+    def recover_sealing(self, locate: Callable[[str], Optional[Tuple[int, int]]]) -> int:
+        """Settle contracts a crash left mid-seal: completed at the position locate
+        finds their transaction on chain, pending if it never got there. The result
+        is saved, so every worker sees it; returns how many were settled."""
+        with self.lock:
+            self.refresh()
+            sealing = [contract for contract in self.contracts.values() if contract.get("status") == "sealing"]
+            settled = 0
+            for contract in sealing:
+                contract = dict(contract)
+                position = locate(contract["contract_id"])
+                if position is None:
+                    contract["status"] = "pending"
+                else:
+                    contract["status"] = "completed"
+                    contract["blockchain_index"], contract["blockchain_tx_index"] = position
+                try:
+                    self.save(contract)
+                except ContractConflictError:
+                    # Another worker settled it first
+                    continue
+                settled += 1
+            return settled
+
+    def lookup(self, key: tuple, after: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Contracts under an index key in creation order, starting after a contract ID"""
+        with self.lock:
+            entries = self.indexes.get(key, [])
+            start = 0
+            if after is not None and after in self.seqs:
+                start = bisect.bisect_right(entries, self.seqs[after])
+            end = len(entries) if limit is None else min(len(entries), start + limit)
+            return [self.contracts[self.ids_by_seq[seq]] for seq in entries[start:end]]
+
+    def count(self, key: tuple) -> int:
+        return len(self.indexes.get(key, []))
+
+    def for_company(self, company: str, contract_status: Optional[str] = None,
+                    after: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Contracts involving a company (as uploader or counterparty), optionally by status"""
+        key = ("company", company) if contract_status is None else ("company_status", company, contract_status)
+        return self.lookup(key, after, limit)
+
+    def for_uploader(self, uploader: str, contract_status: str) -> List[Dict]:
+        return self.lookup(("uploader_status", uploader, contract_status))
+
+    def next_contract_number(self) -> int:
+        """Allocate the number for the next CONT_###### contract ID, atomically
+        across processes; the counter starts past the highest existing ID"""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute("SELECT value FROM counters WHERE name = 'contract'").fetchone()
+                if row is None:
+                    row = self.connection.execute(
+                        "SELECT COALESCE(MAX(CAST(substr(contract_id, 6) AS INTEGER)), 0) FROM contracts "
+                        "WHERE contract_id GLOB 'CONT_[0-9]*'"
+                    ).fetchone()
+                number = row[0] + 1
+                self.connection.execute("INSERT OR REPLACE INTO counters (name, value) VALUES ('contract', ?)", (number,))
+                self.connection.commit()
+            except BaseException:
+                self.connection.rollback()
+                raise
+            return number
+
+    def stats(self) -> Dict:
+        return {
+            "contracts": len(self.contracts),
+            "version": self.loaded_version,
+            "refreshed": self.refreshed,
+            "conflicts": self.conflicts,
+        }
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM contracts")
+            self.connection.execute("DELETE FROM counters")
+            self.connection.commit()
+            self.load()
+
+    def __contains__(self, contract_id: str) -> bool:
+        return contract_id in self.contracts
+
+    def __getitem__(self, contract_id: str) -> Dict:
+        return self.contracts[contract_id]
+
+    def __setitem__(self, contract_id: str, contract: Dict):
+        contract["contract_id"] = contract_id
+        self.save(contract)
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    def values(self):
+        return self.contracts.values()
+
+    def items(self):
+        return self.contracts.items()
+
+CONTRACTS_MAX_LIMIT = 500
+
+def contract_page(contracts: List[Dict], limit: Optional[int]) -> Tuple[List[Dict], Dict]:
+    """Trim a listing fetched with limit + 1 entries to one page and its pagination fields"""
+    if limit is None or len(contracts) <= limit:
+        return contracts, {"next_cursor": None, "has_more": False}
+    contracts = contracts[:limit]
+    return contracts, {"next_cursor": contracts[-1]["contract_id"], "has_more": True}
+
+def validate_contract_page_limit(limit: Optional[int]):
+    if limit is not None and (limit < 1 or limit > CONTRACTS_MAX_LIMIT):
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {CONTRACTS_MAX_LIMIT}")
+
+# User store (set USERS_DB_PATH to an empty string for an in-memory store)
+USERS_DB_PATH = os.getenv("USERS_DB_PATH", os.path.join(os.getcwd(), "data", "users.db"))
+
+class UserRepository:
+    """User store with the dict interface of the old users_db, backed by SQLite in
+    WAL mode and mirrored in memory. Like contracts, user dicts must be assigned
+    back (users_db[user_id] = user) after changing them. refresh() reloads the
+    mirror when another process has written since."""
+
+    def __init__(self, path: str):
+        self.path = path or ":memory:"
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS users (user_id TEXT PRIMARY KEY, company TEXT, data TEXT NOT NULL)"
+        )
+        self.connection.commit()
+        self.users: Dict[str, Dict] = {}
+        self.data_version = None
+        self.load()
+
+    def load(self):
+        with self.lock:
+            self.data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            self.users = {user_id: json.loads(data) for user_id, data in self.connection.execute("SELECT user_id, data FROM users")}
+
+    def refresh(self) -> bool:
+        """Reload the users if another process changed them"""
+        with self.lock:
+            if self.connection.execute("PRAGMA data_version").fetchone()[0] == self.data_version:
+                return False
+            self.load()
+            return True
+
+    def add(self, user: Dict) -> bool:
+        """Insert a user unless the ID is already taken (by any process)"""
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO users (user_id, company, data) VALUES (?, ?, ?)",
+                (user["user_id"], user.get("company"), json.dumps(user))
+            )
+            self.connection.commit()
+            if cursor.rowcount == 0:
+                self.refresh()
+                return False
+            self.users[user["user_id"]] = user
+            return True
+
+    def companies(self) -> List[str]:
+        with self.lock:
+            return sorted({user["company"] for user in self.users.values() if user.get("company")})
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.users
+
+    def __getitem__(self, user_id: str) -> Dict:
+        return self.users[user_id]
+
+    def __setitem__(self, user_id: str, user: Dict):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO users (user_id, company, data) VALUES (?, ?, ?)",
+                (user_id, user.get("company"), json.dumps(user))
+            )
+            self.connection.commit()
+            self.users[user_id] = user
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def values(self):
+        return self.users.values()
 
 # Security
 security = HTTPBearer()
 
-# In-memory storage for demo (replace with database in production)
-users_db: Dict[str, Dict] = {}
+users_db = UserRepository(USERS_DB_PATH)
 companies_db: List[str] = ["ABC Company", "XYZ Corporation", "Tech Solutions Inc", "ICAC"]
-contracts_db: Dict[str, Dict] = {}  # Store pending contracts
-contract_counter = 1
+contracts_db = ContractRepository(CONTRACTS_DB_PATH)
 
 # Authentication Models
 class UserRegister(BaseModel):
@@ -91,6 +609,7 @@ class WordAnalysisRequest(BaseModel):
     contract_id: str
     analysis_type: str = "sensitive_word_detection"  # Only sensitive word detection
     use_lightrag: bool = True
+    force_lightrag: bool = False  # Skip the local pre-screen and always ask LightRAG
     lightrag_api_url: str = "http://localhost:9621"
 
 class CorruptionAnalysisResult(BaseModel):
@@ -122,13 +641,22 @@ class WordAnalysisResult(BaseModel):
     recommendations: List[str]
     analysis_details: str
     analysis_timestamp: str
+    sensitive_words: List[Dict] = []  # {term, category, label, start, end, canonical, fuzzy, weight} within text_content
 
 class WordAnalysisResponse(BaseModel):
     success: bool
     message: str
-    analysis_type: str  # 'lightrag_advanced' or 'enhanced_rules'
+    analysis_type: str  # 'lightrag_advanced', 'local_prescreen' or 'enhanced_rules'
     word_analysis: Optional[WordAnalysisResult] = None
 
+class AnalysisJobRequest(BaseModel):
+    job_type: str  # 'corruption_analysis' or 'word_analysis'
+    contract_id: str
+    analysis_type: str = "sensitive_word_detection"
+    lightrag_api_url: str = "http://localhost:9621"
+    force_lightrag: bool = False
+    priority: int = 5  # 0 (most urgent) to 9
+
 class BatchCorruptionAnalysis(BaseModel):
     success: bool
     message: str
@@ -136,11 +664,1206 @@ class BatchCorruptionAnalysis(BaseModel):
     detailed_results: List[Dict]
     high_risk_contracts: List[Dict]
 
+# Blockchain audit helpers
+async def audit_blockchain(start: int = 0, end: Optional[int] = None) -> bool:
+    """Verify a range of blocks slice by slice in a worker thread
+    
+    verifyRange releases the GIL and only holds the chain's read lock while
+    hashing, so requests keep being served during an audit.
+    """
+    if end is None:
+        end = chain.getChainSize()
+    for slice_start in range(start, end, BLOCKCHAIN_AUDIT_SLICE):
+        slice_end = min(slice_start + BLOCKCHAIN_AUDIT_SLICE, end)
+        with blockchain_call_seconds.time("verifyRange"):
+            valid = await asyncio.to_thread(chain.verifyRange, slice_start, slice_end)
+        if not valid:
+            print(f"[BLOCKCHAIN AUDIT] Verification failed in blocks {slice_start}-{slice_end - 1}")
+            return False
+    return True
+
+async def periodic_blockchain_audit():
+    """Periodically re-verify the whole chain behind the incremental watermark
+    
+    A prefix loaded from the log without verification is audited right away.
+    """
+    validated_from = chain.getValidatedFrom()
+    if validated_from > 0:
+        try:
+            is_valid = await audit_blockchain(0, validated_from)
+            print(f"[BLOCKCHAIN AUDIT] Audit of blocks loaded unverified completed: valid={is_valid}, blocks={validated_from}")
+        except Exception as e:
+            print(f"[BLOCKCHAIN AUDIT ERROR] {str(e)}")
+    while True:
+        await asyncio.sleep(BLOCKCHAIN_AUDIT_INTERVAL)
+        try:
+            is_valid = await audit_blockchain()
+            print(f"[BLOCKCHAIN AUDIT] Full audit completed: valid={is_valid}, blocks={chain.getChainSize()}")
+        except Exception as e:
+            print(f"[BLOCKCHAIN AUDIT ERROR] {str(e)}")
+
+# Block serialization helpers
+BLOCK_BATCH_SIZE = int(os.getenv("BLOCK_BATCH_SIZE", "1000"))
+EXPLORER_DEFAULT_LIMIT = 50
+EXPLORER_MAX_LIMIT = 500
+
+def parse_contract_info(sender_key: str, receiver_key: str) -> Dict:
+    """Parse contract information from transaction keys"""
+    contract_info = {}
+    if sender_key.startswith("CONTRACT_"):
+        # Extract contract ID and company from sender key
+        parts = sender_key.split("_")
+        if len(parts) >= 3:
+            contract_info["contract_id"] = f"{parts[1]}_{parts[2]}"
+            contract_info["uploader_company"] = "_".join(parts[3:]) if len(parts) > 3 else parts[2]
+    
+    if receiver_key.startswith("CROSSCOMPANY_"):
+        contract_info["type"] = "cross-company"
+        contract_info["partner_company"] = receiver_key.replace("CROSSCOMPANY_", "")
+    elif receiver_key.startswith("INTERNAL_"):
+        contract_info["type"] = "internal"
+        contract_info["company"] = receiver_key.replace("INTERNAL_", "")
+    return contract_info
+
+def build_transaction_records(batch: Dict) -> List[Dict]:
+    """Build transaction records from the tx* columns of a chain.getBlocks() batch"""
+    records = []
+    for amount, timestamp, sender_key, receiver_key in zip(
+        batch["txAmount"].tolist(),
+        batch["txTimestamp"].tolist(),
+        batch["txSenderKey"],
+        batch["txReceiverKey"]
+    ):
+        records.append({
+            "data": {
+                "amount": amount,
+                "senderKey": sender_key,
+                "receiverKey": receiver_key,
+                "timestamp": timestamp,
+                "timestamp_readable": datetime.fromtimestamp(timestamp).isoformat()
+            },
+            "contract_info": parse_contract_info(sender_key, receiver_key)
+        })
+    return records
+
+def build_block_records(batch: Dict) -> List[Dict]:
+    """Build explorer block records from a columnar chain.getBlocks() batch
+    
+    data and contract_info describe the block's first transaction, so
+    single-transaction blocks keep their original shape.
+    """
+    transactions = build_transaction_records(batch)
+    records = []
+    offset = 0
+    for index, block_hash, previous_hash, merkle_root, timestamp, transaction_count, verified in zip(
+        batch["index"].tolist(),
+        batch["hash"],
+        batch["previousHash"],
+        batch["merkleRoot"],
+        batch["timestamp"].tolist(),
+        batch["transactionCount"].tolist(),
+        batch["verified"].tolist()
+    ):
+        block_transactions = transactions[offset:offset + transaction_count]
+        offset += transaction_count
+        for tx_index, transaction in enumerate(block_transactions):
+            transaction["tx_index"] = tx_index
+        records.append({
+            "index": index,
+            "hash": block_hash,
+            "previousHash": previous_hash,
+            "merkleRoot": merkle_root,
+            "timestamp": timestamp,
+            "data": block_transactions[0]["data"],
+            "contract_info": block_transactions[0]["contract_info"],
+            "transaction_count": transaction_count,
+            "transactions": block_transactions,
+            "is_valid": verified
+        })
+    return records
+
+def iter_block_record_batches(start: int, end: int) -> Iterator[List[Dict]]:
+    """Read blocks [start, end) as record lists of up to BLOCK_BATCH_SIZE"""
+    for batch_start in range(start, end, BLOCK_BATCH_SIZE):
+        with blockchain_call_seconds.time("getBlocks"):
+            batch = chain.getBlocks(batch_start, min(BLOCK_BATCH_SIZE, end - batch_start))
+        yield build_block_records(batch)
+
+def blockchain_page_etag(cursor: int, limit: int, chain_size: int) -> str:
+    """ETag for an explorer page, derived from its newest block and validation state
+    
+    The newest block's hash commits to the whole page through the previous-hash
+    links, so appends leave the ETags of older pages unchanged; only the page
+    holding the tip also depends on the chain size.
+    """
+    with blockchain_call_seconds.time("getBlock"):
+        newest = chain.getBlock(cursor)
+    # Blocks are reported verified within the validated range, clamped to this page
+    verified_up_to = min(chain.getValidatedUpTo(), cursor + 1)
+    verified_from = min(chain.getValidatedFrom(), cursor + 1)
+    state = f"{cursor}:{limit}:{newest.getHash()}:{verified_from}:{verified_up_to}:{chain.isChainValidCached()}"
+    if cursor == chain_size - 1:
+        state += f":tip:{chain_size}"
+    return '"' + hashlib.sha1(state.encode()).hexdigest() + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def is_company_contract(contract_info: Dict, company: str) -> bool:
+    """Check whether a transaction's contract info involves the given company"""
+    return company in (
+        contract_info.get("uploader_company"),
+        contract_info.get("partner_company"),
+        contract_info.get("company")
+    )
+
+def to_contract_record(record: Dict, tx_index: int) -> Dict:
+    """Shape one transaction of a block record as an on-chain contract entry"""
+    transaction = record["transactions"][tx_index]
+    return {
+        "block_index": record["index"],
+        "tx_index": tx_index,
+        "hash": record["hash"],
+        "merkleRoot": record["merkleRoot"],
+        "data": transaction["data"],
+        "contract_info": transaction["contract_info"],
+        "is_valid": record["is_valid"]
+    }
+
+def fetch_contract_records(positions: List[Tuple[int, int]]) -> List[Dict]:
+    """Build contract records for (block index, transaction index) positions"""
+    block_indexes = list(dict.fromkeys(block_index for block_index, _ in positions))
+    if not block_indexes:
+        return []
+    with blockchain_call_seconds.time("getBlocksAt"):
+        batch = chain.getBlocksAt(block_indexes)
+    blocks = {record["index"]: record for record in build_block_records(batch)}
+    return [to_contract_record(blocks[block_index], tx_index) for block_index, tx_index in positions]
+
+def verify_merkle_proof(leaf_hash: str, path: List[Dict], merkle_root: str) -> bool:
+    """Fold a Merkle inclusion proof from a leaf hash up to the expected root"""
+    node = bytes.fromhex(leaf_hash)
+    for step in path:
+        sibling = bytes.fromhex(step["hash"])
+        pair = sibling + node if step["position"] == "left" else node + sibling
+        node = hashlib.sha256(b"\x01" + pair).digest()
+    return node.hex() == merkle_root
+
+# On-chain contract indexes
+class BlockchainIndex:
+    """Secondary indexes over on-chain contracts (company -> transaction positions
+    and contract ID -> transaction position), caught up from the chain after every
+    append. Positions are (block index, transaction index) pairs."""
+
+    def __init__(self):
+        self.company_transactions: Dict[str, List[Tuple[int, int]]] = {}
+        self.contract_transactions: Dict[str, Tuple[int, int]] = {}
+        self.indexed_up_to = 0
+
+    def catch_up(self):
+        """Index any blocks appended since the last call"""
+        if self.indexed_up_to >= chain.getChainSize():
+            return
+        for batch in chain.iterBlocks(self.indexed_up_to, BLOCK_BATCH_SIZE):
+            sender_keys = batch["txSenderKey"]
+            receiver_keys = batch["txReceiverKey"]
+            offset = 0
+            for index, transaction_count in zip(batch["index"].tolist(), batch["transactionCount"].tolist()):
+                for tx_index in range(transaction_count):
+                    self.add_transaction(index, tx_index, sender_keys[offset + tx_index], receiver_keys[offset + tx_index])
+                offset += transaction_count
+                self.indexed_up_to = index + 1
+
+    def add_transaction(self, index: int, tx_index: int, sender_key: str, receiver_key: str):
+        contract_info = parse_contract_info(sender_key, receiver_key)
+        position = (index, tx_index)
+        if "contract_id" in contract_info:
+            self.contract_transactions[contract_info["contract_id"]] = position
+        companies = {
+            contract_info.get("uploader_company"),
+            contract_info.get("partner_company"),
+            contract_info.get("company")
+        }
+        companies.discard(None)
+        for company in companies:
+            self.company_transactions.setdefault(company, []).append(position)
+
+    def transactions_for_company(self, company: str) -> List[Tuple[int, int]]:
+        self.catch_up()
+        return self.company_transactions.get(company, [])
+
+    def transaction_for_contract(self, contract_id: str) -> Optional[Tuple[int, int]]:
+        self.catch_up()
+        return self.contract_transactions.get(contract_id)
+
+blockchain_index = BlockchainIndex()
+
+# Block mempool
+BLOCKCHAIN_BLOCK_MAX_TRANSACTIONS = int(os.getenv("BLOCKCHAIN_BLOCK_MAX_TRANSACTIONS", "100"))
+BLOCKCHAIN_BLOCK_MAX_WAIT_MS = int(os.getenv("BLOCKCHAIN_BLOCK_MAX_WAIT_MS", "200"))
+
+class BlockMempool:
+    """Collects signed-contract transactions and seals them into one block when
+    max_transactions are pending or max_wait_ms after the first one arrived.
+    With max_transactions=1 every transaction gets its own block immediately."""
+
+    def __init__(self, max_transactions: int, max_wait_ms: int):
+        self.max_transactions = max(1, max_transactions)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self.pending: List[Tuple[blockchain.TransactionData, asyncio.Future]] = []
+        self.timer: Optional[asyncio.Task] = None
+        self.sealing: set = set()
+        self.blocks_sealed = 0
+
+    async def submit(self, transaction_data: blockchain.TransactionData) -> Tuple[int, int]:
+        """Queue a transaction and wait for its (block index, transaction index)"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((transaction_data, future))
+        if len(self.pending) >= self.max_transactions:
+            self.start_seal()
+        elif self.timer is None:
+            self.timer = asyncio.create_task(self.seal_after_wait())
+        return await future
+
+    async def seal_after_wait(self):
+        await asyncio.sleep(self.max_wait)
+        self.timer = None
+        self.start_seal()
+
+    def start_seal(self):
+        """Take the pending transactions and seal them in a task of their own, so
+        cancelling the request that filled the block cannot strand the others"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        task = asyncio.create_task(self.seal_batch(pending))
+        self.sealing.add(task)
+        task.add_done_callback(self.sealing.discard)
+
+    async def seal(self):
+        """Seal every pending transaction and wait for all seals in flight"""
+        self.start_seal()
+        if self.sealing:
+            await asyncio.gather(*self.sealing, return_exceptions=True)
+
+    async def seal_batch(self, pending: List[Tuple[blockchain.TransactionData, asyncio.Future]]):
+        """Seal transactions into a new block and resolve their waiters"""
+        try:
+            with blockchain_call_seconds.time("sealBlock"):
+                block_index = await asyncio.to_thread(chain.sealBlock, [transaction_data for transaction_data, _ in pending])
+            blockchain_index.catch_up()
+            self.blocks_sealed += 1
+        except BaseException as e:
+            # Waiters must never be left unresolved, even when the seal is cancelled
+            error = e if isinstance(e, Exception) else RuntimeError("Block sealing was cancelled")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+            return
+        print(f"[BLOCKCHAIN] Sealed {len(pending)} transaction(s) into block {block_index}")
+        for tx_index, (_, future) in enumerate(pending):
+            if not future.done():
+                future.set_result((block_index, tx_index))
+
+block_mempool = BlockMempool(BLOCKCHAIN_BLOCK_MAX_TRANSACTIONS, BLOCKCHAIN_BLOCK_MAX_WAIT_MS)
+
+# Streaming export helpers
+EXPORT_FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson"}
+EXPORT_COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+def dump_json(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+def validate_export_options(export_format: str, compression: Optional[str]):
+    """Reject unknown export formats and unavailable encoders"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {export_format}")
+    if compression is not None and compression not in EXPORT_COMPRESSIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise HTTPException(status_code=400, detail="zstd compression requires the 'zstandard' package")
+
+def compress_stream(chunks: Iterable[bytes], compression: Optional[str]) -> Iterator[bytes]:
+    """Incrementally compress a byte stream with gzip or zstd"""
+    if compression is None:
+        yield from chunks
+        return
+    if compression == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    else:
+        compressor = zstandard.ZstdCompressor().compressobj()
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def iter_contract_record_batches(positions: List[Tuple[int, int]]) -> Iterator[List[Dict]]:
+    for batch_start in range(0, len(positions), BLOCK_BATCH_SIZE):
+        yield fetch_contract_records(positions[batch_start:batch_start + BLOCK_BATCH_SIZE])
+
+def iter_blockchain_export(
+    export_metadata: Dict,
+    since_index: int,
+    chain_size: int,
+    user_contract_blocks: Optional[List[Tuple[int, int]]],
+    export_format: str,
+    stats: Dict
+) -> Iterator[bytes]:
+    """Yield a blockchain export batch by batch, as NDJSON or as one chunked JSON document
+    
+    Blocks [since_index, chain_size) are read in columnar batches, so memory stays
+    bounded by BLOCK_BATCH_SIZE regardless of chain length. stats receives the totals.
+    """
+    blockchain_info = {
+        "chain_size": chain_size,
+        "is_valid": chain.isChainValidCached(),
+        "using": "C++ implementation"
+    }
+    exported_at = datetime.now().isoformat()
+    stats.update({"total_blocks": 0, "total_user_contracts": 0, "blockchain_valid": blockchain_info["is_valid"]})
+    
+    if export_format == "ndjson":
+        yield (dump_json({
+            "type": "header",
+            "exported_at": exported_at,
+            "blockchain_info": blockchain_info,
+            "since_index": since_index
+        }) + "\n").encode("utf-8")
+        for records in iter_block_record_batches(since_index, chain_size):
+            stats["total_blocks"] += len(records)
+            yield "".join(dump_json({"type": "block", **record}) + "\n" for record in records).encode("utf-8")
+        if user_contract_blocks is not None:
+            for records in iter_contract_record_batches(user_contract_blocks):
+                stats["total_user_contracts"] += len(records)
+                yield "".join(dump_json({"type": "user_contract", **record}) + "\n" for record in records).encode("utf-8")
+        yield (dump_json({"type": "footer", "export_metadata": {**export_metadata, **stats}}) + "\n").encode("utf-8")
+        return
+    
+    # Chunked JSON with the same document shape as the original export
+    yield (f'{{"exported_at": {dump_json(exported_at)}, "blockchain_info": {dump_json(blockchain_info)}, '
+           f'"since_index": {since_index}, "blocks": [').encode("utf-8")
+    separator = ""
+    for records in iter_block_record_batches(since_index, chain_size):
+        stats["total_blocks"] += len(records)
+        yield (separator + ", ".join(dump_json(record) for record in records)).encode("utf-8")
+        separator = ", "
+    yield b"]"
+    if user_contract_blocks is not None:
+        yield b', "user_contracts": ['
+        separator = ""
+        for records in iter_contract_record_batches(user_contract_blocks):
+            stats["total_user_contracts"] += len(records)
+            yield (separator + ", ".join(dump_json(record) for record in records)).encode("utf-8")
+            separator = ", "
+        yield b"]"
+    metadata = {**export_metadata, "total_blocks": stats["total_blocks"]}
+    if user_contract_blocks is not None:
+        metadata["total_user_contracts"] = stats["total_user_contracts"]
+    yield f', "export_metadata": {dump_json(metadata)}}}'.encode("utf-8")
+
+def prepare_blockchain_export(current_user: dict, include_user_contracts: bool, since_index: int, export_format: str) -> Dict:
+    """Snapshot the chain bounds and user contract indexes before streaming starts"""
+    if since_index < 0:
+        raise HTTPException(status_code=400, detail="since_index must be non-negative")
+    chain_size = chain.getChainSize()
+    since_index = min(since_index, chain_size)
+    user_contract_blocks = None
+    if include_user_contracts:
+        user_contract_blocks = [
+            position for position in blockchain_index.transactions_for_company(current_user["company"])
+            if since_index <= position[0] < chain_size
+        ]
+    return {
+        "export_metadata": {
+            "user": current_user["user_id"],
+            "company": current_user["company"],
+            "export_type": "complete_blockchain" if since_index == 0 else "incremental_blockchain"
+        },
+        "since_index": since_index,
+        "chain_size": chain_size,
+        "user_contract_blocks": user_contract_blocks,
+        "export_format": export_format
+    }
+
+def write_export_file(filepath: str, chunks: Iterable[bytes]):
+    """Write an export stream to disk (run in a worker thread)"""
+    with open(filepath, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+# LightRAG client pool
+LIGHTRAG_POOL_LIMIT = int(os.getenv("LIGHTRAG_POOL_LIMIT", "100"))
+LIGHTRAG_POOL_LIMIT_PER_HOST = int(os.getenv("LIGHTRAG_POOL_LIMIT_PER_HOST", "20"))
+LIGHTRAG_KEEPALIVE_TIMEOUT = float(os.getenv("LIGHTRAG_KEEPALIVE_TIMEOUT", "30"))
+LIGHTRAG_CONNECT_TIMEOUT = float(os.getenv("LIGHTRAG_CONNECT_TIMEOUT", "10"))
+LIGHTRAG_REQUEST_TIMEOUT = float(os.getenv("LIGHTRAG_REQUEST_TIMEOUT", "120"))
+LIGHTRAG_MAX_RETRIES = int(os.getenv("LIGHTRAG_MAX_RETRIES", "3"))
+LIGHTRAG_RETRY_BACKOFF = float(os.getenv("LIGHTRAG_RETRY_BACKOFF", "0.5"))
+LIGHTRAG_RETRY_STATUSES = {429, 502, 503, 504}
+
+class LightRAGClient:
+    """App-lifetime aiohttp session shared by every LightRAG call
+    
+    The connector keeps connections alive and caps them per host, so concurrent
+    analyses reuse sockets instead of paying DNS, TCP and handshake costs per call.
+    Transient failures (connection errors, timeouts, 429/502/503/504) are retried
+    with exponential backoff and jitter.
+    """
+
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.connector: Optional[aiohttp.TCPConnector] = None
+        self.metrics = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "pool_waits": 0
+        }
+
+    async def start(self):
+        if self.session is not None and not self.session.closed:
+            return
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self.on_connection_created)
+        trace_config.on_connection_reuseconn.append(self.on_connection_reused)
+        trace_config.on_connection_queued_start.append(self.on_pool_wait)
+        self.connector = aiohttp.TCPConnector(
+            limit=LIGHTRAG_POOL_LIMIT,
+            limit_per_host=LIGHTRAG_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=LIGHTRAG_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=self.connector,
+            timeout=aiohttp.ClientTimeout(total=LIGHTRAG_REQUEST_TIMEOUT, connect=LIGHTRAG_CONNECT_TIMEOUT),
+            trace_configs=[trace_config]
+        )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+            self.connector = None
+
+    async def on_connection_created(self, session, context, params):
+        self.metrics["connections_created"] += 1
+
+    async def on_connection_reused(self, session, context, params):
+        self.metrics["connections_reused"] += 1
+
+    async def on_pool_wait(self, session, context, params):
+        self.metrics["pool_waits"] += 1
+
+    async def request_json(self, method: str, url: str, **kwargs) -> Tuple[int, Optional[Dict]]:
+        """Send a request with retries; returns the final status and JSON body (None if not JSON)"""
+        await self.start()
+        self.metrics["requests"] += 1
+        self.metrics["in_flight"] += 1
+        self.metrics["peak_in_flight"] = max(self.metrics["peak_in_flight"], self.metrics["in_flight"])
+        try:
+            for attempt in range(LIGHTRAG_MAX_RETRIES + 1):
+                try:
+                    async with self.session.request(method, url, **kwargs) as response:
+                        if response.status not in LIGHTRAG_RETRY_STATUSES or attempt == LIGHTRAG_MAX_RETRIES:
+                            try:
+                                body = await response.json(content_type=None)
+                            except (aiohttp.ContentTypeError, json.JSONDecodeError, UnicodeDecodeError):
+                                body = None
+                            return response.status, body
+                        print(f"[LIGHTRAG] {method} {url} returned {response.status}, retrying")
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt == LIGHTRAG_MAX_RETRIES:
+                        self.metrics["failures"] += 1
+                        raise
+                    print(f"[LIGHTRAG] {method} {url} failed ({type(e).__name__}), retrying")
+                self.metrics["retries"] += 1
+                await asyncio.sleep(LIGHTRAG_RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random()))
+        finally:
+            self.metrics["in_flight"] -= 1
+
+    async def post_json(self, url: str, payload: Dict) -> Tuple[int, Optional[Dict]]:
+        return await self.request_json("POST", url, json=payload)
+
+    async def stream_events(self, url: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """Yield (event, data) pairs from a server-sent event stream of JSON payloads
+        
+        Raises aiohttp.ClientResponseError if the server does not answer 200.
+        """
+        await self.start()
+        timeout = aiohttp.ClientTimeout(total=None, connect=LIGHTRAG_CONNECT_TIMEOUT)
+        async with self.session.get(url, timeout=timeout, headers={"Accept": "text/event-stream"}) as response:
+            if response.status != 200:
+                raise aiohttp.ClientResponseError(response.request_info, response.history, status=response.status)
+            event, data = "message", []
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").rstrip("\r\n")
+                if not line:
+                    if data:
+                        yield event, json.loads("\n".join(data))
+                    event, data = "message", []
+                elif line.startswith(":"):
+                    continue
+                elif line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data.append(line[len("data:"):].lstrip())
+
+    def pool_stats(self) -> Dict:
+        """Request counters plus current pool utilization"""
+        stats = dict(self.metrics)
+        stats["pool_limit"] = LIGHTRAG_POOL_LIMIT
+        stats["pool_limit_per_host"] = LIGHTRAG_POOL_LIMIT_PER_HOST
+        stats["pool_utilization"] = round(self.metrics["in_flight"] / LIGHTRAG_POOL_LIMIT, 3) if LIGHTRAG_POOL_LIMIT else 0
+        reused_total = self.metrics["connections_created"] + self.metrics["connections_reused"]
+        stats["connection_reuse_ratio"] = round(self.metrics["connections_reused"] / reused_total, 3) if reused_total else 0
+        return stats
+
+lightrag_client = LightRAGClient()
+
+# LightRAG document tracking
+LIGHTRAG_TRACK_TIMEOUT = float(os.getenv("LIGHTRAG_TRACK_TIMEOUT", "120"))
+LIGHTRAG_TRACK_POLL_INITIAL = 0.1
+LIGHTRAG_TRACK_POLL_MAX = 2.0
+# How long an empty track_id is tolerated before assuming the insert was a duplicate
+LIGHTRAG_TRACK_EMPTY_GRACE = float(os.getenv("LIGHTRAG_TRACK_EMPTY_GRACE", "5"))
+LIGHTRAG_TERMINAL_STATUSES = {"processed", "failed"}
+# LightRAG servers known not to offer the track_status event stream
+lightrag_servers_without_stream: set = set()
+
+def summarize_track_status(status_summary: Dict[str, int]) -> Optional[str]:
+    """Collapse a track_id status summary to 'processed' or 'failed' once every document is done"""
+    statuses = {key.lower().rsplit(".", 1)[-1] for key, count in status_summary.items() if count}
+    if not statuses or not statuses <= LIGHTRAG_TERMINAL_STATUSES:
+        return None
+    return "failed" if "failed" in statuses else "processed"
+
+async def stream_lightrag_track_status(lightrag_url: str, track_id: str) -> Tuple[Optional[str], List[Dict]]:
+    """Wait for the LightRAG 'complete' event of a track_id
+    
+    As when polling, a track_id with no documents after LIGHTRAG_TRACK_EMPTY_GRACE
+    seconds is reported as 'unknown', also against servers that keep the stream open.
+    """
+    events = lightrag_client.stream_events(f"{lightrag_url}/documents/track_status/{track_id}/stream")
+    grace_deadline = time.monotonic() + LIGHTRAG_TRACK_EMPTY_GRACE
+    has_documents = False
+    try:
+        while True:
+            timeout = None if has_documents else max(0.0, grace_deadline - time.monotonic())
+            try:
+                event, data = await asyncio.wait_for(anext(events), timeout)
+            except StopAsyncIteration:
+                return None, []
+            except asyncio.TimeoutError:
+                # Duplicate content is never recorded under the new track_id
+                return "unknown", []
+            if event == "status" and data.get("total_count"):
+                has_documents = True
+            elif event == "complete":
+                documents = data.get("documents", [])
+                if not documents:
+                    return "unknown", []
+                final_status = summarize_track_status(data.get("status_summary", {})) or "processed"
+                return final_status, documents
+    finally:
+        await events.aclose()
+
+async def poll_lightrag_track_status(lightrag_url: str, track_id: str) -> Tuple[Optional[str], List[Dict]]:
+    """Poll /documents/track_status with adaptive backoff until every document is done"""
+    delay = LIGHTRAG_TRACK_POLL_INITIAL
+    waited = 0.0
+    last_summary = None
+    while True:
+        http_status, body = await lightrag_client.request_json("GET", f"{lightrag_url}/documents/track_status/{track_id}")
+        if http_status == 200 and body is not None:
+            status_summary = body.get("status_summary", {})
+            if not body.get("documents") and waited >= LIGHTRAG_TRACK_EMPTY_GRACE:
+                # Duplicate content is never recorded under the new track_id
+                return "unknown", []
+            final_status = summarize_track_status(status_summary)
+            if final_status is not None:
+                return final_status, body["documents"]
+            # Progress resets the backoff; an unchanged status stretches it
+            delay = LIGHTRAG_TRACK_POLL_INITIAL if status_summary != last_summary else min(delay * 2, LIGHTRAG_TRACK_POLL_MAX)
+            last_summary = status_summary
+        else:
+            delay = min(delay * 2, LIGHTRAG_TRACK_POLL_MAX)
+        await asyncio.sleep(delay)
+        waited += delay
+
+async def wait_for_lightrag_document(lightrag_url: str, track_id: str) -> Tuple[Optional[str], List[Dict]]:
+    """Wait until the documents inserted under track_id are indexed
+    
+    Uses LightRAG's server-sent track_status stream when available and falls back
+    to polling. Returns the final status, 'processed', 'failed', 'unknown' (nothing
+    recorded under the track_id, e.g. a duplicate) or None on timeout, together with
+    the tracked documents (id, file_path and status).
+    """
+    started = time.time()
+    try:
+        if lightrag_url not in lightrag_servers_without_stream:
+            try:
+                return await asyncio.wait_for(stream_lightrag_track_status(lightrag_url, track_id), LIGHTRAG_TRACK_TIMEOUT)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in (404, 405):
+                    raise
+                lightrag_servers_without_stream.add(lightrag_url)
+                print(f"[LIGHTRAG] {lightrag_url} has no track_status stream, polling instead")
+        remaining = max(0.0, LIGHTRAG_TRACK_TIMEOUT - (time.time() - started))
+        return await asyncio.wait_for(poll_lightrag_track_status(lightrag_url, track_id), remaining)
+    except asyncio.TimeoutError:
+        print(f"[LIGHTRAG] Timed out after {time.time() - started:.1f}s waiting for {track_id}")
+        return None, []
+    finally:
+        print(f"[LIGHTRAG] Waited {time.time() - started:.2f}s for {track_id} to be indexed")
+
+# LightRAG insert ledger (set LIGHTRAG_LEDGER_PATH to an empty string for an in-memory ledger)
+LIGHTRAG_LEDGER_PATH = os.getenv("LIGHTRAG_LEDGER_PATH", os.path.join(os.getcwd(), "data", "lightrag_ledger.db"))
+
+class LightRAGInsertLedger:
+    """Content-addressed record of the documents each LightRAG server has indexed
+    
+    Entries are keyed by the SHA-256 of the rendered document, so unchanged
+    documents skip re-insertion and a changed document under the same source
+    replaces (and reports) the stale entry.
+    """
+
+    def __init__(self, path: str):
+        self.path = path or ":memory:"
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS lightrag_documents ("
+            "lightrag_url TEXT NOT NULL, content_hash TEXT NOT NULL, source TEXT NOT NULL, "
+            "track_id TEXT, doc_id TEXT, indexed_at TEXT NOT NULL, "
+            "PRIMARY KEY (lightrag_url, content_hash))"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS lightrag_documents_source ON lightrag_documents (lightrag_url, source)"
+        )
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(document_text: str) -> str:
+        return hashlib.sha256(document_text.encode("utf-8")).hexdigest()
+
+    def lookup(self, lightrag_url: str, content_hash: str) -> bool:
+        """Whether the document is already indexed by the server"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM lightrag_documents WHERE lightrag_url = ? AND content_hash = ?",
+                (lightrag_url, content_hash),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return row is not None
+
+    def record(self, lightrag_url: str, content_hash: str, source: str, track_id: Optional[str], doc_id: Optional[str]) -> List[str]:
+        """Record an indexed document and drop older versions of the same source
+        
+        Returns the LightRAG document IDs of the replaced versions that no other
+        entry still refers to.
+        """
+        with self.lock, self.connection:
+            stale = self.connection.execute(
+                "SELECT doc_id FROM lightrag_documents WHERE lightrag_url = ? AND source = ? AND content_hash != ?",
+                (lightrag_url, source, content_hash),
+            ).fetchall()
+            self.connection.execute(
+                "DELETE FROM lightrag_documents WHERE lightrag_url = ? AND source = ? AND content_hash != ?",
+                (lightrag_url, source, content_hash),
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO lightrag_documents VALUES (?, ?, ?, ?, ?, ?)",
+                (lightrag_url, content_hash, source, track_id, doc_id, datetime.now().isoformat()),
+            )
+            stale_doc_ids = []
+            for (stale_doc_id,) in stale:
+                if stale_doc_id is None or stale_doc_id == doc_id:
+                    continue
+                still_used = self.connection.execute(
+                    "SELECT 1 FROM lightrag_documents WHERE lightrag_url = ? AND doc_id = ?",
+                    (lightrag_url, stale_doc_id),
+                ).fetchone()
+                if still_used is None:
+                    stale_doc_ids.append(stale_doc_id)
+            return stale_doc_ids
+
+    def stats(self) -> Dict:
+        with self.lock:
+            (entries,) = self.connection.execute("SELECT COUNT(*) FROM lightrag_documents").fetchone()
+            return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+lightrag_ledger = LightRAGInsertLedger(LIGHTRAG_LEDGER_PATH)
+
+async def delete_lightrag_documents(lightrag_url: str, doc_ids: List[str]):
+    """Ask LightRAG to drop superseded documents so stale content stops influencing answers"""
+    http_status, body = await lightrag_client.request_json(
+        "DELETE", f"{lightrag_url}/documents/delete_document", json={"doc_ids": doc_ids}
+    )
+    if http_status != 200 or (body or {}).get("status") != "deletion_started":
+        print(f"[LIGHTRAG] Could not delete superseded documents {doc_ids}: {http_status} {body}")
+
+# Analysis result cache (set ANALYSIS_CACHE_PATH to persist results across restarts)
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "3600"))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", "")
+# Bump when the analysis prompts change so cached answers to old prompts are not served
+ANALYSIS_PROMPT_VERSION = "1"
+
+class AnalysisResultCache:
+    """TTL + LRU cache of LightRAG analysis answers with single-flight loading
+    
+    Concurrent requests for the same key share one upstream call; only
+    successful answers are cached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, path: str = ""):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.connection = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_results (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.connection.execute("DELETE FROM analysis_results WHERE expires_at < ?", (time.time(),))
+            self.connection.commit()
+
+    @staticmethod
+    def key(analysis_type: str, lightrag_url: str, document_text: str, query: str) -> str:
+        """Cache key over the analysis type, prompt version, server, rendered document and query"""
+        digest = hashlib.sha256()
+        for part in (analysis_type, ANALYSIS_PROMPT_VERSION, lightrag_url, document_text, query):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None and self.connection is not None:
+            row = self.connection.execute(
+                "SELECT expires_at, value FROM analysis_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                entry = tuple(row)
+                self.store(key, entry)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            self.entries.pop(key, None)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def store(self, key: str, entry: Tuple[float, str]):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        self.store(key, (expires_at, value))
+        if self.connection is not None:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO analysis_results VALUES (?, ?, ?)", (key, value, expires_at)
+                )
+
+    async def get_or_compute(self, key: str, compute) -> Optional[str]:
+        """Return the cached answer or await compute(), sharing it with concurrent callers"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            value = await compute()
+            if value is not None and self.ttl > 0:
+                self.put(key, value)
+            return value
+        finally:
+            # Waiters see a failed load as a miss (None) rather than the leader's exception
+            future.set_result(value)
+            del self.inflight[key]
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "persistent": self.connection is not None,
+        }
+
+analysis_cache = AnalysisResultCache(ANALYSIS_CACHE_TTL, ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_PATH)
+
+# Analysis job queue
+ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "4"))
+ANALYSIS_JOB_QUEUE_LIMIT = int(os.getenv("ANALYSIS_JOB_QUEUE_LIMIT", "100"))
+ANALYSIS_JOB_RESULT_TTL = float(os.getenv("ANALYSIS_JOB_RESULT_TTL", "3600"))
+ANALYSIS_JOB_RETRY_AFTER = 5
+ANALYSIS_JOB_FINISHED_STATUSES = {"completed", "failed"}
+# Shared job table so any worker can answer status polls (empty keeps jobs in
+# the accepting worker only); jobs owned by another worker are polled
+ANALYSIS_JOBS_DB_PATH = os.getenv("ANALYSIS_JOBS_DB_PATH", os.path.join(os.getcwd(), "data", "jobs.db") if SHARED_STATE else "")
+ANALYSIS_JOB_POLL_INTERVAL = 0.5
+
+class AnalysisJobQueue:
+    """Priority queue of analysis jobs drained by background workers
+    
+    Lower priority numbers run first, equal priorities in submission order.
+    Finished jobs keep their result for ANALYSIS_JOB_RESULT_TTL seconds. With a
+    store path, every state change is also written to SQLite so other worker
+    processes can report jobs they did not accept.
+    """
+
+    def __init__(self, workers: int, limit: int, result_ttl: float, store_path: str = ""):
+        self.store = None
+        if store_path:
+            os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+            self.store = sqlite3.connect(store_path, check_same_thread=False)
+            self.store.execute("PRAGMA journal_mode=WAL")
+            self.store.execute("PRAGMA synchronous=NORMAL")
+            self.store.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_jobs (job_id TEXT PRIMARY KEY, finished_at REAL, data TEXT NOT NULL)"
+            )
+            self.store.commit()
+        self.workers = workers
+        self.limit = limit
+        self.result_ttl = result_ttl
+        self.handlers: Dict[str, Callable[[Dict, dict], Awaitable]] = {}
+        self.jobs: Dict[str, Dict] = {}
+        self.changed: Dict[str, asyncio.Event] = {}
+        self.finished_at: Dict[str, float] = {}
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.tasks: List[asyncio.Task] = []
+        self.next_seq = 0
+        self.running = 0
+        self.rejected = 0
+
+    def register(self, job_type: str, handler: Callable[[Dict, dict], Awaitable]):
+        self.handlers[job_type] = handler
+
+    def start(self):
+        self.queue = asyncio.PriorityQueue()
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def submit(self, job_type: str, params: Dict, owner: str, priority: int) -> Dict:
+        """Queue a job, or raise 429 when the queue is saturated"""
+        self.purge()
+        if self.queue.qsize() >= self.limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Analysis queue is full, please retry later",
+                headers={"Retry-After": str(ANALYSIS_JOB_RETRY_AFTER)},
+            )
+        job_id = f"JOB_{uuid.uuid4().hex}"
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "job_type": job_type,
+            "status": "queued",
+            "priority": priority,
+            "params": params,
+            "owner": owner,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        self.changed[job_id] = asyncio.Event()
+        self.persist(job_id)
+        self.next_seq += 1
+        self.queue.put_nowait((priority, self.next_seq, job_id))
+        return self.jobs[job_id]
+
+    def update(self, job_id: str, **fields):
+        """Apply a state change and wake anything waiting on the job"""
+        self.jobs[job_id].update(fields)
+        self.persist(job_id)
+        self.changed.pop(job_id).set()
+        self.changed[job_id] = asyncio.Event()
+
+    def persist(self, job_id: str):
+        if self.store is None:
+            return
+        self.store.execute(
+            "INSERT OR REPLACE INTO analysis_jobs (job_id, finished_at, data) VALUES (?, ?, ?)",
+            (job_id, self.finished_at.get(job_id), json.dumps(self.jobs[job_id]))
+        )
+        self.store.commit()
+
+    def lookup(self, job_id: str) -> Optional[Dict]:
+        """A job accepted by this worker, or by another one sharing the store"""
+        job = self.jobs.get(job_id)
+        if job is not None or self.store is None:
+            return job
+        row = self.store.execute(
+            "SELECT data FROM analysis_jobs WHERE job_id = ? AND (finished_at IS NULL OR finished_at >= ?)",
+            (job_id, time.time() - self.result_ttl)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def wait_for_change(self, job_id: str, last_status: Optional[str], timeout: float) -> bool:
+        """Wait until the job's status differs from the one the caller last saw; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.lookup(job_id)
+            if job is None or job["status"] != last_status:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            changed = self.changed.get(job_id)
+            if changed is None:
+                # Run by another worker: poll the shared store
+                await asyncio.sleep(min(ANALYSIS_JOB_POLL_INTERVAL, remaining))
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+
+    async def worker(self):
+        while True:
+            _, _, job_id = await self.queue.get()
+            try:
+                job = self.jobs.get(job_id)
+                if job is None:
+                    continue
+                self.running += 1
+                self.update(job_id, status="running", started_at=datetime.now().isoformat())
+                try:
+                    result = await self.handlers[job["job_type"]](job["params"], users_db[job["owner"]])
+                    outcome = {"status": "completed", "result": jsonable_encoder(result)}
+                except HTTPException as e:
+                    outcome = {"status": "failed", "error": {"status_code": e.status_code, "detail": e.detail}}
+                except Exception as e:
+                    print(f"Analysis job {job_id} failed: {str(e)}")
+                    outcome = {"status": "failed", "error": {"status_code": 500, "detail": str(e)}}
+                finally:
+                    self.running -= 1
+                self.finished_at[job_id] = time.time()
+                self.update(job_id, finished_at=datetime.now().isoformat(), **outcome)
+            finally:
+                self.queue.task_done()
+
+    def purge(self):
+        """Drop finished jobs whose results have expired"""
+        cutoff = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, finished in self.finished_at.items() if finished < cutoff]:
+            del self.finished_at[job_id]
+            del self.jobs[job_id]
+            del self.changed[job_id]
+        if self.store is not None:
+            self.store.execute("DELETE FROM analysis_jobs WHERE finished_at < ?", (cutoff,))
+            self.store.commit()
+
+    def get(self, job_id: str, owner: str) -> Dict:
+        job = self.lookup(job_id)
+        if job is None or job["owner"] != owner:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "running": self.running,
+            "stored": len(self.jobs),
+            "rejected": self.rejected,
+            "workers": self.workers,
+            "limit": self.limit,
+            "shared": self.store is not None,
+        }
+
+analysis_jobs = AnalysisJobQueue(ANALYSIS_JOB_WORKERS, ANALYSIS_JOB_QUEUE_LIMIT, ANALYSIS_JOB_RESULT_TTL, ANALYSIS_JOBS_DB_PATH)
+metrics.register(Gauge(
+    "analysis_jobs", "Background analysis jobs by state.", ("state",),
+    callback=lambda: {("queued",): analysis_jobs.stats()["queued"], ("running",): analysis_jobs.running}))
+
+def job_view(job: Dict) -> Dict:
+    """Public representation of a job"""
+    return {key: value for key, value in job.items() if key != "owner"}
+
+# Contract pre-analysis (off unless PREANALYSIS_LIGHTRAG_URL points at a LightRAG server)
+PREANALYSIS_LIGHTRAG_URL = os.getenv("PREANALYSIS_LIGHTRAG_URL", "")
+PREANALYSIS_DEBOUNCE_MS = int(os.getenv("PREANALYSIS_DEBOUNCE_MS", "2000"))
+PREANALYSIS_MAX_BATCH = int(os.getenv("PREANALYSIS_MAX_BATCH", "50"))
+
+class ContractPreanalysisPipeline:
+    """Indexes and analyzes uploaded contracts in the background so the analysis
+    cache is warm before anyone opens them.
+    
+    Uploads are debounced: a batch is flushed once uploads pause for debounce_ms
+    or max_batch contracts are waiting, then runs as one batch corruption analysis.
+    """
+
+    def __init__(self, lightrag_url: str, debounce_ms: int, max_batch: int):
+        self.lightrag_url = lightrag_url
+        self.debounce = max(0, debounce_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self.pending: Dict[str, None] = {}
+        self.timer: Optional[asyncio.Task] = None
+        self.tasks: set = set()
+        self.batches = 0
+        self.analyzed = 0
+        self.failed = 0
+
+    def submit(self, contract_id: str):
+        """Schedule a contract for pre-analysis"""
+        if not self.lightrag_url:
+            return
+        self.pending[contract_id] = None
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        else:
+            self.timer = asyncio.create_task(self.flush_after_debounce())
+
+    async def flush_after_debounce(self):
+        await asyncio.sleep(self.debounce)
+        self.timer = None
+        self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        contract_ids, self.pending = list(self.pending), {}
+        task = asyncio.create_task(self.analyze(contract_ids))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def analyze(self, contract_ids: List[str]):
+        # Read contracts at flush time so edits made while waiting are analyzed
+        contracts = [contracts_db[contract_id] for contract_id in contract_ids if contract_id in contracts_db]
+        if not contracts:
+            return
+        self.batches += 1
+        analyzed = failed = 0
+        try:
+            async for record in run_batch_corruption_analysis(self.lightrag_url, contracts):
+                if record["status"] == "completed":
+                    analyzed += 1
+                else:
+                    failed += 1
+        except Exception as e:
+            failed = len(contracts) - analyzed
+            print(f"[PREANALYSIS] Batch failed: {str(e)}")
+        self.analyzed += analyzed
+        self.failed += failed
+        print(f"[PREANALYSIS] Pre-analyzed {analyzed} of {len(contracts)} contract(s)")
+
+    async def stop(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": bool(self.lightrag_url),
+            "pending": len(self.pending),
+            "running_batches": len(self.tasks),
+            "batches": self.batches,
+            "analyzed": self.analyzed,
+            "failed": self.failed,
+        }
+
+contract_preanalysis = ContractPreanalysisPipeline(PREANALYSIS_LIGHTRAG_URL, PREANALYSIS_DEBOUNCE_MS, PREANALYSIS_MAX_BATCH)
+
+async def periodic_blockchain_sync():
+    """Flush batched block log appends so unsynced records stay bounded in time"""
+    while True:
+        await asyncio.sleep(BLOCKCHAIN_LOG_SYNC_INTERVAL)
+        chain.sync()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = []
+    await lightrag_client.start()
+    analysis_jobs.start()
+    if SHARED_STATE:
+        chain.refresh()
+    blockchain_index.catch_up()
+    recovered = contracts_db.recover_sealing(blockchain_index.transaction_for_contract)
+    if recovered:
+        print(f"[BLOCKCHAIN] Settled {recovered} contracts left mid-seal")
+    if chain.isPersistent():
+        print(f"[BLOCKCHAIN] Loaded {chain.getChainSize()} blocks from {chain.getLogPath()}")
+        # Only the log tail is verified on load; audit the rest in the background
+        background_tasks.append(asyncio.create_task(audit_blockchain()))
+        if BLOCKCHAIN_LOG_SYNC_EVERY > 1:
+            background_tasks.append(asyncio.create_task(periodic_blockchain_sync()))
+    if BLOCKCHAIN_AUDIT_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(periodic_blockchain_audit()))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await block_mempool.seal()
+    await analysis_jobs.stop()
+    await contract_preanalysis.stop()
+    await lightrag_client.close()
+    chain.sync()
+
 app = FastAPI(
     title="Replica API", 
     description="Contract Management Platform API with Blockchain Technology",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add trusted host middleware for security
@@ -158,12 +1881,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Worker processes share state through the block log and SQLite; pick up what
+# the other workers wrote before handling each request
+def refresh_shared_state():
+    with blockchain_call_seconds.time("refresh"):
+        new_blocks = chain.refresh()
+    if new_blocks:
+        blockchain_index.catch_up()
+    contracts_db.refresh()
+    users_db.refresh()
+
+@app.middleware("http")
+async def refresh_worker_state(request: Request, call_next):
+    if SHARED_STATE:
+        refresh_shared_state()
+    return await call_next(request)
+
+@app.exception_handler(ContractConflictError)
+async def contract_conflict_handler(request: Request, exc: ContractConflictError):
+    return JSONResponse(status_code=409, content={"detail": f"{exc}, please retry"})
+
 # Request timing middleware to monitor performance
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+    status_code = 500
+    try:
+        with http_requests_in_flight.track(request.method):
+            response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        process_time = time.time() - start_time
+        # Label by route template so path parameters do not create new series
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        http_request_seconds.observe(process_time, request.method, route, str(status_code))
     response.headers["X-Process-Time"] = str(process_time)
     
     # Log slow requests
@@ -175,59 +1926,199 @@ async def add_process_time_header(request: Request, call_next):
     return response
 
 # Authentication Helper Functions
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", "16384"))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+PASSWORD_SALT_BYTES = 16
+PASSWORD_HASH_BYTES = 32
+# Each scrypt call holds 128 * N * r bytes; bound how many run at once
+password_hash_slots = asyncio.Semaphore(int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(os.cpu_count() or 4))))
+
+def scrypt_digest(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r + 1024 * 1024, dklen=PASSWORD_HASH_BYTES
+    )
+
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password with salted scrypt, encoded as scrypt$n$r$p$salt$hash"""
+    salt = os.urandom(PASSWORD_SALT_BYTES)
+    digest = scrypt_digest(password, salt, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash is legacy SHA-256 or uses outdated scrypt parameters"""
+    return not hashed_password.startswith(f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}$")
+
+async def hash_password_async(password: str) -> str:
+    """hash_password in a worker thread so the event loop keeps serving requests"""
+    async with password_hash_slots:
+        return await asyncio.to_thread(hash_password, password)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """verify_password in a worker thread so login bursts do not block the event loop"""
+    async with password_hash_slots:
+        return await asyncio.to_thread(verify_password, password, hashed_password)
+
+# Token verification cache
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+class TokenCache:
+    """LRU cache of verified JWT claims keyed by token digest; entries expire with the token's exp"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        """user_id of a previously verified, unexpired token"""
+        key = self.digest(token)
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, token: str, user_id: str, expires_at: float):
+        if self.max_entries <= 0:
+            return
+        key = self.digest(token)
+        self.entries[key] = (user_id, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_ENTRIES)
 
 # Corruption Analysis Helper Functions
-async def call_lightrag_api_for_text(lightrag_url: str, text_content: str, query: str) -> Optional[str]:
-    """Call LightRAG API for word-based text analysis"""
-    try:
-        # Insert the text as a document
-        insert_url = f"{lightrag_url}/documents/text"
-        document_text = f"Text Analysis Content:\n{text_content}"
-
-        insert_payload = {
-            "text": document_text,
-            "file_source": f"word_analysis_{int(time.time())}"
-        }
+async def index_lightrag_documents(lightrag_url: str, documents: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """Insert the documents (file_source -> text) the ledger does not know yet in a single
+    LightRAG call and wait until they are indexed
+    
+    Returns the outcome per file_source: 'processed', 'failed', or None when
+    indexing could not be confirmed.
+    """
+    statuses: Dict[str, Optional[str]] = {}
+    content_hashes = {}
+    pending = {}
+    for file_source, document_text in documents.items():
+        content_hashes[file_source] = LightRAGInsertLedger.content_hash(document_text)
+        if await asyncio.to_thread(lightrag_ledger.lookup, lightrag_url, content_hashes[file_source]):
+            print(f"[LIGHTRAG] {file_source} unchanged since last insert, skipping indexing")
+            statuses[file_source] = "processed"
+        else:
+            pending[file_source] = document_text
+    if not pending:
+        return statuses
 
-        async with aiohttp.ClientSession() as session:
-            # Insert document
-            async with session.post(insert_url, json=insert_payload) as response:
-                if response.status != 200:
-                    print(f"Failed to insert document: {response.status}")
-                    return None
-
-            # Wait a bit for processing
-            await asyncio.sleep(2)
-
-            # Query the knowledge graph
-            query_url = f"{lightrag_url}/query"
-            query_payload = {
-                "query": query,
-                "mode": "hybrid",
-                "response_type": "Single Paragraph"
-            }
+    # Insert documents over the shared connection pool
+    if len(pending) == 1:
+        (file_source, document_text), = pending.items()
+        insert_url = f"{lightrag_url}/documents/text"
+        insert_payload = {"text": document_text, "file_source": file_source}
+    else:
+        insert_url = f"{lightrag_url}/documents/texts"
+        insert_payload = {"texts": list(pending.values()), "file_sources": list(pending)}
+    with lightrag_phase_seconds.time("insert"), lightrag_in_flight.track("insert"):
+        status, body = await lightrag_client.post_json(insert_url, insert_payload)
+    if status != 200:
+        print(f"Failed to insert {len(pending)} document(s): {status}")
+        statuses.update(dict.fromkeys(pending, "failed"))
+        return statuses
+
+    # Content LightRAG already stores is reported instead of being re-inserted
+    for existing in (body or {}).get("existing_documents") or []:
+        file_source = existing.get("file_source")
+        if file_source not in pending:
+            continue
+        del pending[file_source]
+        if str(existing.get("status")).lower().rsplit(".", 1)[-1] == "failed":
+            print(f"LightRAG failed to index document {file_source}")
+            statuses[file_source] = "failed"
+            continue
+        statuses[file_source] = "processed"
+        stale_doc_ids = await asyncio.to_thread(
+            lightrag_ledger.record, lightrag_url, content_hashes[file_source], file_source,
+            existing["track_id"], existing["doc_id"]
+        )
+        if stale_doc_ids:
+            await delete_lightrag_documents(lightrag_url, stale_doc_ids)
+    if not pending:
+        return statuses
+
+    # Wait for indexing to finish instead of a fixed delay
+    track_id = (body or {}).get("track_id")
+    if not track_id:
+        await asyncio.sleep(2)
+        statuses.update(dict.fromkeys(pending))
+        return statuses
+    with lightrag_phase_seconds.time("wait"), lightrag_in_flight.track("wait"):
+        final_status, tracked = await wait_for_lightrag_document(lightrag_url, track_id)
+    if final_status is None:
+        statuses.update(dict.fromkeys(pending))
+        return statuses
+
+    tracked_by_source = {document.get("file_path"): document for document in tracked}
+    for file_source in pending:
+        document = tracked_by_source.get(file_source)
+        if document is None and len(pending) == 1 and len(tracked) == 1:
+            document = tracked[0]
+        # Content LightRAG already held is not tracked under the new track_id
+        document_status = str((document or {}).get("status", "processed")).lower().rsplit(".", 1)[-1]
+        if document_status == "failed":
+            print(f"LightRAG failed to index document {file_source}")
+            statuses[file_source] = "failed"
+            continue
+        statuses[file_source] = "processed"
+        stale_doc_ids = await asyncio.to_thread(
+            lightrag_ledger.record, lightrag_url, content_hashes[file_source], file_source, track_id,
+            document.get("id") if document else None
+        )
+        if stale_doc_ids:
+            await delete_lightrag_documents(lightrag_url, stale_doc_ids)
+    return statuses
+
+async def query_lightrag(lightrag_url: str, query: str) -> Optional[str]:
+    """Query the LightRAG knowledge graph"""
+    query_url = f"{lightrag_url}/query"
+    query_payload = {
+        "query": query,
+        "mode": "hybrid",
+        "response_type": "Single Paragraph"
+    }
 
-            async with session.post(query_url, json=query_payload) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get("response", "")
-                else:
-                    print(f"Failed to query LightRAG: {response.status}")
-                    return None
+    with lightrag_phase_seconds.time("query"), lightrag_in_flight.track("query"):
+        status, result = await lightrag_client.post_json(query_url, query_payload)
+    if status == 200 and result is not None:
+        return result.get("response", "")
+    else:
+        print(f"Failed to query LightRAG: {status}")
+        return None
 
-    except Exception as e:
-        print(f"Error calling LightRAG API: {str(e)}")
+async def insert_and_query_lightrag(lightrag_url: str, document_text: str, file_source: str, query: str) -> Optional[str]:
+    """Insert a document into LightRAG unless the ledger shows it is already indexed,
+    wait until it is indexed, then query the knowledge graph"""
+    statuses = await index_lightrag_documents(lightrag_url, {file_source: document_text})
+    if statuses[file_source] == "failed":
         return None
+    return await query_lightrag(lightrag_url, query)
 
-async def call_lightrag_api(lightrag_url: str, contract_data: Dict, query: str) -> Optional[str]:
-    """Call LightRAG API for corruption analysis"""
-    try:
-        # First, insert the contract as a document
-        insert_url = f"{lightrag_url}/documents/text"
-        document_text = f"""Contract Title: {contract_data['contract_title']}
+def render_contract_document(contract_data: Dict) -> str:
+    """Render a contract as the document LightRAG indexes for corruption analysis"""
+    return f"""Contract Title: {contract_data['contract_title']}
 Contract ID: {contract_data['contract_id']}
 Contract Amount: ${contract_data['contract_amount']:,.2f}
 Contract Type: {contract_data['contract_type']}
@@ -237,64 +2128,340 @@ Contract Content: {contract_data['contract_content']}
 Created At: {contract_data['created_at']}
 Status: {contract_data['status']}"""
 
-        insert_payload = {
-            "text": document_text,
-            "file_source": f"contract_{contract_data['contract_id']}"
-        }
+def build_corruption_query(contract_data: Dict) -> str:
+    """Corruption analysis prompt for a contract"""
+    return f"""
+            Analyze this contract for potential corruption risks and provide a detailed assessment:
 
-        async with aiohttp.ClientSession() as session:
-            # Insert document
-            async with session.post(insert_url, json=insert_payload) as response:
-                if response.status != 200:
-                    print(f"Failed to insert document: {response.status}")
-                    return None
-
-            # Wait a bit for processing
-            await asyncio.sleep(2)
-
-            # Query the knowledge graph
-            query_url = f"{lightrag_url}/query"
-            query_payload = {
-                "query": query,
-                "mode": "hybrid",
-                "response_type": "Single Paragraph"
-            }
+            Contract: {contract_data['contract_title']}
+            Amount: ${contract_data['contract_amount']:,.2f}
+            Content: {contract_data['contract_content']}
 
-            async with session.post(query_url, json=query_payload) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get("response", "")
-                else:
-                    print(f"Failed to query LightRAG: {response.status}")
-                    return None
+            Please evaluate:
+            1. Risk level (Low, Medium, High, Critical)
+            2. Specific corruption indicators
+            3. Red flags that require immediate attention
+            4. Recommendations for risk mitigation
+
+            Provide a comprehensive analysis considering contract language, financial patterns, 
+            procedural irregularities, and potential conflicts of interest.
+            """
+
+async def call_lightrag_api_for_text(lightrag_url: str, text_content: str, query: str, source_id: Optional[str] = None) -> Optional[str]:
+    """Call LightRAG API for word-based text analysis"""
+    try:
+        document_text = f"Text Analysis Content:\n{text_content}"
+        source_id = source_id or LightRAGInsertLedger.content_hash(document_text)[:16]
+        return await analysis_cache.get_or_compute(
+            AnalysisResultCache.key("word", lightrag_url, document_text, query),
+            lambda: insert_and_query_lightrag(lightrag_url, document_text, f"word_analysis_{source_id}", query),
+        )
+
+    except Exception as e:
+        print(f"Error calling LightRAG API: {str(e)}")
+        return None
+
+async def call_lightrag_api(lightrag_url: str, contract_data: Dict, query: str) -> Optional[str]:
+    """Call LightRAG API for corruption analysis"""
+    try:
+        document_text = render_contract_document(contract_data)
+        return await analysis_cache.get_or_compute(
+            AnalysisResultCache.key("corruption", lightrag_url, document_text, query),
+            lambda: insert_and_query_lightrag(lightrag_url, document_text, f"contract_{contract_data['contract_id']}", query),
+        )
 
     except Exception as e:
         print(f"Error calling LightRAG API: {str(e)}")
         return None
 
 
-def parse_word_analysis_response(response_text: str, text_content: str, analysis_type: str) -> WordAnalysisResult:
+# Risk keyword scanning
+# Vocabularies map a label to regex fragments; spaces match any whitespace run
+RISK_LEVEL_TERMS = {
+    "Critical": ["critical", "very high", "extremely high"],
+    "High": ["high risk", "high", "severe"],
+    "Medium": ["medium", "moderate", "moderate risk"],
+    "Low": ["low", "minimal", "low risk"],
+}
+RISK_LEVEL_ORDER = ["Critical", "High", "Medium", "Low"]
+
+RESPONSE_SIGNAL_TERMS = {
+    "suspicious": ["suspicious(?:ly)?"],
+    "conflict_of_interest": ["conflicts? of interest"],
+    "review": ["review(?:s|ed|ing)?"],
+    "monitor": ["monitor(?:s|ed|ing)?"],
+    "irregular": ["irregular(?:ity|ities|ly)?"],
+    "compliance": ["(?:non-?)?compliance"],
+}
+
+class RiskKeywordScanner:
+    """Single-pass matcher for a fixed vocabulary of risk phrases
+    
+    Every phrase compiles into one case-insensitive regex alternation with word
+    boundaries, longest phrase first, so 'high risk' wins over 'high' and
+    'highlight' matches nothing.
+    """
+
+    def __init__(self, vocabularies: Dict[str, Dict[str, List[str]]]):
+        # A fragment shared by several categories is matched once and reported for each
+        fragments: Dict[str, List[Tuple[str, str]]] = {}
+        for category, terms in vocabularies.items():
+            for label, term_fragments in terms.items():
+                for fragment in term_fragments:
+                    fragments.setdefault(fragment.replace(" ", r"\s+"), []).append((category, label))
+        self.groups: Dict[str, List[Tuple[str, str]]] = {}
+        alternatives = []
+        for fragment in sorted(fragments, key=len, reverse=True):
+            group = f"g{len(self.groups)}"
+            self.groups[group] = fragments[fragment]
+            alternatives.append(f"(?P<{group}>{fragment})")
+        self.pattern = re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE)
+
+    def scan(self, text: str) -> List[Dict]:
+        """All non-overlapping matches in text order"""
+        matches = []
+        for match in self.pattern.finditer(text):
+            for category, label in self.groups[match.lastgroup]:
+                matches.append({
+                    "term": match.group(),
+                    "category": category,
+                    "label": label,
+                    "start": match.start(),
+                    "end": match.end(),
+                })
+        return matches
+
+    @staticmethod
+    def labels(matches: List[Dict], category: str) -> set:
+        return {match["label"] for match in matches if match["category"] == category}
+
+    @staticmethod
+    def risk_level(matches: List[Dict], default: str = "Medium") -> str:
+        """Most severe risk level mentioned"""
+        levels = RiskKeywordScanner.labels(matches, "risk_level")
+        return next((level for level in RISK_LEVEL_ORDER if level in levels), default)
+
+risk_keyword_scanner = RiskKeywordScanner({
+    "risk_level": RISK_LEVEL_TERMS,
+    "signal": RESPONSE_SIGNAL_TERMS,
+})
+
+# Sensitive-word lexicon (SENSITIVE_LEXICON_PATH points to a JSON file in the
+# DEFAULT_SENSITIVE_LEXICON format to replace the built-in dictionary)
+SENSITIVE_LEXICON_PATH = os.getenv("SENSITIVE_LEXICON_PATH", "")
+WORD_PRESCREEN_THRESHOLD = float(os.getenv("WORD_PRESCREEN_THRESHOLD", "3"))
+LEXICON_FUZZY_MIN_LENGTH = 5
+# Misspelled variants count for less and cannot escalate a text on their own
+LEXICON_FUZZY_WEIGHT = 0.5
+LEXICON_TOKEN_CACHE_SIZE = 50000
+LEXICON_TOKEN_PATTERN = re.compile(r"[a-z0-9@$]+(?:'[a-z]+)?")
+LEXICON_LEET_TABLE = str.maketrans("013457@$", "oieastas")
+LEXICON_SUFFIXES = (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", ""))
+
+DEFAULT_SENSITIVE_LEXICON = {
+    "bribery": {"weight": 3, "terms": ["bribe", "bribery", "kickback", "payoff", "under the table", "grease payment", "facilitation payment"]},
+    "concealment": {"weight": 2, "terms": ["off the books", "off book", "undisclosed", "side agreement", "side letter", "side deal", "confidential arrangement", "no paper trail"]},
+    "conflict_of_interest": {"weight": 2, "terms": ["conflict of interest", "related party"]},
+    "improper_payment": {"weight": 1, "terms": ["success fee", "finder fee", "consultancy fee", "consulting fee", "cash payment", "gift"]},
+    "procurement": {"weight": 1, "terms": ["sole source", "single source", "without tender", "without a tender", "no tender", "split order", "split contract", "expedite fee", "expediting fee"]},
+    "offshore": {"weight": 2, "terms": ["offshore", "shell company", "nominee"]},
+}
+
+class SensitiveLexicon:
+    """Token-level sensitive-term matcher with phrase and fuzzy-variant support
+    
+    Text is tokenized once; each token is normalized (case, leetspeak digits,
+    possessives) and stemmed the same way as the lexicon terms, then looked up
+    in a word table. A deletion index catches misspellings of longer words that
+    drop or add a single letter after the first one. Phrases are matched
+    greedily, longest first, from their first word.
+    """
+
+    def __init__(self, lexicon: Dict[str, Dict]):
+        self.lexicon = lexicon
+        # Raw token -> candidates; contract vocabularies repeat heavily
+        self.token_cache: Dict[str, Dict[str, bool]] = {}
+        self.words: set = set()
+        self.deletions: Dict[str, set] = {}
+        self.phrases: Dict[str, List[Tuple[Tuple[str, ...], str, str, float]]] = {}
+        for category, entry in lexicon.items():
+            weight = float(entry.get("weight", 1))
+            for term in entry["terms"]:
+                words = tuple(self.normalize(token) for token in LEXICON_TOKEN_PATTERN.findall(term.lower()))
+                if not words:
+                    continue
+                self.phrases.setdefault(words[0], []).append((words, term, category, weight))
+                for word in words:
+                    self.words.add(word)
+                    if len(word) >= LEXICON_FUZZY_MIN_LENGTH:
+                        for variant in self.deletion_variants(word):
+                            self.deletions.setdefault(variant, set()).add(word)
+        for candidates in self.phrases.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+    @classmethod
+    def load(cls, path: str) -> "SensitiveLexicon":
+        if not path:
+            return cls(DEFAULT_SENSITIVE_LEXICON)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def normalize(token: str) -> str:
+        if token.endswith("'s"):
+            token = token[:-2]
+        token = token.replace("'", "")
+        if not token.isalpha() and not token.isdigit():
+            token = token.translate(LEXICON_LEET_TABLE)
+        return SensitiveLexicon.stem(token)
+
+    @staticmethod
+    def stem(word: str) -> str:
+        """Drop one plural or verb suffix, then any trailing 'e'
+
+        'bribe', 'bribes', 'bribed' and 'bribing' all reduce to 'brib', and
+        'nominee' and 'nominees' both to 'nomin'.
+        """
+        if not word.endswith("ss"):
+            for suffix, replacement in LEXICON_SUFFIXES:
+                if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                    word = word[:-len(suffix)] + replacement
+                    break
+        while word.endswith("e") and len(word) > 3:
+            word = word[:-1]
+        return word
+
+    @staticmethod
+    def deletion_variants(word: str) -> set:
+        return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+    def candidates(self, word: str) -> Dict[str, bool]:
+        """Lexicon words a normalized token stands for, mapped to whether the match is fuzzy"""
+        if word in self.words:
+            return {word: False}
+        if len(word) < LEXICON_FUZZY_MIN_LENGTH - 1:
+            return {}
+        # One dropped letter (the token is a deletion variant of a lexicon word) or one
+        # extra letter (a lexicon word is a deletion variant of the token); substitutions
+        # would turn 'layoff' into 'payoff' and 'shall' into 'shell'
+        found = set(self.deletions.get(word, ()))
+        found.update(
+            variant for variant in self.deletion_variants(word)
+            if variant in self.words and len(variant) >= LEXICON_FUZZY_MIN_LENGTH
+        )
+        return {candidate: True for candidate in found if candidate[0] == word[0]}
+
+    def token_candidates(self, token: str) -> Dict[str, bool]:
+        found = self.token_cache.get(token)
+        if found is None:
+            if len(self.token_cache) >= LEXICON_TOKEN_CACHE_SIZE:
+                self.token_cache.clear()
+            found = self.token_cache[token] = self.candidates(self.normalize(token))
+        return found
+
+    def match(self, text: str) -> List[Dict]:
+        """Sensitive-term matches in text order with offsets, category and weight"""
+        lowered = text.lower()
+        tokens = [(token.group(), token.start(), token.end()) for token in LEXICON_TOKEN_PATTERN.finditer(lowered)]
+        token_candidates = [self.token_candidates(token) for token, _, _ in tokens]
+        matches = []
+        position = 0
+        while position < len(tokens):
+            best = None
+            # Hyphenated spellings such as 'off-shore' also count as the joined word
+            if position + 1 < len(tokens) and lowered[tokens[position][2]:tokens[position + 1][1]] == "-":
+                joined = self.candidates(self.normalize(tokens[position][0] + tokens[position + 1][0]))
+                for word, fuzzy in joined.items():
+                    for words, term, category, weight in self.phrases.get(word, ()):
+                        if len(words) == 1:
+                            best = (words, term, category, weight, fuzzy, 2)
+            for word, fuzzy in token_candidates[position].items():
+                for words, term, category, weight in self.phrases.get(word, ()):
+                    end = position + len(words)
+                    if end > len(tokens) or (best is not None and len(words) <= best[5]):
+                        continue
+                    if all(words[offset] in token_candidates[position + offset] for offset in range(1, len(words))):
+                        phrase_fuzzy = fuzzy or any(
+                            token_candidates[position + offset][words[offset]] for offset in range(1, len(words))
+                        )
+                        best = (words, term, category, weight, phrase_fuzzy, len(words))
+            if best is None:
+                position += 1
+                continue
+            words, term, category, weight, fuzzy, length = best
+            start, end = tokens[position][1], tokens[position + length - 1][2]
+            matches.append({
+                "term": text[start:end],
+                "category": "sensitive",
+                "label": category,
+                "start": start,
+                "end": end,
+                "canonical": term,
+                "fuzzy": fuzzy,
+                "weight": weight * LEXICON_FUZZY_WEIGHT if fuzzy else weight,
+            })
+            position += length
+        return matches
+
+    def prescreen(self, text: str, threshold: float = WORD_PRESCREEN_THRESHOLD) -> Dict:
+        """Score text locally; escalate is set when the weighted match total reaches threshold
+        and at least one match is exact"""
+        matches = self.match(text)
+        categories: Dict[str, int] = {}
+        for match in matches:
+            categories[match["label"]] = categories.get(match["label"], 0) + 1
+        score = sum(match["weight"] for match in matches)
+        exact = any(not match["fuzzy"] for match in matches)
+        return {"score": score, "matches": matches, "categories": categories, "escalate": exact and score >= threshold}
+
+sensitive_lexicon = SensitiveLexicon.load(SENSITIVE_LEXICON_PATH)
+word_prescreen_stats = {"local": 0, "escalated": 0}
+
+def find_sensitive_words(text: str) -> List[Dict]:
+    """Sensitive-term matches with positions, e.g. for pre-screening contracts locally"""
+    return sensitive_lexicon.match(text)
+
+def build_prescreen_word_analysis(text_content: str, analysis_type: str, prescreen: Dict) -> WordAnalysisResult:
+    """Word analysis result for text the local pre-screen found below the escalation threshold"""
+    found = sorted({match["canonical"] for match in prescreen["matches"]})
+    risk_score = min(45, 10 + int(prescreen["score"] * 5))
+    return WordAnalysisResult(
+        text_content=text_content[:500] + "..." if len(text_content) > 500 else text_content,
+        analysis_type=analysis_type,
+        corruption_risk_level="Low",
+        risk_score=risk_score,
+        key_findings=[f"Local pre-screen found: {', '.join(found)}"] if found else ["No sensitive terms found by local pre-screen"],
+        risk_indicators=[
+            f"Sensitive {category.replace('_', ' ')} terms found in text" for category in sorted(prescreen["categories"])
+        ] or ["No specific risk indicators detected"],
+        red_flags=["No critical red flags identified"],
+        recommendations=[
+            "Standard monitoring procedures are sufficient",
+            "Request a LightRAG analysis (force_lightrag) for a deeper review if needed"
+        ],
+        analysis_details=f"""Local Sensitive-Word Pre-Screen Report
+
+Analysis Type: {analysis_type.replace('_', ' ').title()}
+Pre-screen Score: {prescreen['score']:g} (escalation threshold {WORD_PRESCREEN_THRESHOLD:g})
+
+The contract text was matched against the sensitive-term dictionary, including
+phrases and misspelled variants, and scored below the threshold for AI review.
+
+Text Content Length: {len(text_content)} characters
+""",
+        analysis_timestamp=datetime.now().isoformat(),
+        sensitive_words=prescreen["matches"]
+    )
+
+def parse_word_analysis_response(response_text: str, text_content: str, analysis_type: str,
+                                 sensitive_words: Optional[List[Dict]] = None) -> WordAnalysisResult:
     """Parse LightRAG response for word-based analysis"""
     try:
-        # Extract risk level from response
-        risk_level = "Medium"  # Default
-        risk_score = 50  # Default
-        
-        response_lower = response_text.lower()
-        
-        # Risk level detection
-        if any(word in response_lower for word in ['critical', 'very high', 'extremely high']):
-            risk_level = "Critical"
-            risk_score = 85
-        elif any(word in response_lower for word in ['high risk', 'high', 'severe']):
-            risk_level = "High"
-            risk_score = 75
-        elif any(word in response_lower for word in ['medium', 'moderate', 'moderate risk']):
-            risk_level = "Medium"
-            risk_score = 50
-        elif any(word in response_lower for word in ['low', 'minimal', 'low risk']):
-            risk_level = "Low"
-            risk_score = 25
+        # Extract risk level and signals from response in one scan
+        matches = risk_keyword_scanner.scan(response_text)
+        risk_level = RiskKeywordScanner.risk_level(matches)
+        risk_score = {"Critical": 85, "High": 75, "Medium": 50, "Low": 25}[risk_level]
+        signals = RiskKeywordScanner.labels(matches, "signal")
         
         # Extract findings and indicators from response
         key_findings = []
@@ -302,19 +2469,24 @@ def parse_word_analysis_response(response_text: str, text_content: str, analysis
         red_flags = []
         recommendations = []
         
-        # Pattern extraction for demo
-        if 'suspicious' in response_lower:
+        if "suspicious" in signals:
             risk_indicators.append("Suspicious language patterns detected")
-        if 'conflict of interest' in response_lower:
+        if "conflict_of_interest" in signals:
             red_flags.append("Potential conflict of interest language")
-        if 'review' in response_lower:
+        if "review" in signals:
             recommendations.append("Additional review recommended")
-        if 'monitor' in response_lower:
+        if "monitor" in signals:
             recommendations.append("Enhanced monitoring suggested")
-        if 'irregular' in response_lower:
+        if "irregular" in signals:
             key_findings.append("Irregular patterns in text structure")
-        if 'compliance' in response_lower:
+        if "compliance" in signals:
             key_findings.append("Compliance-related content identified")
+        
+        # Sensitive terms located in the analyzed text itself
+        if sensitive_words is None:
+            sensitive_words = find_sensitive_words(text_content)
+        for category in sorted({match["label"] for match in sensitive_words}):
+            risk_indicators.append(f"Sensitive {category.replace('_', ' ')} terms found in text")
             
         # Default content for sensitive word detection
         if not key_findings:
@@ -361,7 +2533,8 @@ Analysis Timestamp: {datetime.now().isoformat()}
             red_flags=red_flags if red_flags else ["No critical red flags identified"],
             recommendations=recommendations,
             analysis_details=analysis_details,
-            analysis_timestamp=datetime.now().isoformat()
+            analysis_timestamp=datetime.now().isoformat(),
+            sensitive_words=sensitive_words
         )
         
     except Exception as e:
@@ -382,39 +2555,24 @@ Analysis Timestamp: {datetime.now().isoformat()}
 def parse_lightrag_response(response_text: str, contract_data: Dict) -> CorruptionAnalysisResult:
     """Parse LightRAG response and extract corruption analysis data"""
     try:
-        # Extract risk level from response
-        risk_level = "Medium"  # Default
-        risk_score = 50  # Default
-        
-        response_lower = response_text.lower()
-        
-        # Risk level detection
-        if any(word in response_lower for word in ['critical', 'very high', 'extremely high']):
-            risk_level = "Critical"
-            risk_score = 80
-        elif any(word in response_lower for word in ['high risk', 'high', 'severe']):
-            risk_level = "High"
-            risk_score = 70
-        elif any(word in response_lower for word in ['medium', 'moderate', 'moderate risk']):
-            risk_level = "Medium"
-            risk_score = 50
-        elif any(word in response_lower for word in ['low', 'minimal', 'low risk']):
-            risk_level = "Low"
-            risk_score = 30
+        # Extract risk level and signals from response in one scan
+        matches = risk_keyword_scanner.scan(response_text)
+        risk_level = RiskKeywordScanner.risk_level(matches)
+        risk_score = {"Critical": 80, "High": 70, "Medium": 50, "Low": 30}[risk_level]
+        signals = RiskKeywordScanner.labels(matches, "signal")
         
         # Extract indicators and red flags from response
         indicators = []
         red_flags = []
         recommendations = []
         
-        # Simple pattern extraction for demo
-        if 'suspicious' in response_lower:
+        if "suspicious" in signals:
             indicators.append("Suspicious patterns detected by AI analysis")
-        if 'conflict of interest' in response_lower:
+        if "conflict_of_interest" in signals:
             red_flags.append("Potential conflict of interest identified")
-        if 'review' in response_lower:
+        if "review" in signals:
             recommendations.append("Additional review recommended by AI analysis")
-        if 'monitor' in response_lower:
+        if "monitor" in signals:
             recommendations.append("Enhanced monitoring suggested")
             
         # Default recommendations
@@ -475,9 +2633,139 @@ Contract Details:
             analysis_timestamp=datetime.now().isoformat()
         )
 
+# Batch corruption analysis
+BATCH_ANALYSIS_CONCURRENCY = int(os.getenv("BATCH_ANALYSIS_CONCURRENCY", "8"))
+HIGH_RISK_LEVELS = {"High", "Critical"}
+IMMEDIATE_ATTENTION_SCORE = 60
+
+def batch_result_record(contract_data: Dict, analysis: Optional[CorruptionAnalysisResult], error: Optional[str] = None) -> Dict:
+    """Per-contract entry of a batch corruption analysis"""
+    record = {
+        "contract_id": contract_data["contract_id"],
+        "contract_title": contract_data["contract_title"],
+        "contract_amount": contract_data["contract_amount"],
+    }
+    if analysis is None:
+        record.update({
+            "status": "failed",
+            "corruption_risk_level": "Unknown",
+            "corruption_score": 0,
+            "risk_factors": [],
+            "recommendations": ["Retry the analysis once LightRAG is available"],
+            "error": error,
+        })
+    else:
+        record.update({
+            "status": "completed",
+            "corruption_risk_level": analysis.corruption_risk_level,
+            "corruption_score": analysis.risk_score,
+            "risk_factors": analysis.corruption_indicators + analysis.red_flags,
+            "recommendations": analysis.recommendations,
+        })
+    return record
+
+class BatchAnalysisSummary:
+    """Aggregate risk statistics accumulated as batch results arrive"""
+
+    def __init__(self, total_contracts: int):
+        self.total_contracts = total_contracts
+        self.completed = 0
+        self.failed = 0
+        self.total_contract_value = 0.0
+        self.total_risk_score = 0
+        self.high_risk_count = 0
+        self.immediate_attention = 0
+        self.risk_levels: Dict[str, int] = {}
+
+    def add(self, record: Dict):
+        self.total_contract_value += record["contract_amount"]
+        if record["status"] != "completed":
+            self.failed += 1
+            return
+        self.completed += 1
+        self.total_risk_score += record["corruption_score"]
+        level = record["corruption_risk_level"]
+        self.risk_levels[level] = self.risk_levels.get(level, 0) + 1
+        if level in HIGH_RISK_LEVELS:
+            self.high_risk_count += 1
+        if record["corruption_score"] >= IMMEDIATE_ATTENTION_SCORE:
+            self.immediate_attention += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "total_contracts": self.total_contracts,
+            "total_contracts_analyzed": self.completed,
+            "failed_contracts": self.failed,
+            "high_risk_contracts": self.high_risk_count,
+            "total_contract_value": self.total_contract_value,
+            "average_corruption_score": self.total_risk_score / self.completed if self.completed else 0,
+            "requires_immediate_attention": self.immediate_attention,
+            "risk_level_distribution": self.risk_levels,
+        }
+
+async def run_batch_corruption_analysis(lightrag_url: str, contracts: List[Dict]) -> AsyncIterator[Dict]:
+    """Analyze contracts concurrently, yielding each result record as it completes
+    
+    Contracts without a cached answer are indexed with one LightRAG batch insert;
+    queries then run under a BATCH_ANALYSIS_CONCURRENCY semaphore. A failing
+    contract yields a 'failed' record instead of aborting the batch.
+    """
+    documents = {}
+    queries = {}
+    for contract_data in contracts:
+        contract_id = contract_data["contract_id"]
+        document_text = render_contract_document(contract_data)
+        queries[contract_id] = build_corruption_query(contract_data)
+        cache_key = AnalysisResultCache.key("corruption", lightrag_url, document_text, queries[contract_id])
+        if analysis_cache.get(cache_key) is None:
+            documents[f"contract_{contract_id}"] = document_text
+
+    index_statuses: Dict[str, Optional[str]] = {}
+    if documents:
+        try:
+            index_statuses = await index_lightrag_documents(lightrag_url, documents)
+        except Exception as e:
+            print(f"Batch LightRAG insert failed: {str(e)}")
+            index_statuses = dict.fromkeys(documents, "failed")
+
+    semaphore = asyncio.Semaphore(BATCH_ANALYSIS_CONCURRENCY)
+
+    async def analyze(contract_data: Dict) -> Dict:
+        contract_id = contract_data["contract_id"]
+        if index_statuses.get(f"contract_{contract_id}") == "failed":
+            return batch_result_record(contract_data, None, "LightRAG could not index the contract")
+        async with semaphore:
+            try:
+                response = await analysis_cache.get_or_compute(
+                    AnalysisResultCache.key("corruption", lightrag_url, render_contract_document(contract_data), queries[contract_id]),
+                    lambda: query_lightrag(lightrag_url, queries[contract_id]),
+                )
+            except Exception as e:
+                print(f"Error analyzing contract {contract_id}: {str(e)}")
+                return batch_result_record(contract_data, None, str(e))
+        if response is None:
+            return batch_result_record(contract_data, None, "LightRAG query failed")
+        return batch_result_record(contract_data, parse_lightrag_response(response, contract_data))
+
+    tasks = [asyncio.create_task(analyze(contract_data)) for contract_data in contracts]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        # A client that stops reading the stream cancels the remaining analyses
+        for task in tasks:
+            task.cancel()
+
 def verify_password(password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return hash_password(password) == hashed_password
+    """Verify password against a scrypt hash, or a legacy unsalted SHA-256 hash"""
+    if hashed_password.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, expected = hashed_password.split("$")
+            digest = scrypt_digest(password, bytes.fromhex(salt), int(n), int(r), int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(digest.hex(), expected)
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed_password)
 
 def create_access_token(user_id: str) -> str:
     """Create JWT access token"""
@@ -488,17 +2776,21 @@ def create_access_token(user_id: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Verify JWT token and return user_id"""
     try:
         token = credentials.credentials
         if not token:
             raise HTTPException(status_code=401, detail="No token provided")
         
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("user_id")
+        user_id = token_cache.get(token)
         if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token - no user_id")
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            user_id = payload.get("user_id")
+            if user_id is None:
+                raise HTTPException(status_code=401, detail="Invalid token - no user_id")
+            if "exp" in payload:
+                token_cache.put(token, user_id, float(payload["exp"]))
         if user_id not in users_db:
             raise HTTPException(status_code=401, detail=f"User not found: {user_id}")
         return user_id
@@ -507,23 +2799,20 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
     except jwt.PyJWTError as e:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def get_current_user(user_id: str = Depends(verify_token)) -> dict:
+async def get_current_user(user_id: str = Depends(verify_token)) -> dict:
     """Get current user from token"""
     return users_db[user_id]
 
 # Initialize demo data
 def initialize_demo_data():
     """Initialize demo users and contracts for testing"""
-    # Clear existing data first
-    users_db.clear()
-    contracts_db.clear()
-    
-    # Demo users
+    # Users and contracts persist across restarts (and are shared between
+    # workers), so only seed what is missing
     demo_users = [
         {
             "user_name": "Alice Demo",
             "user_id": "alice001",
-            "user_password": hash_password("password123"),
+            "user_password": "password123",
             "company": "ABC Company",
             "e_signature": "alice001_signature_hash",
             "created_at": datetime.now().isoformat(),
@@ -532,7 +2821,7 @@ def initialize_demo_data():
         {
             "user_name": "Bob Wilson",
             "user_id": "bob002",
-            "user_password": hash_password("password123"),
+            "user_password": "password123",
             "company": "ABC Company",
             "e_signature": "bob002_signature_hash",
             "created_at": datetime.now().isoformat(),
@@ -541,7 +2830,7 @@ def initialize_demo_data():
         {
             "user_name": "Carol Davis",
             "user_id": "carol003",
-            "user_password": hash_password("password123"),
+            "user_password": "password123",
             "company": "XYZ Corporation",
             "e_signature": "carol003_signature_hash",
             "created_at": datetime.now().isoformat(),
@@ -550,10 +2839,13 @@ def initialize_demo_data():
     ]
     
     for user in demo_users:
-        users_db[user["user_id"]] = user
+        if user["user_id"] not in users_db:
+            user["user_password"] = hash_password(user["user_password"])
+            users_db.add(user)
     
-    # Demo contracts with clean state
-    global contract_counter
+    # Seed the demo contract into an empty store
+    if len(contracts_db) > 0:
+        return
     demo_contract = {
         "contract_id": "CONT_000001",
         "contract_title": "Software Development Agreement",
@@ -572,8 +2864,11 @@ def initialize_demo_data():
         "blockchain_index": None
     }
     
-    contracts_db["CONT_000001"] = demo_contract
-    contract_counter = 2
+    try:
+        contracts_db["CONT_000001"] = demo_contract
+    except sqlite3.IntegrityError:
+        # Another worker seeded it first
+        contracts_db.refresh()
 
 # Initialize demo data on startup
 initialize_demo_data()
@@ -586,22 +2881,19 @@ async def register(user_data: UserRegister):
     if user_data.user_id in users_db:
         raise HTTPException(status_code=400, detail="User ID already exists")
     
-    # Validate company (add to list if not exists)
-    if user_data.company not in companies_db:
-        companies_db.append(user_data.company)
-    
     # Create user
     user_dict = {
         "user_name": user_data.user_name,
         "user_id": user_data.user_id,
-        "user_password": hash_password(user_data.user_password),
+        "user_password": await hash_password_async(user_data.user_password),
         "company": user_data.company,
         "e_signature": f"{user_data.user_id}_signature_hash",
         "created_at": datetime.now().isoformat(),
         "last_login": datetime.now().isoformat()
     }
     
-    users_db[user_data.user_id] = user_dict
+    if not users_db.add(user_dict):
+        raise HTTPException(status_code=400, detail="User ID already exists")
     
     # Create token
     token = create_access_token(user_data.user_id)
@@ -626,11 +2918,16 @@ async def login(credentials: UserLogin):
     user = users_db[credentials.user_id]
     
     # Verify password
-    if not verify_password(credentials.user_password, user["user_password"]):
+    if not await verify_password_async(credentials.user_password, user["user_password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    # Upgrade legacy SHA-256 or outdated scrypt hashes now that the password is known
+    if password_needs_rehash(user["user_password"]):
+        user["user_password"] = await hash_password_async(credentials.user_password)
+    
     # Update last login
-    users_db[credentials.user_id]["last_login"] = datetime.now().isoformat()
+    user["last_login"] = datetime.now().isoformat()
+    users_db[credentials.user_id] = user
     
     # Create token
     token = create_access_token(credentials.user_id)
@@ -667,7 +2964,8 @@ async def get_companies():
     """Get all available companies"""
     return {
         "success": True,
-        "companies": companies_db
+        # Registered users' companies join the list (also across workers)
+        "companies": companies_db + [company for company in users_db.companies() if company not in companies_db]
     }
 
 @app.get("/auth/users")
@@ -687,8 +2985,6 @@ async def get_all_users(current_user: dict = Depends(get_current_user)):
 @app.post("/api/contract/upload")
 async def upload_contract(contract_data: ContractUpload, current_user: dict = Depends(get_current_user)):
     """Upload a new contract for signing"""
-    global contract_counter
-    
     try:
         print(f"[UPLOAD] User {current_user['user_id']} uploading contract: {contract_data.contract_title}")
         
@@ -718,8 +3014,7 @@ async def upload_contract(contract_data: ContractUpload, current_user: dict = De
             contract_data.uploader = current_user["user_id"]
         
         # Generate contract ID
-        contract_id = f"CONT_{contract_counter:06d}"
-        contract_counter += 1
+        contract_id = f"CONT_{contracts_db.next_contract_number():06d}"
         
         # Determine required signatures based on contract type
         required_companies = [current_user["company"]]
@@ -753,6 +3048,7 @@ async def upload_contract(contract_data: ContractUpload, current_user: dict = De
         }
         
         contracts_db[contract_id] = pending_contract
+        contract_preanalysis.submit(contract_id)
         
         print(f"[UPLOAD] Contract {contract_id} created successfully for {current_user['company']}")
         
@@ -770,51 +3066,67 @@ async def upload_contract(contract_data: ContractUpload, current_user: dict = De
         raise HTTPException(status_code=500, detail=f"Failed to upload contract: {str(e)}")
 
 @app.get("/api/contracts/pending")
-async def get_pending_contracts(current_user: dict = Depends(get_current_user)):
-    """Get all pending contracts for the user's company"""
+async def get_pending_contracts(
+    current_user: dict = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    """Get pending contracts for the user's company, oldest first
+    
+    Without a limit every pending contract is returned; with one, pass the returned
+    next_cursor as cursor to fetch the following page.
+    """
     user_company = current_user["company"]
     user_id = current_user["user_id"]
+    validate_contract_page_limit(limit)
     
     print(f"API: get_pending_contracts called by user {user_id} from {user_company}")
     
-    # Filter contracts that involve the user's company and are pending
-    relevant_contracts = []
-    for contract_id, contract in contracts_db.items():
-        if (contract["uploader_company"] == user_company or 
-            contract.get("other_company") == user_company) and contract["status"] == "pending":
-            relevant_contracts.append(contract.copy())  # Return a copy to avoid mutation
+    # Company/status index lookup; return copies to avoid mutation
+    page_limit = limit + 1 if limit is not None else None
+    relevant_contracts, page = contract_page(
+        [contract.copy() for contract in contracts_db.for_company(user_company, "pending", cursor, page_limit)],
+        limit
+    )
     
     print(f"API: Found {len(relevant_contracts)} pending contracts for {user_id}")
     
     return {
         "success": True,
         "contracts": relevant_contracts,
-        "pending_count": len(relevant_contracts),
-        "user_company": user_company
+        "pending_count": contracts_db.count(("company_status", user_company, "pending")),
+        "user_company": user_company,
+        **page
     }
 
 @app.get("/api/contracts/all")
-async def get_all_contracts(current_user: dict = Depends(get_current_user)):
-    """Get all contracts accessible to the user"""
+async def get_all_contracts(
+    current_user: dict = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    """Get contracts accessible to the user, oldest first (paged like /api/contracts/pending)"""
     user_company = current_user["company"]
     user_id = current_user["user_id"]
+    validate_contract_page_limit(limit)
     
     print(f"API: get_all_contracts called by user {user_id} from {user_company}")
     
-    # Filter contracts that involve the user's company
-    relevant_contracts = []
-    for contract_id, contract in contracts_db.items():
-        if (contract["uploader_company"] == user_company or 
-            contract.get("other_company") == user_company):
-            relevant_contracts.append(contract.copy())  # Return a copy to avoid mutation
+    # Company index lookup; return copies to avoid mutation
+    page_limit = limit + 1 if limit is not None else None
+    relevant_contracts, page = contract_page(
+        [contract.copy() for contract in contracts_db.for_company(user_company, after=cursor, limit=page_limit)],
+        limit
+    )
     
     print(f"API: Found {len(relevant_contracts)} contracts for {user_id}")
     
     return {
         "success": True,
         "contracts": relevant_contracts,
-        "total_count": len(relevant_contracts),
-        "user_company": user_company
+        "total_count": contracts_db.count(("company", user_company)),
+        "user_company": user_company,
+        **page
     }
 
 @app.get("/api/contract/{contract_id}")
@@ -865,6 +3177,7 @@ async def sign_contract(contract_id: str, current_user: dict = Depends(get_curre
     
     # Add user's signature
     contract["company_signatures"][user_company].append(user_id)
+    contracts_db[contract_id] = contract
     
     # Check if all required signatures are collected
     all_signed = True
@@ -892,31 +3205,37 @@ async def sign_contract(contract_id: str, current_user: dict = Depends(get_curre
         
         transaction_data.timestamp = int(time.time())
         
-        # Add to blockchain using C++ implementation
+        # Queue for the next block; the mempool seals it with other signed contracts
+        contract["status"] = "sealing"
+        contracts_db[contract_id] = contract
         try:
-            chain.addBlock(transaction_data)
-            block_index = chain.getChainSize() - 1
+            block_index, tx_index = await block_mempool.submit(transaction_data)
             
-            # Validate blockchain integrity after adding
-            if not chain.isChainValid():
+            # sealBlock verifies only the new block against the validated prefix
+            if not chain.isChainValidCached():
                 print(f"[BLOCKCHAIN ERROR] Blockchain validation failed after adding contract {contract_id}")
                 raise Exception("Blockchain validation failed")
             
             print(f"[BLOCKCHAIN] Contract {contract_id} successfully added at block index {block_index}")
             
         except Exception as e:
+            contract["status"] = "pending"
+            contracts_db[contract_id] = contract
             print(f"[BLOCKCHAIN ERROR] Failed to add contract to blockchain: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to add contract to blockchain: {str(e)}")
         
         # Update contract status
         contract["status"] = "completed"
         contract["blockchain_index"] = block_index
+        contract["blockchain_tx_index"] = tx_index
+        contracts_db[contract_id] = contract
         
         return {
             "success": True,
             "message": "Contract signed successfully and added to blockchain",
             "contract_id": contract_id,
             "blockchain_index": block_index,
+            "blockchain_tx_index": tx_index,
             "status": "completed"
         }
     else:
@@ -932,12 +3251,10 @@ async def get_user_contracts_on_blockchain(current_user: dict = Depends(get_curr
     """Get contracts that the user has uploaded and are on the blockchain"""
     user_id = current_user["user_id"]
     
-    blockchain_contracts = []
-    for contract in contracts_db.values():
-        if (contract["uploader"] == user_id and 
-            contract["status"] == "completed" and 
-            contract["blockchain_index"] is not None):
-            blockchain_contracts.append(contract)
+    blockchain_contracts = [
+        contract for contract in contracts_db.for_uploader(user_id, "completed")
+        if contract["blockchain_index"] is not None
+    ]
     
     return {
         "success": True,
@@ -962,23 +3279,20 @@ async def debug_contracts(current_user: dict = Depends(get_current_user)):
         "accessible_contracts": 0
     }
     
-    for contract_id, contract in contracts_db.items():
-        access_check = (contract["uploader_company"] == user_company or 
-                       contract.get("other_company") == user_company)
-        
+    # Only the user's own contracts are broken down; the rest are counted
+    for contract in contracts_db.for_company(user_company):
         contract_info = {
-            "contract_id": contract_id,
+            "contract_id": contract["contract_id"],
             "title": contract["contract_title"],
             "uploader_company": contract["uploader_company"],
             "other_company": contract.get("other_company"),
             "status": contract["status"],
-            "user_has_access": access_check,
+            "user_has_access": True,
             "signatures": contract["company_signatures"]
         }
         
         debug_info["contracts_breakdown"].append(contract_info)
-        if access_check:
-            debug_info["accessible_contracts"] += 1
+        debug_info["accessible_contracts"] += 1
     
     return debug_info
 
@@ -986,6 +3300,14 @@ async def debug_contracts(current_user: dict = Depends(get_current_user)):
 async def read_root():
     return {"message": "Replica API is running", "platform": "Contract Management with Blockchain", "using": "C++ implementation"}
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Latency histograms and gauges in OpenMetrics text format (per worker process)"""
+    return Response(
+        content=metrics.render(),
+        media_type="application/openmetrics-text; version=1.0.0; charset=utf-8"
+    )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint to monitor server status"""
@@ -995,6 +3317,15 @@ async def health_check():
         "contracts_count": len(contracts_db),
         "users_count": len(users_db),
         "blockchain_size": chain.getChainSize() if chain else 0,
+        "lightrag_pool": lightrag_client.pool_stats(),
+        "lightrag_ledger": lightrag_ledger.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "analysis_jobs": analysis_jobs.stats(),
+        "contract_preanalysis": contract_preanalysis.stats(),
+        "word_prescreen": word_prescreen_stats,
+        "token_cache": token_cache.stats(),
+        "contracts_store": contracts_db.stats(),
+        "workers": {"configured": API_WORKERS, "pid": os.getpid(), "shared_state": SHARED_STATE},
         "version": "1.0.0"
     }
 
@@ -1030,13 +3361,15 @@ async def create_contract(contract: Contract):
     except:
         transaction_data.timestamp = int(time.time())
     
-    # Add block to chain
-    chain.addBlock(transaction_data)
+    # Add block to chain (hashing and the log append run off the event loop)
+    with blockchain_call_seconds.time("addBlock"):
+        block_index = await asyncio.to_thread(chain.addBlock, transaction_data)
+    blockchain_index.catch_up()
     
     return {
         "message": "Contract created successfully", 
         "contract": contract,
-        "block_index": chain.getChainSize() - 1
+        "block_index": block_index
     }
 
 @app.get("/api/contract")
@@ -1045,124 +3378,108 @@ async def get_contract():
 
 @app.get("/api/block/{index}")
 async def get_block(index: int):
+    if index < 0 or index >= chain.getChainSize():
+        raise HTTPException(status_code=404, detail="Block not found: Block index out of range")
     try:
-        block = chain.getBlock(index)
-        block_data = block.getData()
-        
-        # Parse contract information from transaction keys
-        contract_info = {}
-        if block_data.senderKey.startswith("CONTRACT_"):
-            # Extract contract ID and company from sender key
-            parts = block_data.senderKey.split("_")
-            if len(parts) >= 3:
-                contract_info["contract_id"] = f"{parts[1]}_{parts[2]}"
-                contract_info["uploader_company"] = "_".join(parts[3:]) if len(parts) > 3 else parts[2]
-        
-        if block_data.receiverKey.startswith("CROSSCOMPANY_"):
-            contract_info["type"] = "cross-company"
-            contract_info["partner_company"] = block_data.receiverKey.replace("CROSSCOMPANY_", "")
-        elif block_data.receiverKey.startswith("INTERNAL_"):
-            contract_info["type"] = "internal"
-            contract_info["company"] = block_data.receiverKey.replace("INTERNAL_", "")
-        
-        response_data = {
-            "index": block.getIndex(),
-            "hash": str(block.getHash()),
-            "previousHash": str(block.getPreviousHash()),
-            "data": {
-                "amount": block_data.amount,
-                "senderKey": block_data.senderKey,
-                "receiverKey": block_data.receiverKey,
-                "timestamp": block_data.timestamp,
-                "timestamp_readable": datetime.fromtimestamp(block_data.timestamp).isoformat()
-            },
-            "contract_info": contract_info,
-            "is_valid": block.isHashValid()
-        }
+        with blockchain_call_seconds.time("getBlock"):
+            batch = chain.getBlocks(index, 1)
+        response_data = build_block_records(batch)[0]
         return {
             "message": "Block retrieved successfully", 
             "block": response_data,
-            "blockchain_valid": chain.isChainValid()
+            "blockchain_valid": chain.isChainValidCached()
         }
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Block not found: {str(e)}")
 
 @app.get("/api/blockchain/validate")
 async def validate_blockchain():
-    is_valid = chain.isChainValid()
+    with blockchain_call_seconds.time("isChainValid"):
+        is_valid = await asyncio.to_thread(chain.isChainValid)
     return {
         "message": "Blockchain validation completed",
         "is_valid": is_valid,
         "chain_size": chain.getChainSize()
     }
 
+@app.get("/api/blockchain/verify")
+async def verify_blockchain_range(start: int = 0, end: Optional[int] = None):
+    """Verify a range of blocks [start, end) without a full rescan"""
+    chain_size = chain.getChainSize()
+    if end is None or end > chain_size:
+        end = chain_size
+    if start < 0 or start > end:
+        raise HTTPException(status_code=400, detail="Invalid block range")
+    
+    range_valid = await audit_blockchain(start, end)
+    return {
+        "message": "Blockchain range verification completed",
+        "start": start,
+        "end": end,
+        "range_valid": range_valid,
+        "is_valid": chain.isChainValidCached(),
+        "validated_from": chain.getValidatedFrom(),
+        "validated_up_to": chain.getValidatedUpTo(),
+        "audit_pending": chain.getValidatedFrom() > 0,
+        "chain_size": chain_size
+    }
+
 @app.get("/api/blockchain/info")
 async def get_blockchain_info():
     return {
         "message": "Blockchain info",
         "chain_size": chain.getChainSize(),
-        "is_valid": chain.isChainValid(),
+        "is_valid": chain.isChainValidCached(),
+        "validated_from": chain.getValidatedFrom(),
+        "validated_up_to": chain.getValidatedUpTo(),
+        "audit_pending": chain.getValidatedFrom() > 0,
+        "persistent": chain.isPersistent(),
+        "pending_transactions": len(block_mempool.pending),
         "using": "C++ implementation"
     }
 
 @app.get("/api/blockchain/explore")
-async def explore_blockchain():
-    """Get all blocks in the blockchain for exploration"""
+async def explore_blockchain(request: Request, cursor: Optional[int] = None, limit: int = EXPLORER_DEFAULT_LIMIT):
+    """Get a page of blocks, newest first, for exploration
+    
+    The cursor is the index of the newest block to return (defaults to the chain tip);
+    pass the returned next_cursor to fetch the following page.
+    """
+    if limit < 1 or limit > EXPLORER_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {EXPLORER_MAX_LIMIT}")
+    if cursor is not None and cursor < 0:
+        raise HTTPException(status_code=400, detail="cursor must be a non-negative block index")
+    
     try:
         chain_size = chain.getChainSize()
-        blocks = []
-        
-        for i in range(chain_size):
-            try:
-                block = chain.getBlock(i)
-                block_data = block.getData()
-                
-                # Parse contract information from transaction keys
-                contract_info = {}
-                if block_data.senderKey.startswith("CONTRACT_"):
-                    # Extract contract ID and company from sender key
-                    parts = block_data.senderKey.split("_")
-                    if len(parts) >= 3:
-                        contract_info["contract_id"] = f"{parts[1]}_{parts[2]}"
-                        contract_info["uploader_company"] = "_".join(parts[3:]) if len(parts) > 3 else parts[2]
-                
-                if block_data.receiverKey.startswith("CROSSCOMPANY_"):
-                    contract_info["type"] = "cross-company"
-                    contract_info["partner_company"] = block_data.receiverKey.replace("CROSSCOMPANY_", "")
-                elif block_data.receiverKey.startswith("INTERNAL_"):
-                    contract_info["type"] = "internal"
-                    contract_info["company"] = block_data.receiverKey.replace("INTERNAL_", "")
-                
-                block_info = {
-                    "index": block.getIndex(),
-                    "hash": str(block.getHash()),
-                    "previousHash": str(block.getPreviousHash()),
-                    "data": {
-                        "amount": block_data.amount,
-                        "senderKey": block_data.senderKey,
-                        "receiverKey": block_data.receiverKey,
-                        "timestamp": block_data.timestamp,
-                        "timestamp_readable": datetime.fromtimestamp(block_data.timestamp).isoformat()
-                    },
-                    "contract_info": contract_info,
-                    "is_valid": block.isHashValid()
-                }
-                blocks.append(block_info)
-                
-            except Exception as e:
-                print(f"Error reading block {i}: {str(e)}")
-                blocks.append({
-                    "index": i,
-                    "error": f"Failed to read block: {str(e)}"
-                })
-        
-        return {
-            "message": "Blockchain exploration data",
-            "chain_size": chain_size,
-            "is_valid": chain.isChainValid(),
-            "blocks": blocks,
-            "using": "C++ implementation"
-        }
+        if cursor is None or cursor >= chain_size:
+            cursor = chain_size - 1
+        
+        etag = blockchain_page_etag(cursor, limit, chain_size)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        start = max(0, cursor - limit + 1)
+        with blockchain_call_seconds.time("getBlocks"):
+            batch = chain.getBlocks(start, cursor - start + 1)
+        blocks = build_block_records(batch)
+        blocks.reverse()
+        next_cursor = start - 1 if start > 0 else None
+        
+        return JSONResponse(
+            content={
+                "message": "Blockchain exploration data",
+                "chain_size": chain_size,
+                "is_valid": chain.isChainValidCached(),
+                "blocks": blocks,
+                "cursor": cursor,
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+                "using": "C++ implementation"
+            },
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to explore blockchain: {str(e)}")
@@ -1172,161 +3489,93 @@ async def get_blockchain_contracts(current_user: dict = Depends(get_current_user
     """Get all contracts stored on the blockchain for the current user's company"""
     try:
         user_company = current_user["company"]
-        chain_size = chain.getChainSize()
-        user_contracts = []
-        
-        for i in range(chain_size):
-            try:
-                block = chain.getBlock(i)
-                block_data = block.getData()
-                
-                # Check if this block contains a contract for the user's company
-                is_user_contract = False
-                contract_info = {}
-                
-                if block_data.senderKey.startswith("CONTRACT_"):
-                    # Extract contract information
-                    parts = block_data.senderKey.split("_")
-                    if len(parts) >= 3:
-                        contract_info["contract_id"] = f"{parts[1]}_{parts[2]}"
-                        uploader_company = "_".join(parts[3:]) if len(parts) > 3 else parts[2]
-                        contract_info["uploader_company"] = uploader_company
-                        
-                        # Check if user's company is involved
-                        if uploader_company == user_company:
-                            is_user_contract = True
-                
-                if block_data.receiverKey.startswith("CROSSCOMPANY_"):
-                    partner_company = block_data.receiverKey.replace("CROSSCOMPANY_", "")
-                    contract_info["type"] = "cross-company"
-                    contract_info["partner_company"] = partner_company
-                    
-                    # Check if user's company is the partner
-                    if partner_company == user_company:
-                        is_user_contract = True
-                        
-                elif block_data.receiverKey.startswith("INTERNAL_"):
-                    company = block_data.receiverKey.replace("INTERNAL_", "")
-                    contract_info["type"] = "internal"
-                    contract_info["company"] = company
-                    
-                    if company == user_company:
-                        is_user_contract = True
-                
-                if is_user_contract:
-                    contract = {
-                        "block_index": block.getIndex(),
-                        "hash": str(block.getHash()),
-                        "data": {
-                            "amount": block_data.amount,
-                            "senderKey": block_data.senderKey,
-                            "receiverKey": block_data.receiverKey,
-                            "timestamp": block_data.timestamp,
-                            "timestamp_readable": datetime.fromtimestamp(block_data.timestamp).isoformat()
-                        },
-                        "contract_info": contract_info,
-                        "is_valid": block.isHashValid()
-                    }
-                    user_contracts.append(contract)
-                    
-            except Exception as e:
-                print(f"Error reading block {i}: {str(e)}")
+        user_contracts = fetch_contract_records(blockchain_index.transactions_for_company(user_company))
         
         return {
             "message": f"Blockchain contracts for {user_company}",
             "company": user_company,
             "contracts_count": len(user_contracts),
             "contracts": user_contracts,
-            "blockchain_valid": chain.isChainValid()
+            "blockchain_valid": chain.isChainValidCached()
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get blockchain contracts: {str(e)}")
 
+@app.get("/api/blockchain/contract/{contract_id}")
+async def get_blockchain_contract(contract_id: str, current_user: dict = Depends(get_current_user)):
+    """Get the on-chain transaction of a contract by its contract ID"""
+    position = blockchain_index.transaction_for_contract(contract_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="Contract not found on blockchain")
+    
+    contract_record = fetch_contract_records([position])[0]
+    if not is_company_contract(contract_record["contract_info"], current_user["company"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return {
+        "message": "Blockchain contract retrieved successfully",
+        "contract": contract_record,
+        "blockchain_valid": chain.isChainValidCached()
+    }
+
+@app.get("/api/blockchain/contract/{contract_id}/proof")
+async def get_blockchain_contract_proof(contract_id: str, current_user: dict = Depends(get_current_user)):
+    """Get a Merkle inclusion proof tying a contract's transaction to its block header"""
+    position = blockchain_index.transaction_for_contract(contract_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="Contract not found on blockchain")
+    
+    contract_record = fetch_contract_records([position])[0]
+    if not is_company_contract(contract_record["contract_info"], current_user["company"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    block_index, tx_index = position
+    with blockchain_call_seconds.time("getMerkleProof"):
+        proof = chain.getMerkleProof(block_index, tx_index)
+    # Recompute the leaf from the transaction itself rather than trusting the stored leaf
+    transaction = contract_record["data"]
+    leaf_hash = blockchain.hashTransaction(blockchain.TransactionData(
+        transaction["amount"], transaction["senderKey"], transaction["receiverKey"], transaction["timestamp"]
+    ))
+    
+    return {
+        "message": "Merkle proof generated successfully",
+        "contract_id": contract_id,
+        "block_index": block_index,
+        "tx_index": tx_index,
+        "block_hash": proof["blockHash"],
+        "merkle_root": proof["merkleRoot"],
+        "leaf_hash": leaf_hash,
+        "proof": proof["path"],
+        "verified": leaf_hash == proof["leafHash"] and verify_merkle_proof(leaf_hash, proof["path"], proof["merkleRoot"]),
+        "block_verified": contract_record["is_valid"],
+        "blockchain_valid": chain.isChainValidCached()
+    }
+
 @app.get("/api/blockchain/export")
-async def export_blockchain_data(current_user: dict = Depends(get_current_user), include_user_contracts: bool = True):
-    """Export complete blockchain data as JSON"""
-    try:
-        user_company = current_user["company"]
-        user_id = current_user["user_id"]
-        
-        # Get blockchain info
-        chain_size = chain.getChainSize()
-        is_valid = chain.isChainValid()
-        
-        # Get all blocks
-        blocks = []
-        for i in range(chain_size):
-            try:
-                block = chain.getBlock(i)
-                block_data = block.getData()
-                
-                # Parse contract information from transaction keys
-                contract_info = {}
-                if block_data.senderKey.startswith("CONTRACT_"):
-                    # Extract contract ID and company from sender key
-                    parts = block_data.senderKey.split("_")
-                    if len(parts) >= 3:
-                        contract_info["contract_id"] = f"{parts[1]}_{parts[2]}"
-                        contract_info["uploader_company"] = "_".join(parts[3:]) if len(parts) > 3 else parts[2]
-                
-                if block_data.receiverKey.startswith("CROSSCOMPANY_"):
-                    contract_info["type"] = "cross-company"
-                    contract_info["partner_company"] = block_data.receiverKey.replace("CROSSCOMPANY_", "")
-                elif block_data.receiverKey.startswith("INTERNAL_"):
-                    contract_info["type"] = "internal"
-                    contract_info["company"] = block_data.receiverKey.replace("INTERNAL_", "")
-                
-                block_info = {
-                    "index": block.getIndex(),
-                    "hash": str(block.getHash()),
-                    "previousHash": str(block.getPreviousHash()),
-                    "data": {
-                        "amount": block_data.amount,
-                        "senderKey": block_data.senderKey,
-                        "receiverKey": block_data.receiverKey,
-                        "timestamp": block_data.timestamp,
-                        "timestamp_readable": datetime.fromtimestamp(block_data.timestamp).isoformat()
-                    },
-                    "contract_info": contract_info,
-                    "is_valid": block.isHashValid()
-                }
-                blocks.append(block_info)
-                
-            except Exception as e:
-                print(f"Error reading block {i}: {str(e)}")
-                blocks.append({
-                    "index": i,
-                    "error": f"Failed to read block: {str(e)}"
-                })
-        
-        # Prepare export data
-        export_data = {
-            "exported_at": datetime.now().isoformat(),
-            "blockchain_info": {
-                "chain_size": chain_size,
-                "is_valid": is_valid,
-                "using": "C++ implementation"
-            },
-            "blocks": blocks,
-            "export_metadata": {
-                "user": user_id,
-                "company": user_company,
-                "total_blocks": len(blocks),
-                "export_type": "complete_blockchain"
-            }
-        }
-        
-        # Add user contracts if requested
-        if include_user_contracts:
-            contracts_response = await get_blockchain_contracts(current_user)
-            export_data["user_contracts"] = contracts_response["contracts"]
-            export_data["export_metadata"]["total_user_contracts"] = len(contracts_response["contracts"])
-        
-        return export_data
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to export blockchain data: {str(e)}")
+async def export_blockchain_data(
+    current_user: dict = Depends(get_current_user),
+    include_user_contracts: bool = True,
+    export_format: str = Query("json", alias="format"),
+    since_index: int = 0,
+    compression: Optional[str] = None
+):
+    """Stream blockchain data as a JSON document or NDJSON records
+    
+    since_index resumes an export from a block index; compression may be gzip or zstd.
+    """
+    validate_export_options(export_format, compression)
+    export_args = prepare_blockchain_export(current_user, include_user_contracts, since_index, export_format)
+    
+    headers = {}
+    if compression:
+        headers["Content-Encoding"] = compression
+    return StreamingResponse(
+        compress_stream(iter_blockchain_export(stats={}, **export_args), compression),
+        media_type=EXPORT_FORMATS[export_format],
+        headers=headers
+    )
 
 @app.get("/api/contracts/export")
 async def export_contracts_data(current_user: dict = Depends(get_current_user)):
@@ -1336,11 +3585,7 @@ async def export_contracts_data(current_user: dict = Depends(get_current_user)):
         user_id = current_user["user_id"]
         
         # Get all contracts accessible to user
-        accessible_contracts = []
-        for contract_id, contract in contracts_db.items():
-            if (contract["uploader_company"] == user_company or 
-                contract.get("other_company") == user_company):
-                accessible_contracts.append(contract.copy())
+        accessible_contracts = [contract.copy() for contract in contracts_db.for_company(user_company)]
         
         # Prepare export data
         export_data = {
@@ -1353,8 +3598,8 @@ async def export_contracts_data(current_user: dict = Depends(get_current_user)):
                 "export_type": "contracts_database"
             },
             "summary": {
-                "pending_contracts": len([c for c in accessible_contracts if c["status"] == "pending"]),
-                "completed_contracts": len([c for c in accessible_contracts if c["status"] == "completed"]),
+                "pending_contracts": contracts_db.count(("company_status", user_company, "pending")),
+                "completed_contracts": contracts_db.count(("company_status", user_company, "completed")),
                 "total_value": sum(c["contract_amount"] for c in accessible_contracts)
             }
         }
@@ -1365,26 +3610,31 @@ async def export_contracts_data(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=f"Failed to export contracts data: {str(e)}")
 
 @app.post("/api/blockchain/save-json")
-async def save_blockchain_json(current_user: dict = Depends(get_current_user), include_user_contracts: bool = True):
-    """Save blockchain data as JSON file on server"""
+async def save_blockchain_json(
+    current_user: dict = Depends(get_current_user),
+    include_user_contracts: bool = True,
+    export_format: str = Query("json", alias="format"),
+    since_index: int = 0,
+    compression: Optional[str] = None
+):
+    """Save blockchain data as a JSON (or NDJSON) file on server"""
+    validate_export_options(export_format, compression)
     try:
         user_company = current_user["company"]
-        user_id = current_user["user_id"]
-        
-        # Get export data
-        export_data = await export_blockchain_data(current_user, include_user_contracts)
+        export_args = prepare_blockchain_export(current_user, include_user_contracts, since_index, export_format)
         
         # Create filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"blockchain_export_{user_company}_{timestamp}.json"
+        filename = f"blockchain_export_{user_company}_{timestamp}.{export_format}{EXPORT_COMPRESSIONS.get(compression, '')}"
         filepath = os.path.join(os.getcwd(), "exports", filename)
         
         # Create exports directory if it doesn't exist
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        # Save to file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        # Stream to file from a worker thread so the event loop stays responsive
+        stats = {}
+        chunks = compress_stream(iter_blockchain_export(stats=stats, **export_args), compression)
+        await asyncio.to_thread(write_export_file, filepath, chunks)
         
         return {
             "success": True,
@@ -1393,12 +3643,14 @@ async def save_blockchain_json(current_user: dict = Depends(get_current_user), i
             "filepath": filepath,
             "file_size": os.path.getsize(filepath),
             "data_summary": {
-                "total_blocks": len(export_data["blocks"]),
-                "user_contracts": len(export_data.get("user_contracts", [])),
-                "blockchain_valid": export_data["blockchain_info"]["is_valid"]
+                "total_blocks": stats["total_blocks"],
+                "user_contracts": stats["total_user_contracts"],
+                "blockchain_valid": stats["blockchain_valid"]
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save blockchain JSON: {str(e)}")
 
@@ -1425,23 +3677,7 @@ async def analyze_contract_corruption(
         
         # Always use LightRAG for analysis
         try:
-            # Prepare corruption analysis query
-            corruption_query = f"""
-            Analyze this contract for potential corruption risks and provide a detailed assessment:
-
-            Contract: {contract_data['contract_title']}
-            Amount: ${contract_data['contract_amount']:,.2f}
-            Content: {contract_data['contract_content']}
-
-            Please evaluate:
-            1. Risk level (Low, Medium, High, Critical)
-            2. Specific corruption indicators
-            3. Red flags that require immediate attention
-            4. Recommendations for risk mitigation
-
-            Provide a comprehensive analysis considering contract language, financial patterns, 
-            procedural irregularities, and potential conflicts of interest.
-            """
+            corruption_query = build_corruption_query(contract_data)
             
             lightrag_response = await call_lightrag_api(
                 request.lightrag_api_url, 
@@ -1479,66 +3715,62 @@ async def analyze_contract_corruption(
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 @app.get("/api/corruption/batch-analyze", response_model=BatchCorruptionAnalysis)
-async def batch_analyze_corruption(current_user: dict = Depends(get_current_user)):
-    """Perform batch corruption analysis on all accessible contracts"""
+async def batch_analyze_corruption(
+    lightrag_api_url: str = Query("http://localhost:9621"),
+    result_format: str = Query("json", alias="format"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Perform batch corruption analysis on all accessible contracts
+    
+    format=ndjson or format=sse streams each contract's result as it completes,
+    followed by the summary; the default waits for the whole batch.
+    """
+    if result_format not in ("json", "ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be json, ndjson or sse")
     try:
         user_company = current_user["company"]
         
         # Get all accessible contracts
-        accessible_contracts = []
-        for contract_id, contract in contracts_db.items():
-            if (contract["uploader_company"] == user_company or 
-                contract.get("other_company") == user_company):
-                accessible_contracts.append((contract_id, contract))
+        accessible_contracts = contracts_db.for_company(user_company)
         
         if not accessible_contracts:
             raise HTTPException(status_code=404, detail="No contracts found for analysis")
         
-        detailed_results = []
-        high_risk_contracts = []
-        total_contract_value = 0
-        total_risk_score = 0
-        high_risk_count = 0
-        
-        # Note: Batch analysis currently disabled - LightRAG individual analysis only
-        # For demonstration, create placeholder results
-        for contract_id, contract_data in accessible_contracts:
-            try:
-                # Create simplified placeholder result for batch analysis
-                # TODO: Implement LightRAG batch processing for production use
-                contract_result = {
-                    "contract_id": contract_id,
-                    "contract_title": contract_data["contract_title"],
-                    "contract_amount": contract_data["contract_amount"],
-                    "corruption_risk_level": "Pending",
-                    "corruption_score": 0,
-                    "risk_factors": ["Batch analysis requires individual LightRAG analysis"],
-                    "recommendations": ["Use individual analysis for detailed LightRAG assessment"]
-                }
-                
-                detailed_results.append(contract_result)
-                total_contract_value += contract_data["contract_amount"]
-                    
-            except Exception as e:
-                print(f"Error processing contract {contract_id}: {str(e)}")
-                continue
+        summary = BatchAnalysisSummary(len(accessible_contracts))
+        results = run_batch_corruption_analysis(lightrag_api_url, accessible_contracts)
+        
+        if result_format != "json":
+            async def stream_results():
+                async for record in results:
+                    summary.add(record)
+                    if result_format == "sse":
+                        yield f"event: result\ndata: {json.dumps(record)}\n\n"
+                    else:
+                        yield json.dumps({"type": "result", **record}) + "\n"
+                if result_format == "sse":
+                    yield f"event: summary\ndata: {json.dumps(summary.to_dict())}\n\n"
+                else:
+                    yield json.dumps({"type": "summary", **summary.to_dict()}) + "\n"
+            
+            media_type = "text/event-stream" if result_format == "sse" else "application/x-ndjson"
+            return StreamingResponse(stream_results(), media_type=media_type, headers={"Cache-Control": "no-cache"})
         
-        # Calculate summary statistics
-        avg_risk_score = total_risk_score / len(detailed_results) if detailed_results else 0
-        immediate_attention = len([r for r in detailed_results if r["corruption_score"] >= 60])
+        detailed_results = []
+        async for record in results:
+            summary.add(record)
+            detailed_results.append(record)
         
-        summary = {
-            "total_contracts_analyzed": len(detailed_results),
-            "high_risk_contracts": high_risk_count,
-            "total_contract_value": total_contract_value,
-            "average_corruption_score": avg_risk_score,
-            "requires_immediate_attention": immediate_attention
-        }
+        # Keep the response in contract order regardless of completion order
+        order = {contract["contract_id"]: position for position, contract in enumerate(accessible_contracts)}
+        detailed_results.sort(key=lambda record: order[record["contract_id"]])
+        high_risk_contracts = [
+            record for record in detailed_results if record["corruption_risk_level"] in HIGH_RISK_LEVELS
+        ]
         
         return BatchCorruptionAnalysis(
             success=True,
-            message=f"Batch analysis completed for {len(detailed_results)} contracts",
-            summary=summary,
+            message=f"Batch analysis completed for {summary.completed} of {len(detailed_results)} contracts",
+            summary=summary.to_dict(),
             detailed_results=detailed_results,
             high_risk_contracts=high_risk_contracts
         )
@@ -1568,7 +3800,19 @@ async def analyze_word_content(
         if not contract_content or len(contract_content.strip()) < 10:
             raise HTTPException(status_code=400, detail="Contract content is too short for analysis")
         
-        # Always use LightRAG for analysis
+        # Benign contracts are answered by the local lexicon without an LLM round trip
+        prescreen = sensitive_lexicon.prescreen(contract_content)
+        if not request.force_lightrag and not prescreen["escalate"]:
+            word_prescreen_stats["local"] += 1
+            return WordAnalysisResponse(
+                success=True,
+                message=f"Sensitive word pre-screen completed for contract: {contract_data['contract_title']}",
+                analysis_type="local_prescreen",
+                word_analysis=build_prescreen_word_analysis(contract_content, request.analysis_type, prescreen)
+            )
+        word_prescreen_stats["escalated"] += 1
+        
+        # Escalate to LightRAG for analysis
         try:
             # Sensitive word detection analysis only
             analysis_query = f"""
@@ -1601,14 +3845,16 @@ async def analyze_word_content(
             lightrag_response = await call_lightrag_api_for_text(
                 request.lightrag_api_url, 
                 contract_content, 
-                analysis_query
+                analysis_query,
+                request.contract_id
             )
             
             if lightrag_response:
                 word_analysis = parse_word_analysis_response(
                     lightrag_response, 
                     contract_content, 
-                    request.analysis_type
+                    request.analysis_type,
+                    prescreen["matches"]
                 )
                 
                 return WordAnalysisResponse(
@@ -1635,13 +3881,89 @@ async def analyze_word_content(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Word analysis failed: {str(e)}")
 
+# Analysis job endpoints
+async def run_corruption_analysis_job(params: Dict, current_user: dict) -> CorruptionAnalysisResponse:
+    request = CorruptionAnalysisRequest(contract_id=params["contract_id"], lightrag_api_url=params["lightrag_api_url"])
+    return await analyze_contract_corruption(params["contract_id"], request, current_user)
+
+async def run_word_analysis_job(params: Dict, current_user: dict) -> WordAnalysisResponse:
+    request = WordAnalysisRequest(
+        contract_id=params["contract_id"],
+        analysis_type=params["analysis_type"],
+        lightrag_api_url=params["lightrag_api_url"],
+        force_lightrag=params["force_lightrag"]
+    )
+    return await analyze_word_content(request, current_user)
+
+analysis_jobs.register("corruption_analysis", run_corruption_analysis_job)
+analysis_jobs.register("word_analysis", run_word_analysis_job)
+
+@app.post("/api/jobs", status_code=202)
+async def submit_analysis_job(request: AnalysisJobRequest, current_user: dict = Depends(get_current_user)):
+    """Queue a corruption or word analysis and return its job ID immediately"""
+    if request.job_type not in analysis_jobs.handlers:
+        raise HTTPException(status_code=400, detail=f"Unknown job type: {request.job_type}")
+    if not 0 <= request.priority <= 9:
+        raise HTTPException(status_code=400, detail="priority must be between 0 and 9")
+    
+    if request.contract_id not in contracts_db:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    contract = contracts_db[request.contract_id]
+    if current_user["company"] not in (contract["uploader_company"], contract.get("other_company")):
+        raise HTTPException(status_code=403, detail="Access denied to this contract")
+    
+    params = {
+        "contract_id": request.contract_id,
+        "analysis_type": request.analysis_type,
+        "lightrag_api_url": request.lightrag_api_url,
+        "force_lightrag": request.force_lightrag,
+    }
+    job = analysis_jobs.submit(request.job_type, params, current_user["user_id"], request.priority)
+    return {
+        "success": True,
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/api/jobs/{job['job_id']}",
+        "stream_url": f"/api/jobs/{job['job_id']}/stream",
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_analysis_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Poll a job's status and, once finished, its result or error"""
+    return job_view(analysis_jobs.get(job_id, current_user["user_id"]))
+
+@app.get("/api/jobs/{job_id}/stream")
+async def stream_analysis_job(job_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Server-sent events for a job: 'status' on every transition, then a final 'result'"""
+    analysis_jobs.get(job_id, current_user["user_id"])
+    
+    async def job_events():
+        last_status = None
+        while not await request.is_disconnected():
+            job = analysis_jobs.lookup(job_id)
+            if job is None:
+                return
+            if job["status"] in ANALYSIS_JOB_FINISHED_STATUSES:
+                yield f"event: result\ndata: {json.dumps(job_view(job))}\n\n"
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"event: status\ndata: {json.dumps({'job_id': job_id, 'status': last_status})}\n\n"
+            if not await analysis_jobs.wait_for_change(job_id, last_status, 15):
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(job_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 if __name__ == "__main__":
+    if SHARED_STATE and not (BLOCKCHAIN_LOG_PATH and CONTRACTS_DB_PATH and USERS_DB_PATH):
+        raise SystemExit("API_WORKERS > 1 needs BLOCKCHAIN_LOG_PATH, CONTRACTS_DB_PATH and USERS_DB_PATH set to files")
     uvicorn.run(
-        app, 
-        host="127.0.0.1",  # Bind to localhost only for better performance
-        port=8000, 
+        # Several workers must each import the app themselves
+        "api:app" if SHARED_STATE else app,
+        host=API_HOST,  # Localhost by default for better performance
+        port=API_PORT,
         reload=False,
-        workers=1,  # Single worker to prevent resource conflicts
+        workers=API_WORKERS,
         access_log=False,  # Disable access logs for better performance
         log_level="warning"  # Reduce log verbosity
     )
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""Load-test and benchmark harness for the contract and blockchain API.
+
+Runs api.py in-process under uvicorn, with a stub LightRAG server standing in
+for the knowledge graph, and grows the chain through a series of sizes. At each
+size every scenario (upload, sign, list, explore, export, analyze and a mixed
+workload) is driven by concurrent clients for a fixed duration, and throughput,
+p50/p99 latency and process RSS are recorded per scenario. Results are written
+as JSON; pass a previous results file as --baseline to flag regressions.
+
+    python benchmark_api.py --sizes 1000,10000,100000 --duration 10
+    python benchmark_api.py --sizes 1000000 --scenarios explore,export --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import aiohttp
+from aiohttp import web
+
+SCENARIOS = ["upload", "sign", "list", "explore", "export", "analyze", "mixed"]
+MIXED_WEIGHTS = {"upload": 10, "sign": 10, "list": 35, "explore": 30, "export": 5, "analyze": 10}
+# Blocks streamed by one export request; full exports of large chains would dominate the run
+EXPORT_WINDOW = 1000
+# Synthetic contract blocks are spread over these companies, away from the demo user's
+SYNTHETIC_COMPANIES = [f"Bench Company {i}" for i in range(100)]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_mb() -> float:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak RSS where /proc is unavailable (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+# Stub LightRAG server
+class StubLightRAG:
+    """Answers the LightRAG endpoints api.py uses; every document is indexed
+    immediately and queries return a canned assessment after query_latency"""
+
+    def __init__(self, query_latency: float):
+        self.query_latency = query_latency
+        self.tracks = {}
+        self.inserts = 0
+        self.queries = 0
+        self.runner = None
+
+    async def insert_text(self, request):
+        body = await request.json()
+        return self.track([body.get("file_source", "")])
+
+    async def insert_texts(self, request):
+        body = await request.json()
+        return self.track(body.get("file_sources") or [""] * len(body["texts"]))
+
+    def track(self, file_sources):
+        self.inserts += len(file_sources)
+        track_id = f"insert_{self.inserts}"
+        self.tracks[track_id] = [
+            {"id": f"doc-{self.inserts}-{i}", "file_path": file_source, "status": "processed"}
+            for i, file_source in enumerate(file_sources)
+        ]
+        return web.json_response({"status": "success", "message": "queued", "track_id": track_id})
+
+    async def track_status(self, request):
+        documents = self.tracks.get(request.match_info["track_id"], [])
+        return web.json_response({
+            "track_id": request.match_info["track_id"],
+            "documents": documents,
+            "total_count": len(documents),
+            "status_summary": {"processed": len(documents)},
+        })
+
+    async def query(self, request):
+        self.queries += 1
+        await asyncio.sleep(self.query_latency)
+        return web.json_response({"response": (
+            "Risk level: Medium. Risk score: 45. The contract contains an unusually large payment "
+            "with limited competitive bidding. Recommend an independent review of the tender process."
+        )})
+
+    async def delete_document(self, request):
+        return web.json_response({"status": "deletion_started"})
+
+    async def start(self, port: int):
+        app = web.Application()
+        app.add_routes([
+            web.post("/documents/text", self.insert_text),
+            web.post("/documents/texts", self.insert_texts),
+            web.get("/documents/track_status/{track_id}", self.track_status),
+            web.delete("/documents/delete_document", self.delete_document),
+            web.post("/query", self.query),
+        ])
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", port).start()
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+# Workload
+class Workload:
+    """Issues one request of a scenario and remembers contracts it created"""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, lightrag_url: str, api):
+        self.session = session
+        self.base_url = base_url
+        self.lightrag_url = lightrag_url
+        self.api = api
+        self.pending_contracts = []
+        self.contracts = []
+        self.uploads = 0
+
+    async def call(self, method: str, path: str, **kwargs) -> int:
+        async with self.session.request(method, self.base_url + path, **kwargs) as response:
+            await response.read()
+            return response.status
+
+    async def upload(self) -> str:
+        self.uploads += 1
+        payload = {
+            "contract_title": f"Benchmark supply agreement {self.uploads}",
+            "contract_content": (
+                "The supplier shall deliver IT equipment and maintenance services for twelve months. "
+                "Payment of the full amount is due within 30 days of delivery."
+            ),
+            "contract_amount": round(random.uniform(1_000, 500_000), 2),
+            "contract_type": "internal",
+            "uploader": "alice001",
+            "timestamp": str(int(time.time())),
+        }
+        async with self.session.post(self.base_url + "/api/contract/upload", json=payload) as response:
+            body = await response.json()
+            if response.status >= 400:
+                raise RuntimeError(f"upload failed with {response.status}")
+        contract_id = body["contract_id"]
+        self.pending_contracts.append(contract_id)
+        self.contracts.append(contract_id)
+        return contract_id
+
+    async def run(self, scenario: str) -> int:
+        """Issue one request of the scenario and return its HTTP status"""
+        if scenario == "upload":
+            await self.upload()
+            return 200
+        if scenario == "sign":
+            if not self.pending_contracts:
+                await self.upload()
+            return await self.call("POST", f"/api/contract/sign/{self.pending_contracts.pop()}")
+        if scenario == "list":
+            path = random.choice(["/api/contracts/all?limit=50", "/api/contracts/pending?limit=50"])
+            return await self.call("GET", path)
+        if scenario == "explore":
+            chain_size = self.api.chain.getChainSize()
+            # Mostly the newest page, sometimes a deep one
+            cursor = "" if random.random() < 0.7 else f"&cursor={random.randrange(chain_size)}"
+            return await self.call("GET", f"/api/blockchain/explore?limit=50{cursor}")
+        if scenario == "export":
+            since_index = max(0, self.api.chain.getChainSize() - EXPORT_WINDOW)
+            return await self.call("GET", f"/api/blockchain/export?format=ndjson&since_index={since_index}")
+        if scenario == "analyze":
+            if not self.contracts:
+                await self.upload()
+            contract_id = random.choice(self.contracts)
+            return await self.call("POST", f"/api/corruption/analyze/{contract_id}",
+                                   json={"contract_id": contract_id, "lightrag_api_url": self.lightrag_url})
+        if scenario == "mixed":
+            choice = random.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()))[0]
+            return await self.run(choice)
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+async def drive(workload: Workload, scenario: str, duration: float, concurrency: int) -> dict:
+    """Closed-loop load: each client issues its next request when the last returns"""
+    latencies = []
+    errors = 0
+    rss_before = rss_mb()
+    deadline = time.monotonic() + duration
+
+    async def client():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await workload.run(scenario)
+            except (aiohttp.ClientError, RuntimeError, asyncio.TimeoutError):
+                errors += 1
+                continue
+            if status >= 400:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    def percentile(p: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3) if latencies else None
+    rss_after = rss_mb()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "rss_mb": round(rss_after, 1),
+        "rss_delta_mb": round(rss_after - rss_before, 1),
+    }
+
+def grow_chain(api, target: int):
+    """Append synthetic signed-contract blocks until the chain holds target blocks"""
+    chain = api.chain
+    start = chain.getChainSize()
+    now = int(time.time())
+    for i in range(start, target):
+        company = SYNTHETIC_COMPANIES[i % len(SYNTHETIC_COMPANIES)]
+        transaction = api.blockchain.TransactionData(
+            float(1000 + i % 100000), f"CONTRACT_CONT_B{i:07d}_{company}", f"INTERNAL_{company}", now
+        )
+        chain.addBlock(transaction)
+    chain.sync()
+    api.blockchain_index.catch_up()
+
+def compare_with_baseline(results: list, baseline_path: str, tolerance: float) -> list:
+    """Scenarios whose throughput dropped or p99 grew by more than the tolerance"""
+    with open(baseline_path) as f:
+        baseline = {(entry["chain_size"], entry["scenario"]): entry for entry in json.load(f)["results"]}
+    regressions = []
+    for entry in results:
+        previous = baseline.get((entry["chain_size"], entry["scenario"]))
+        if previous is None:
+            continue
+        if previous["throughput_rps"] and entry["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{entry['scenario']} @ {entry['chain_size']} blocks: throughput "
+                               f"{entry['throughput_rps']} req/s vs {previous['throughput_rps']}")
+        if previous["p99_ms"] and entry["p99_ms"] and entry["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{entry['scenario']} @ {entry['chain_size']} blocks: p99 "
+                               f"{entry['p99_ms']} ms vs {previous['p99_ms']}")
+    return regressions
+
+async def main(args):
+    data_dir = tempfile.mkdtemp(prefix="api_benchmark_")
+    lightrag_port = free_port()
+    api_port = free_port()
+    lightrag_url = f"http://127.0.0.1:{lightrag_port}"
+    # api.py reads its configuration at import time
+    os.environ.update({
+        "BLOCKCHAIN_LOG_PATH": os.path.join(data_dir, "blockchain.log"),
+        "BLOCKCHAIN_LOG_SYNC_EVERY": str(args.sync_every),
+        "BLOCKCHAIN_AUDIT_INTERVAL": "0",
+        "CONTRACTS_DB_PATH": os.path.join(data_dir, "contracts.db"),
+        "USERS_DB_PATH": os.path.join(data_dir, "users.db"),
+        "LIGHTRAG_LEDGER_PATH": os.path.join(data_dir, "lightrag_ledger.db"),
+        "ANALYSIS_CACHE_TTL": os.environ.get("ANALYSIS_CACHE_TTL", "3600" if args.analysis_cache else "0"),
+        "PREANALYSIS_LIGHTRAG_URL": "",
+    })
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import uvicorn
+    import api
+
+    stub = StubLightRAG(args.lightrag_latency_ms / 1000)
+    await stub.start(lightrag_port)
+    server = uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=api_port,
+                                           log_level="warning", access_log=False))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    results = []
+    base_url = f"http://127.0.0.1:{api_port}"
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(base_url + "/auth/login",
+                                    json={"user_id": "alice001", "user_password": "password123"}) as response:
+                token = (await response.json())["token"]
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        timeout = aiohttp.ClientTimeout(total=120)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={"Authorization": f"Bearer {token}"}) as session:
+            workload = Workload(session, base_url, lightrag_url, api)
+            for size in args.sizes:
+                started = time.perf_counter()
+                await asyncio.to_thread(grow_chain, api, size)
+                print(f"[BENCHMARK] Chain at {api.chain.getChainSize()} blocks "
+                      f"(grown in {time.perf_counter() - started:.1f}s)")
+                for scenario in args.scenarios:
+                    # Blocks added by earlier scenarios are not part of the size being measured
+                    result = await drive(workload, scenario, args.duration, args.concurrency)
+                    result.update({"chain_size": size, "scenario": scenario})
+                    results.append(result)
+                    print(f"[BENCHMARK] {size:>8} {scenario:<8} {result['throughput_rps']:>9.1f} req/s  "
+                          f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  "
+                          f"errors {result['errors']}  rss {result['rss_mb']} MB")
+    finally:
+        server.should_exit = True
+        await server_task
+        await stub.stop()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "sync_every": args.sync_every,
+            "lightrag_latency_ms": args.lightrag_latency_ms,
+            "analysis_cache": args.analysis_cache,
+            "export_window": EXPORT_WINDOW,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCHMARK] Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"[BENCHMARK] REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated chain sizes to measure at (up to 1000000)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--sync-every", type=int, default=1000,
+                        help="BLOCKCHAIN_LOG_SYNC_EVERY for the run (fsync batching while the chain grows)")
+    parser.add_argument("--lightrag-latency-ms", type=float, default=20, help="stub LightRAG query latency")
+    parser.add_argument("--analysis-cache", action="store_true", help="leave the analysis result cache enabled")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative throughput drop or p99 increase before flagging a regression")
+    args = parser.parse_args()
+    args.sizes = sorted(int(size) for size in args.sizes.split(","))
+    args.scenarios = args.scenarios.split(",")
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
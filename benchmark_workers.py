@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Throughput of api.py against the number of uvicorn workers.
+
+Starts api.py once per worker count (API_WORKERS) on a scratch data directory,
+logs in as the demo user and drives a read-mostly mix of contract listings,
+blockchain explorer pages and contract uploads for a fixed duration.
+
+    python benchmark_workers.py --workers 1,2,4 --duration 15 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+API_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api.py")
+
+READ_PATHS = [
+    "/api/contracts/all?limit=50",
+    "/api/contracts/pending?limit=50",
+    "/api/blockchain/explore?limit=50",
+    "/api/blockchain/info",
+]
+
+def start_server(workers: int, port: int, data_dir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "API_WORKERS": str(workers),
+        "API_PORT": str(port),
+        "BLOCKCHAIN_AUDIT_INTERVAL": "0",
+        "PREANALYSIS_LIGHTRAG_URL": "",
+    })
+    return subprocess.Popen(
+        [sys.executable, API_PATH], cwd=data_dir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+
+async def wait_until_ready(session: aiohttp.ClientSession, base_url: str, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"api.py exited: {server.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            async with session.get(f"{base_url}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("api.py did not become ready")
+
+async def run_load(base_url: str, token: str, duration: float, concurrency: int, write_ratio: float) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    errors = 0
+    uploads = 0
+    deadline = time.monotonic() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        async def client(client_id: int):
+            nonlocal errors, uploads
+            rng = random.Random(client_id)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    if rng.random() < write_ratio:
+                        uploads += 1
+                        payload = {
+                            "contract_title": f"Benchmark contract {client_id}-{uploads}",
+                            "contract_content": "Benchmark contract for worker scaling measurements.",
+                            "contract_amount": 1000.0,
+                            "contract_type": "internal",
+                            "uploader": "alice001",
+                            "timestamp": str(int(time.time())),
+                        }
+                        request = session.post(f"{base_url}/api/contract/upload", json=payload)
+                    else:
+                        request = session.get(f"{base_url}{rng.choice(READ_PATHS)}")
+                    async with request as response:
+                        await response.read()
+                        if response.status >= 400:
+                            errors += 1
+                            continue
+                except aiohttp.ClientError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.monotonic()
+        await asyncio.gather(*(client(i) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+async def benchmark(workers: int, args) -> dict:
+    data_dir = tempfile.mkdtemp(prefix=f"api_workers_{workers}_")
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(workers, args.port, data_dir)
+    try:
+        async with aiohttp.ClientSession() as session:
+            await wait_until_ready(session, base_url, server)
+            async with session.post(f"{base_url}/auth/login",
+                                    json={"user_id": "alice001", "user_password": "password123"}) as response:
+                token = (await response.json())["token"]
+        # Warm every worker's caches before measuring
+        await run_load(base_url, token, min(2.0, args.duration), args.concurrency, 0)
+        return await run_load(base_url, token, args.duration, args.concurrency, args.write_ratio)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent client connections")
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="fraction of requests that upload a contract")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for workers in [int(value) for value in args.workers.split(",")]:
+        result = await benchmark(workers, args)
+        print(f"{workers:>8} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,8 +3,24 @@
 #include <vector>
 #include <functional>
 #include <string>
+#include <cstring>
+#include <cstdint>
+#include <cerrno>
+#include <array>
+#include <atomic>
+#include <thread>
+#include <mutex>
+#include <shared_mutex>
+#include <algorithm>
+#include <stdexcept>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/file.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 
 namespace py = pybind11;
 using namespace std;
@@ -24,60 +40,569 @@ struct TransactionData {
         : amount(amt), senderKey(sender), receiverKey(receiver), timestamp(ts) {}
 };
 
+// SHA-256 digest of a block
+typedef array<uint8_t, 32> Hash256;
+
+// Streaming SHA-256 (FIPS 180-4)
+class Sha256 {
+private:
+    uint32_t state[8];
+    uint8_t buffer[64];
+    size_t bufferLength;
+    uint64_t totalLength;
+
+    static uint32_t rotr(uint32_t x, int n) {
+        return (x >> n) | (x << (32 - n));
+    }
+
+    void transform(const uint8_t* chunk) {
+        static const uint32_t k[64] = {
+            0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+            0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+            0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+            0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+            0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+            0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+            0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+            0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+        };
+        uint32_t w[64];
+        for (int i = 0; i < 16; ++i) {
+            w[i] = ((uint32_t)chunk[4 * i] << 24) | ((uint32_t)chunk[4 * i + 1] << 16) |
+                   ((uint32_t)chunk[4 * i + 2] << 8) | (uint32_t)chunk[4 * i + 3];
+        }
+        for (int i = 16; i < 64; ++i) {
+            uint32_t s0 = rotr(w[i - 15], 7) ^ rotr(w[i - 15], 18) ^ (w[i - 15] >> 3);
+            uint32_t s1 = rotr(w[i - 2], 17) ^ rotr(w[i - 2], 19) ^ (w[i - 2] >> 10);
+            w[i] = w[i - 16] + s0 + w[i - 7] + s1;
+        }
+        uint32_t a = state[0], b = state[1], c = state[2], d = state[3];
+        uint32_t e = state[4], f = state[5], g = state[6], h = state[7];
+        for (int i = 0; i < 64; ++i) {
+            uint32_t S1 = rotr(e, 6) ^ rotr(e, 11) ^ rotr(e, 25);
+            uint32_t ch = (e & f) ^ (~e & g);
+            uint32_t temp1 = h + S1 + ch + k[i] + w[i];
+            uint32_t S0 = rotr(a, 2) ^ rotr(a, 13) ^ rotr(a, 22);
+            uint32_t maj = (a & b) ^ (a & c) ^ (b & c);
+            uint32_t temp2 = S0 + maj;
+            h = g;
+            g = f;
+            f = e;
+            e = d + temp1;
+            d = c;
+            c = b;
+            b = a;
+            a = temp1 + temp2;
+        }
+        state[0] += a; state[1] += b; state[2] += c; state[3] += d;
+        state[4] += e; state[5] += f; state[6] += g; state[7] += h;
+    }
+
+public:
+    Sha256() : bufferLength(0), totalLength(0) {
+        static const uint32_t initial[8] = {
+            0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+        };
+        memcpy(state, initial, sizeof(state));
+    }
+
+    void update(const uint8_t* data, size_t len) {
+        totalLength += len;
+        if (bufferLength > 0) {
+            size_t take = min(len, (size_t)64 - bufferLength);
+            memcpy(buffer + bufferLength, data, take);
+            bufferLength += take;
+            data += take;
+            len -= take;
+            if (bufferLength < 64) {
+                return;
+            }
+            transform(buffer);
+            bufferLength = 0;
+        }
+        while (len >= 64) {
+            transform(data);
+            data += 64;
+            len -= 64;
+        }
+        memcpy(buffer, data, len);
+        bufferLength = len;
+    }
+
+    Hash256 digest() {
+        uint64_t bitLength = totalLength * 8;
+        uint8_t padding[72] = {0x80};
+        size_t padLength = (bufferLength < 56) ? 56 - bufferLength : 120 - bufferLength;
+        update(padding, padLength);
+        uint8_t lengthBytes[8];
+        for (int i = 0; i < 8; ++i) {
+            lengthBytes[i] = (uint8_t)(bitLength >> (56 - 8 * i));
+        }
+        update(lengthBytes, 8);
+        Hash256 out;
+        for (int i = 0; i < 8; ++i) {
+            out[4 * i] = (uint8_t)(state[i] >> 24);
+            out[4 * i + 1] = (uint8_t)(state[i] >> 16);
+            out[4 * i + 2] = (uint8_t)(state[i] >> 8);
+            out[4 * i + 3] = (uint8_t)state[i];
+        }
+        return out;
+    }
+};
+
+static string hashToHex(const Hash256& hash) {
+    static const char digits[] = "0123456789abcdef";
+    string hex(64, '0');
+    for (size_t i = 0; i < hash.size(); ++i) {
+        hex[2 * i] = digits[hash[i] >> 4];
+        hex[2 * i + 1] = digits[hash[i] & 0x0F];
+    }
+    return hex;
+}
+
+static Hash256 hexToHash(const string& hex) {
+    if (hex.size() != 64) {
+        throw invalid_argument("Block hash must be 64 hex characters");
+    }
+    Hash256 hash;
+    for (size_t i = 0; i < hash.size(); ++i) {
+        hash[i] = (uint8_t)stoul(hex.substr(2 * i, 2), nullptr, 16);
+    }
+    return hash;
+}
+
+// Append an unsigned integer in little-endian order, independent of the host
+template <typename T>
+static void putLittleEndian(string& out, T value) {
+    for (size_t i = 0; i < sizeof(T); ++i) {
+        out.push_back((char)((value >> (8 * i)) & 0xFF));
+    }
+}
+
+// Hash a message with SHA-256
+static Hash256 sha256(const string& message) {
+    Sha256 sha;
+    sha.update(reinterpret_cast<const uint8_t*>(message.data()), message.size());
+    return sha.digest();
+}
+
+// Merkle leaves and inner nodes are hashed with distinct prefixes so an inner
+// node can never be passed off as a transaction
+static const char MERKLE_LEAF_PREFIX = 0x00;
+static const char MERKLE_NODE_PREFIX = 0x01;
+
+// Leaf hash of a transaction: SHA-256 over the leaf prefix, f64 amount bits,
+// i64 timestamp, then the sender and receiver keys as u32 length + bytes;
+// all integers little-endian
+static Hash256 hashTransaction(const TransactionData& data) {
+    string message;
+    message.reserve(25 + data.senderKey.size() + data.receiverKey.size());
+    message.push_back(MERKLE_LEAF_PREFIX);
+    uint64_t amountBits;
+    memcpy(&amountBits, &data.amount, sizeof(amountBits));
+    putLittleEndian<uint64_t>(message, amountBits);
+    putLittleEndian<uint64_t>(message, (uint64_t)(int64_t)data.timestamp);
+    putLittleEndian<uint32_t>(message, (uint32_t)data.senderKey.size());
+    message += data.senderKey;
+    putLittleEndian<uint32_t>(message, (uint32_t)data.receiverKey.size());
+    message += data.receiverKey;
+    return sha256(message);
+}
+
+static Hash256 hashMerkleNode(const Hash256& left, const Hash256& right) {
+    string message;
+    message.reserve(1 + left.size() + right.size());
+    message.push_back(MERKLE_NODE_PREFIX);
+    message.append(reinterpret_cast<const char*>(left.data()), left.size());
+    message.append(reinterpret_cast<const char*>(right.data()), right.size());
+    return sha256(message);
+}
+
+// One step of a Merkle inclusion proof: the sibling hash and whether it sits
+// to the left of the running hash
+struct MerkleProofStep {
+    Hash256 sibling;
+    bool siblingOnLeft;
+};
+
+// Reduce one tree level in place; an odd trailing node is carried up unchanged
+static void reduceMerkleLevel(vector<Hash256>& level) {
+    size_t parents = 0;
+    for (size_t i = 0; i < level.size(); i += 2) {
+        level[parents++] = (i + 1 < level.size()) ? hashMerkleNode(level[i], level[i + 1]) : level[i];
+    }
+    level.resize(parents);
+}
+
 // Block Class
 class Block {
 private:
     int index;
-    size_t blockHash;
-    size_t previousHash;
-    TransactionData data;
+    time_t timestamp;
+    Hash256 blockHash;
+    Hash256 previousHash;
+    Hash256 merkleRoot;
+    vector<TransactionData> transactions;
+
+    vector<Hash256> leafHashes() const {
+        vector<Hash256> leaves;
+        leaves.reserve(transactions.size());
+        for (const TransactionData& tx : transactions) {
+            leaves.push_back(hashTransaction(tx));
+        }
+        return leaves;
+    }
+
+    Hash256 computeMerkleRoot() const {
+        vector<Hash256> level = leafHashes();
+        while (level.size() > 1) {
+            reduceMerkleLevel(level);
+        }
+        return level.front();
+    }
 
-    size_t generateHash() {
-        hash<string> hash1;
-        hash<size_t> hash2;
-        hash<size_t> finalHash;
-        string toHash = to_string(data.amount) + data.receiverKey + data.senderKey + to_string(data.timestamp);
-        return finalHash(hash1(toHash) + hash2(previousHash));
+    // SHA-256 over the canonical header: u32 index, 32-byte previous hash,
+    // 32-byte Merkle root, i64 timestamp and u32 transaction count; all
+    // integers little-endian
+    Hash256 generateHash() const {
+        string message;
+        message.reserve(80);
+        putLittleEndian<uint32_t>(message, (uint32_t)index);
+        message.append(reinterpret_cast<const char*>(previousHash.data()), previousHash.size());
+        message.append(reinterpret_cast<const char*>(merkleRoot.data()), merkleRoot.size());
+        putLittleEndian<uint64_t>(message, (uint64_t)(int64_t)timestamp);
+        putLittleEndian<uint32_t>(message, (uint32_t)transactions.size());
+        return sha256(message);
     }
 
 public:
     // Constructor
-    Block(int idx, TransactionData d, size_t prevHash) {
+    Block(int idx, vector<TransactionData> txs, const Hash256& prevHash, time_t blockTimestamp) {
+        if (txs.empty()) {
+            throw invalid_argument("A block must contain at least one transaction");
+        }
         index = idx;
-        data = d;
+        timestamp = blockTimestamp;
+        transactions = std::move(txs);
         previousHash = prevHash;
+        merkleRoot = computeMerkleRoot();
         blockHash = generateHash();
     }
 
+    // Single-transaction block stamped with the transaction's time
+    Block(int idx, TransactionData d, const Hash256& prevHash)
+        : Block(idx, vector<TransactionData>(1, d), prevHash, d.timestamp) {}
+
+    // Restore a block with a previously computed root and hash (used when loading the log)
+    Block(int idx, vector<TransactionData>&& txs, const Hash256& prevHash, const Hash256& storedRoot,
+          const Hash256& storedHash, time_t blockTimestamp)
+        : index(idx), timestamp(blockTimestamp), blockHash(storedHash), previousHash(prevHash),
+          merkleRoot(storedRoot), transactions(std::move(txs)) {}
+
     // Get original Hash
-    size_t getHash() {
+    const Hash256& getHash() const {
         return blockHash;
     }
 
     // Get previous Hash
-    size_t getPreviousHash() {
+    const Hash256& getPreviousHash() const {
         return previousHash;
     }
 
-    // Get Transaction Data
-    TransactionData getData() {
-        return data;
+    const Hash256& getMerkleRoot() const {
+        return merkleRoot;
+    }
+
+    string getHashHex() const {
+        return hashToHex(blockHash);
+    }
+
+    string getPreviousHashHex() const {
+        return hashToHex(previousHash);
+    }
+
+    string getMerkleRootHex() const {
+        return hashToHex(merkleRoot);
     }
 
-    // Validate Hash
-    bool isHashValid() {
-        return generateHash() == blockHash;
+    // Get the first transaction (the only one for single-transaction blocks)
+    TransactionData getData() const {
+        return transactions.front();
+    }
+
+    vector<TransactionData> getTransactions() const {
+        return transactions;
+    }
+
+    const vector<TransactionData>& getTransactionsRef() const {
+        return transactions;
+    }
+
+    size_t getTransactionCount() const {
+        return transactions.size();
+    }
+
+    time_t getTimestamp() const {
+        return timestamp;
+    }
+
+    // Sibling hashes from the transaction's leaf up to the Merkle root
+    vector<MerkleProofStep> getMerkleProof(size_t txIndex) const {
+        if (txIndex >= transactions.size()) {
+            throw out_of_range("Transaction index out of range");
+        }
+        vector<MerkleProofStep> proof;
+        vector<Hash256> level = leafHashes();
+        size_t position = txIndex;
+        while (level.size() > 1) {
+            size_t sibling = position ^ 1;
+            if (sibling < level.size()) {
+                proof.push_back({level[sibling], sibling < position});
+            }
+            reduceMerkleLevel(level);
+            position /= 2;
+        }
+        return proof;
+    }
+
+    // Validate the Merkle root and the header hash
+    bool isHashValid() const {
+        return computeMerkleRoot() == merkleRoot && generateHash() == blockHash;
     }
     
     // Get index
-    int getIndex() {
+    int getIndex() const {
         return index;
     }
 };
 
+// Append-only block log
+//
+// File layout: a 16-byte header (8-byte magic, u32 format version, u32 reserved)
+// followed by one record per block: [u32 payload length][u32 CRC-32][payload].
+// Payload fields are written in host byte order (little-endian on supported
+// platforms): i32 index, 32-byte previous hash, 32-byte hash, 32-byte Merkle
+// root, i64 block timestamp and u32 transaction count, then per transaction
+// f64 amount, i64 timestamp and the sender and receiver keys as u32 length + bytes.
+static const char BLOCK_LOG_MAGIC[8] = {'B', 'C', 'H', 'A', 'I', 'N', 'L', 'G'};
+static const uint32_t BLOCK_LOG_VERSION = 3;
+static const size_t BLOCK_LOG_HEADER_SIZE = 16;
+static const size_t BLOCK_LOG_RECORD_PREFIX = 8;
+// Number of trailing blocks re-verified when a log is reopened
+static const size_t BLOCK_LOG_TAIL_VERIFY = 1024;
+// Smallest share of blocks worth handing to a separate verification thread
+static const size_t PARALLEL_VERIFY_MIN_BLOCKS = 4096;
+
+// CRC-32 (IEEE) lookup tables for slicing-by-8
+static const uint32_t (*crc32Tables())[256] {
+    static uint32_t tables[8][256];
+    static bool ready = []() {
+        for (uint32_t i = 0; i < 256; ++i) {
+            uint32_t c = i;
+            for (int k = 0; k < 8; ++k) {
+                c = (c & 1) ? 0xEDB88320u ^ (c >> 1) : c >> 1;
+            }
+            tables[0][i] = c;
+        }
+        for (uint32_t i = 0; i < 256; ++i) {
+            for (int t = 1; t < 8; ++t) {
+                tables[t][i] = (tables[t - 1][i] >> 8) ^ tables[0][tables[t - 1][i] & 0xFF];
+            }
+        }
+        return true;
+    }();
+    (void)ready;
+    return tables;
+}
+
+static uint32_t crc32(const unsigned char* data, size_t len) {
+    const uint32_t (*t)[256] = crc32Tables();
+    uint32_t c = 0xFFFFFFFFu;
+    while (len >= 8) {
+        uint32_t lo, hi;
+        memcpy(&lo, data, 4);
+        memcpy(&hi, data + 4, 4);
+        lo ^= c;
+        c = t[7][lo & 0xFF] ^ t[6][(lo >> 8) & 0xFF] ^ t[5][(lo >> 16) & 0xFF] ^ t[4][lo >> 24] ^
+            t[3][hi & 0xFF] ^ t[2][(hi >> 8) & 0xFF] ^ t[1][(hi >> 16) & 0xFF] ^ t[0][hi >> 24];
+        data += 8;
+        len -= 8;
+    }
+    while (len-- > 0) {
+        c = t[0][(c ^ *data++) & 0xFF] ^ (c >> 8);
+    }
+    return c ^ 0xFFFFFFFFu;
+}
+
+template <typename T>
+static void putValue(string& out, T value) {
+    out.append(reinterpret_cast<const char*>(&value), sizeof(T));
+}
+
+static void putString(string& out, const string& value) {
+    putValue<uint32_t>(out, (uint32_t)value.size());
+    out.append(value);
+}
+
+// Bounds-checked cursor over a mapped record payload
+struct LogCursor {
+    const unsigned char* pos;
+    const unsigned char* end;
+
+    template <typename T>
+    bool get(T& value) {
+        if ((size_t)(end - pos) < sizeof(T)) {
+            return false;
+        }
+        memcpy(&value, pos, sizeof(T));
+        pos += sizeof(T);
+        return true;
+    }
+
+    bool getHash(Hash256& value) {
+        if ((size_t)(end - pos) < value.size()) {
+            return false;
+        }
+        memcpy(value.data(), pos, value.size());
+        pos += value.size();
+        return true;
+    }
+
+    bool getString(string& value) {
+        uint32_t len;
+        if (!get(len) || (size_t)(end - pos) < len) {
+            return false;
+        }
+        value.assign(reinterpret_cast<const char*>(pos), len);
+        pos += len;
+        return true;
+    }
+};
+
+static void putHash(string& out, const Hash256& hash) {
+    out.append(reinterpret_cast<const char*>(hash.data()), hash.size());
+}
+
+static string encodeBlockRecord(const Block& block) {
+    const vector<TransactionData>& transactions = block.getTransactionsRef();
+    string payload;
+    putValue<int32_t>(payload, block.getIndex());
+    putHash(payload, block.getPreviousHash());
+    putHash(payload, block.getHash());
+    putHash(payload, block.getMerkleRoot());
+    putValue<int64_t>(payload, (int64_t)block.getTimestamp());
+    putValue<uint32_t>(payload, (uint32_t)transactions.size());
+    for (const TransactionData& data : transactions) {
+        putValue<double>(payload, data.amount);
+        putValue<int64_t>(payload, (int64_t)data.timestamp);
+        putString(payload, data.senderKey);
+        putString(payload, data.receiverKey);
+    }
+
+    string record;
+    putValue<uint32_t>(record, (uint32_t)payload.size());
+    putValue<uint32_t>(record, crc32(reinterpret_cast<const unsigned char*>(payload.data()), payload.size()));
+    record += payload;
+    return record;
+}
+
+// Smallest encoded transaction: amount, timestamp and two empty keys
+static const size_t MIN_TRANSACTION_RECORD = 24;
+
+static bool decodeBlockRecord(const unsigned char* payload, size_t len, int32_t& index,
+                              Hash256& previousHash, Hash256& blockHash, Hash256& merkleRoot,
+                              time_t& blockTimestamp, vector<TransactionData>& transactions) {
+    LogCursor cur = {payload, payload + len};
+    int64_t timestamp;
+    uint32_t count;
+    if (!cur.get(index) || !cur.getHash(previousHash) || !cur.getHash(blockHash) ||
+        !cur.getHash(merkleRoot) || !cur.get(timestamp) || !cur.get(count) ||
+        count == 0 || count > (size_t)(cur.end - cur.pos) / MIN_TRANSACTION_RECORD) {
+        return false;
+    }
+    blockTimestamp = (time_t)timestamp;
+    transactions.resize(count);
+    for (TransactionData& d : transactions) {
+        if (!cur.get(d.amount) || !cur.get(timestamp) ||
+            !cur.getString(d.senderKey) || !cur.getString(d.receiverKey)) {
+            return false;
+        }
+        d.timestamp = (time_t)timestamp;
+    }
+    return cur.pos == cur.end;
+}
+
+static void writeAll(int fd, const string& bytes) {
+    const char* p = bytes.data();
+    size_t remaining = bytes.size();
+    while (remaining > 0) {
+        ssize_t written = ::write(fd, p, remaining);
+        if (written < 0) {
+            throw runtime_error(string("Failed to write block log: ") + strerror(errno));
+        }
+        p += written;
+        remaining -= (size_t)written;
+    }
+}
+
 // Blockchain Class
 class Blockchain {
 private:
+    // Blocks in order; only ever appended to
+    vector<Block> chain;
+    // Readers share the lock; appends and validation state updates take it
+    // exclusively. Never acquire the GIL while holding it.
+    mutable shared_timed_mutex chainMutex;
+
+    // Blocks in [validatedFrom, validatedUpTo) have had their hashes and links
+    // verified. validatedFrom is 0 except after reopening a long log, when
+    // only the tail is verified and the prefix waits for an audit.
+    size_t validatedFrom;
+    size_t validatedUpTo;
+    // End of the run of blocks audited from block 0 while validatedFrom > 0
+    size_t auditedUpTo;
+    // Result of the most recent validation of the verified prefix
+    bool chainValid;
+
+    // Persistent log state (logFd is -1 for an in-memory chain)
+    string logPath;
+    int logFd;
+    size_t syncEvery;
+    size_t unsyncedRecords;
+    // Byte offset just past the last record loaded into or written from this
+    // process; in shared mode other processes append beyond it
+    size_t logEnd;
+    // Several processes append to the same log: appends are serialized with
+    // an exclusive flock() and first pick up records written by the others
+    bool shared;
+
+    // Holds an exclusive flock() on the log for the duration of an append in
+    // shared mode; a no-op otherwise
+    class LogFileLock {
+    private:
+        int fd;
+
+    public:
+        LogFileLock(int logFd, bool enabled) : fd(enabled ? logFd : -1) {
+            if (fd >= 0) {
+                while (flock(fd, LOCK_EX) != 0) {
+                    if (errno != EINTR) {
+                        throw runtime_error(string("Failed to lock block log: ") + strerror(errno));
+                    }
+                }
+            }
+        }
+
+        ~LogFileLock() {
+            if (fd >= 0) {
+                flock(fd, LOCK_UN);
+            }
+        }
+
+        LogFileLock(const LogFileLock&) = delete;
+        LogFileLock& operator=(const LogFileLock&) = delete;
+    };
+
     Block createGenesisBlock() {
         time_t current;
         TransactionData d;
@@ -86,62 +611,672 @@ private:
         d.senderKey = "None";
         d.timestamp = time(&current);
 
-        hash<int> hash1;
-        Block genesis(0, d, hash1(0));
+        // Genesis links to an all-zero previous hash
+        Hash256 zeroHash;
+        zeroHash.fill(0);
+        Block genesis(0, d, zeroHash);
         return genesis;
     }
 
-public:
-    // Public chain
-    vector<Block> chain;
+    // Check a single block's hash and its link to the previous block
+    bool isBlockValid(size_t i) const {
+        const Block& currentBlock = chain[i];
+        if (!currentBlock.isHashValid()) {
+            return false;
+        }
+        if (i > 0 && currentBlock.getPreviousHash() != chain[i - 1].getHash()) {
+            return false;
+        }
+        return true;
+    }
+
+    // Position of the first invalid block in [start, end), or end if all are
+    // valid. Large ranges are hashed across hardware threads in contiguous
+    // chunks; each worker stops early once a lower chunk has already failed.
+    size_t findFirstInvalid(size_t start, size_t end) const {
+        if (end <= start) {
+            return end;
+        }
+        size_t count = end - start;
+        size_t workers = thread::hardware_concurrency();
+        if (workers == 0) {
+            workers = 1;
+        }
+        workers = min(workers, (count + PARALLEL_VERIFY_MIN_BLOCKS - 1) / PARALLEL_VERIFY_MIN_BLOCKS);
+        if (workers <= 1) {
+            for (size_t i = start; i < end; ++i) {
+                if (!isBlockValid(i)) {
+                    return i;
+                }
+            }
+            return end;
+        }
+
+        atomic<size_t> firstInvalid(end);
+        size_t chunk = (count + workers - 1) / workers;
+        auto verifyChunk = [this, &firstInvalid](size_t from, size_t to) {
+            for (size_t i = from; i < to && i < firstInvalid.load(memory_order_relaxed); ++i) {
+                if (!isBlockValid(i)) {
+                    size_t current = firstInvalid.load();
+                    while (i < current && !firstInvalid.compare_exchange_weak(current, i)) {
+                    }
+                    return;
+                }
+            }
+        };
+        vector<thread> threads;
+        threads.reserve(workers - 1);
+        for (size_t w = 1; w < workers; ++w) {
+            size_t from = start + w * chunk;
+            if (from >= end) {
+                break;
+            }
+            threads.emplace_back(verifyChunk, from, min(end, from + chunk));
+        }
+        verifyChunk(start, min(end, start + chunk));
+        for (thread& t : threads) {
+            t.join();
+        }
+        return firstInvalid.load();
+    }
+
+    // Append the complete, CRC-valid records in base[offset, size) to the
+    // chain; returns the offset just past the last one accepted
+    size_t decodeRecords(const unsigned char* base, size_t offset, size_t size) {
+        while (size - offset >= BLOCK_LOG_RECORD_PREFIX) {
+            uint32_t len, crc;
+            memcpy(&len, base + offset, sizeof(len));
+            memcpy(&crc, base + offset + 4, sizeof(crc));
+            const unsigned char* payload = base + offset + BLOCK_LOG_RECORD_PREFIX;
+            if (size - offset - BLOCK_LOG_RECORD_PREFIX < len || crc32(payload, len) != crc) {
+                break;
+            }
+            int32_t index;
+            Hash256 previousHash, blockHash, merkleRoot;
+            time_t blockTimestamp;
+            vector<TransactionData> transactions;
+            if (!decodeBlockRecord(payload, len, index, previousHash, blockHash, merkleRoot,
+                                   blockTimestamp, transactions) ||
+                index != (int32_t)chain.size()) {
+                break;
+            }
+            chain.emplace_back(index, std::move(transactions), previousHash, merkleRoot, blockHash,
+                               blockTimestamp);
+            offset += BLOCK_LOG_RECORD_PREFIX + len;
+        }
+        return offset;
+    }
+
+    // Map the log file and rebuild the chain from its records. A torn or
+    // corrupt tail left by a crash is truncated back to the last good record.
+    void loadLog() {
+        int fd = ::open(logPath.c_str(), O_RDONLY);
+        if (fd < 0) {
+            if (errno == ENOENT) {
+                return;
+            }
+            throw runtime_error("Failed to open block log " + logPath + ": " + strerror(errno));
+        }
+        struct stat st;
+        if (fstat(fd, &st) != 0) {
+            ::close(fd);
+            throw runtime_error("Failed to stat block log " + logPath);
+        }
+        size_t fileSize = (size_t)st.st_size;
+        size_t goodEnd = 0;
+        if (fileSize >= BLOCK_LOG_HEADER_SIZE) {
+            void* mapped = mmap(nullptr, fileSize, PROT_READ, MAP_PRIVATE, fd, 0);
+            if (mapped == MAP_FAILED) {
+                ::close(fd);
+                throw runtime_error("Failed to map block log " + logPath);
+            }
+            const unsigned char* base = static_cast<const unsigned char*>(mapped);
+            uint32_t version;
+            memcpy(&version, base + sizeof(BLOCK_LOG_MAGIC), sizeof(version));
+            if (memcmp(base, BLOCK_LOG_MAGIC, sizeof(BLOCK_LOG_MAGIC)) != 0 || version != BLOCK_LOG_VERSION) {
+                munmap(mapped, fileSize);
+                ::close(fd);
+                throw runtime_error("Unsupported block log format: " + logPath);
+            }
+            size_t offset = BLOCK_LOG_HEADER_SIZE;
+            goodEnd = offset;
+            // Hop over the length prefixes first so the chain is allocated once
+            size_t recordCount = 0;
+            for (size_t probe = offset; fileSize - probe >= BLOCK_LOG_RECORD_PREFIX; ++recordCount) {
+                uint32_t len;
+                memcpy(&len, base + probe, sizeof(len));
+                if (fileSize - probe - BLOCK_LOG_RECORD_PREFIX < len) {
+                    break;
+                }
+                probe += BLOCK_LOG_RECORD_PREFIX + len;
+            }
+            chain.reserve(recordCount);
+            goodEnd = decodeRecords(base, offset, fileSize);
+            munmap(mapped, fileSize);
+        }
+        ::close(fd);
+
+        if (goodEnd < fileSize) {
+            cerr << "[blockchain] Truncating " << (fileSize - goodEnd)
+                 << " bytes of incomplete records from " << logPath << endl;
+            if (truncate(logPath.c_str(), (off_t)goodEnd) != 0) {
+                throw runtime_error("Failed to truncate block log " + logPath);
+            }
+        }
+
+        logEnd = goodEnd;
+
+        // Only the tail is verified on load. CRCs catch accidental damage but
+        // not a block rewritten with a fixed-up CRC, so the prefix stays
+        // unverified until an audit reaches the tail.
+        validatedFrom = chain.size() > BLOCK_LOG_TAIL_VERIFY ? chain.size() - BLOCK_LOG_TAIL_VERIFY : 0;
+        validatedUpTo = validatedFrom;
+        auditedUpTo = 0;
+        chainValid = true;
+        validatePending();
+    }
+
+    // Write a block's record; a failed write is truncated away so the log
+    // still ends at the last complete record
+    void appendToLog(const Block& block) {
+        if (logFd < 0) {
+            return;
+        }
+        string record = encodeBlockRecord(block);
+        // Appends hold the log lock and every complete record has been loaded,
+        // so bytes past logEnd are a torn record left by a writer that died
+        size_t fileSize = logFileSize();
+        if (fileSize > logEnd) {
+            cerr << "[blockchain] Truncating " << (fileSize - logEnd)
+                 << " bytes of incomplete records from " << logPath << endl;
+            if (ftruncate(logFd, (off_t)logEnd) != 0) {
+                throw runtime_error("Failed to truncate block log " + logPath + ": " + strerror(errno));
+            }
+        }
+        try {
+            writeAll(logFd, record);
+        } catch (...) {
+            if (ftruncate(logFd, (off_t)logEnd) != 0) {
+                cerr << "[blockchain] Failed to truncate partial record from " << logPath << ": "
+                     << strerror(errno) << endl;
+            }
+            throw;
+        }
+        logEnd += record.size();
+        unsyncedRecords++;
+        if (unsyncedRecords >= syncEvery) {
+            flushLog();
+        }
+    }
+
+    // Current size of the log file, or logEnd if it cannot be read
+    size_t logFileSize() const {
+        struct stat st;
+        if (logFd < 0 || fstat(logFd, &st) != 0) {
+            return logEnd;
+        }
+        return (size_t)st.st_size;
+    }
 
+    // Load records other processes appended past logEnd; the caller holds
+    // the write lock. A record still being written fails its length or CRC
+    // check and is picked up by a later call.
+    size_t readNewRecords() {
+        size_t fileSize = logFileSize();
+        if (fileSize <= logEnd) {
+            return 0;
+        }
+        vector<unsigned char> buffer(fileSize - logEnd);
+        size_t filled = 0;
+        while (filled < buffer.size()) {
+            ssize_t n = pread(logFd, buffer.data() + filled, buffer.size() - filled, (off_t)(logEnd + filled));
+            if (n < 0 && errno == EINTR) {
+                continue;
+            }
+            if (n <= 0) {
+                break;
+            }
+            filled += (size_t)n;
+        }
+        size_t before = chain.size();
+        logEnd += decodeRecords(buffer.data(), 0, filled);
+        validatePending();
+        return chain.size() - before;
+    }
+
+    // Verify blocks past the watermark and advance it
+    void validatePending() {
+        if (!chainValid) {
+            return;
+        }
+        size_t firstInvalid = findFirstInvalid(validatedUpTo, chain.size());
+        validatedUpTo = firstInvalid;
+        if (firstInvalid < chain.size()) {
+            chainValid = false;
+        }
+    }
+
+    // Copy the blocks at the given positions out from under the lock, with
+    // their verification flags. Called with the GIL released.
+    vector<Block> copyBlocks(const vector<size_t>& positions, vector<char>& verified) const {
+        vector<Block> blocks;
+        blocks.reserve(positions.size());
+        verified.reserve(positions.size());
+        for (size_t position : positions) {
+            if (position >= chain.size()) {
+                throw std::out_of_range("Block index out of range");
+            }
+            blocks.push_back(chain[position]);
+            verified.push_back(chainValid && position >= validatedFrom && position < validatedUpTo);
+        }
+        return blocks;
+    }
+
+    // Columnar copy of the given blocks. Block columns hold one entry per
+    // block; the tx* columns hold every transaction of those blocks back to
+    // back, transactionCount entries per block. NumPy arrays carry the
+    // numeric fields and lists the hex hashes and keys.
+    static py::dict collectBlocks(const vector<Block>& blocks, const vector<char>& verifiedFlags) {
+        size_t n = blocks.size();
+        size_t txTotal = 0;
+        for (const Block& block : blocks) {
+            txTotal += block.getTransactionCount();
+        }
+
+        py::array_t<int64_t> indexes(n);
+        py::list hashes(n);
+        py::list previousHashes(n);
+        py::list merkleRoots(n);
+        py::array_t<int64_t> timestamps(n);
+        py::array_t<int64_t> transactionCounts(n);
+        py::array_t<bool> verified(n);
+        py::array_t<double> txAmounts(txTotal);
+        py::array_t<int64_t> txTimestamps(txTotal);
+        py::list txSenderKeys(txTotal);
+        py::list txReceiverKeys(txTotal);
+
+        auto idx = indexes.mutable_unchecked<1>();
+        auto ts = timestamps.mutable_unchecked<1>();
+        auto cnt = transactionCounts.mutable_unchecked<1>();
+        auto ver = verified.mutable_unchecked<1>();
+        auto txAmt = txAmounts.mutable_unchecked<1>();
+        auto txTs = txTimestamps.mutable_unchecked<1>();
+        size_t t = 0;
+        for (size_t i = 0; i < n; ++i) {
+            const Block& block = blocks[i];
+            idx(i) = block.getIndex();
+            hashes[i] = py::str(block.getHashHex());
+            previousHashes[i] = py::str(block.getPreviousHashHex());
+            merkleRoots[i] = py::str(block.getMerkleRootHex());
+            ts(i) = (int64_t)block.getTimestamp();
+            cnt(i) = (int64_t)block.getTransactionCount();
+            ver(i) = verifiedFlags[i] != 0;
+            for (const TransactionData& data : block.getTransactionsRef()) {
+                txAmt(t) = data.amount;
+                txTs(t) = (int64_t)data.timestamp;
+                txSenderKeys[t] = py::str(data.senderKey);
+                txReceiverKeys[t] = py::str(data.receiverKey);
+                ++t;
+            }
+        }
+
+        py::dict batch;
+        batch["index"] = indexes;
+        batch["hash"] = hashes;
+        batch["previousHash"] = previousHashes;
+        batch["merkleRoot"] = merkleRoots;
+        batch["timestamp"] = timestamps;
+        batch["transactionCount"] = transactionCounts;
+        batch["verified"] = verified;
+        batch["txAmount"] = txAmounts;
+        batch["txTimestamp"] = txTimestamps;
+        batch["txSenderKey"] = txSenderKeys;
+        batch["txReceiverKey"] = txReceiverKeys;
+        return batch;
+    }
+
+    // Log a block, then append it and verify it against the validated prefix;
+    // the caller holds the write lock. A block whose record cannot be written
+    // is not added.
+    int appendBlock(Block&& block) {
+        appendToLog(block);
+        chain.push_back(std::move(block));
+        validatePending();
+        return chain.back().getIndex();
+    }
+
+    void flushLog() {
+        if (logFd >= 0 && unsyncedRecords > 0) {
+            fsync(logFd);
+            unsyncedRecords = 0;
+        }
+    }
+
+    // Fold the result of verifying [start, end) into the cached state; the
+    // caller holds the write lock
+    bool recordVerification(size_t start, size_t end, size_t firstInvalid) {
+        if (firstInvalid < end) {
+            chainValid = false;
+            if (firstInvalid < validatedUpTo) {
+                validatedUpTo = firstInvalid;
+            }
+            return false;
+        }
+        // Audits run from block 0 upwards; once they reach the verified tail
+        // the whole chain up to the watermark is verified
+        if (start <= auditedUpTo && end > auditedUpTo) {
+            auditedUpTo = end;
+        }
+        if (validatedFrom > 0 && auditedUpTo >= validatedFrom) {
+            validatedFrom = 0;
+            if (chainValid && auditedUpTo > validatedUpTo) {
+                validatedUpTo = auditedUpTo;
+                validatePending();
+            }
+        }
+        // A clean range that touches the verified range's end extends it
+        if (chainValid && start >= validatedFrom && start <= validatedUpTo && end > validatedUpTo) {
+            validatedUpTo = end;
+            validatePending();
+        }
+        return true;
+    }
+
+public:
     // Constructor
-    Blockchain() {
+    Blockchain()
+        : validatedFrom(0), validatedUpTo(0), auditedUpTo(0), chainValid(true), logFd(-1), syncEvery(1),
+          unsyncedRecords(0), logEnd(0), shared(false) {
         Block genesis = createGenesisBlock();
         chain.push_back(genesis);
+        validatePending();
+    }
+
+    // Open (or create) a chain persisted to an append-only log; records are
+    // fsynced once every syncEveryN appends and on sync()/destruction. With
+    // sharedLog, several processes may open the same log: each appends under
+    // an exclusive flock() and refresh() loads the blocks the others added.
+    Blockchain(const string& path, size_t syncEveryN = 1, bool sharedLog = false)
+        : validatedFrom(0), validatedUpTo(0), auditedUpTo(0), chainValid(true), logPath(path), logFd(-1),
+          syncEvery(syncEveryN > 0 ? syncEveryN : 1), unsyncedRecords(0), logEnd(0), shared(sharedLog) {
+        logFd = ::open(logPath.c_str(), O_RDWR | O_CREAT | O_APPEND, 0644);
+        if (logFd < 0) {
+            throw runtime_error("Failed to open block log " + logPath + ": " + strerror(errno));
+        }
+        // Recovery truncates torn tails, so it must not race another
+        // process's append
+        LogFileLock logLock(logFd, shared);
+        try {
+            loadLog();
+        } catch (...) {
+            ::close(logFd);
+            throw;
+        }
+        struct stat st;
+        if (fstat(logFd, &st) == 0 && st.st_size == 0) {
+            string header(BLOCK_LOG_MAGIC, sizeof(BLOCK_LOG_MAGIC));
+            putValue<uint32_t>(header, BLOCK_LOG_VERSION);
+            putValue<uint32_t>(header, 0);
+            writeAll(logFd, header);
+            logEnd = header.size();
+        }
+        if (chain.empty()) {
+            Block genesis = createGenesisBlock();
+            chain.push_back(genesis);
+            validatePending();
+            appendToLog(genesis);
+        }
+        flushLog();
+    }
+
+    Blockchain(const Blockchain&) = delete;
+    Blockchain& operator=(const Blockchain&) = delete;
+
+    ~Blockchain() {
+        if (logFd >= 0) {
+            flushLog();
+            ::close(logFd);
+        }
     }
 
     // Public functions
-    void addBlock(TransactionData d) {
-        int index = (int)chain.size();
-        Block newBlock(index, d, getLatestBlock()->getHash());
-        chain.push_back(newBlock);
+    int addBlock(TransactionData d) {
+        unique_lock<shared_timed_mutex> lock(chainMutex);
+        LogFileLock logLock(logFd, shared);
+        if (shared) {
+            readNewRecords();
+        }
+        return appendBlock(Block((int)chain.size(), d, chain.back().getHash()));
     }
 
-    bool isChainValid() {
-        vector<Block>::iterator it;
-        
-        for (it = chain.begin(); it != chain.end(); ++it) {
-            Block currentBlock = *it;
-            if (!currentBlock.isHashValid()) {
-                return false;
-            }
-            if (it != chain.begin()) {
-                Block previousBlock = *(it - 1);
-                if (currentBlock.getPreviousHash() != previousBlock.getHash()) {
-                    return false;
-                }
+    // Seal a batch of transactions into one block under a single Merkle
+    // root; returns the new block's index
+    int sealBlock(vector<TransactionData> transactions) {
+        time_t current;
+        time(&current);
+        unique_lock<shared_timed_mutex> lock(chainMutex);
+        LogFileLock logLock(logFd, shared);
+        if (shared) {
+            readNewRecords();
+        }
+        return appendBlock(Block((int)chain.size(), std::move(transactions), chain.back().getHash(), current));
+    }
+
+    // Flush appended records to stable storage
+    void sync() {
+        unique_lock<shared_timed_mutex> lock(chainMutex);
+        flushLog();
+    }
+
+    bool isPersistent() const {
+        return logFd >= 0;
+    }
+
+    bool isShared() const {
+        return shared;
+    }
+
+    // Load blocks appended to the log by other processes; returns how many
+    // were added. Cheap when the log has not grown.
+    size_t refresh() {
+        {
+            shared_lock<shared_timed_mutex> lock(chainMutex);
+            if (logFd < 0 || logFileSize() <= logEnd) {
+                return 0;
             }
         }
-        return true;
+        unique_lock<shared_timed_mutex> lock(chainMutex);
+        return readNewRecords();
     }
 
-    Block* getLatestBlock() {
-        return &chain.back();
+    string getLogPath() const {
+        return logPath;
+    }
+
+    // Verify blocks in [start, end) and fold the result into the cached state.
+    // Hashing runs under the read lock, so appends and reads continue meanwhile.
+    bool verifyRange(size_t start, size_t end) {
+        size_t firstInvalid;
+        {
+            shared_lock<shared_timed_mutex> lock(chainMutex);
+            if (end > chain.size()) {
+                end = chain.size();
+            }
+            firstInvalid = findFirstInvalid(start, end);
+        }
+        unique_lock<shared_timed_mutex> lock(chainMutex);
+        return recordVerification(start, end, firstInvalid);
+    }
+
+    // Full audit of every block; resets the watermark from scratch
+    bool isChainValid() {
+        size_t end, firstInvalid;
+        {
+            shared_lock<shared_timed_mutex> lock(chainMutex);
+            end = chain.size();
+            firstInvalid = findFirstInvalid(0, end);
+        }
+        unique_lock<shared_timed_mutex> lock(chainMutex);
+        validatedFrom = 0;
+        validatedUpTo = 0;
+        auditedUpTo = 0;
+        chainValid = true;
+        recordVerification(0, end, firstInvalid);
+        return chainValid;
+    }
+
+    // Cached validity of the chain, kept current by addBlock and audits
+    bool isChainValidCached() const {
+        shared_lock<shared_timed_mutex> lock(chainMutex);
+        return chainValid;
+    }
+
+    // End of the verified range of blocks
+    size_t getValidatedUpTo() const {
+        shared_lock<shared_timed_mutex> lock(chainMutex);
+        return validatedUpTo;
+    }
+
+    // Start of the verified range; blocks before it were loaded from the log
+    // without verification and are waiting for an audit
+    size_t getValidatedFrom() const {
+        shared_lock<shared_timed_mutex> lock(chainMutex);
+        return validatedFrom;
     }
     
     // Get chain size
-    size_t getChainSize() {
+    size_t getChainSize() const {
+        shared_lock<shared_timed_mutex> lock(chainMutex);
         return chain.size();
     }
     
     // Get block by index
-    Block getBlock(int index) {
-        if (index >= 0 && index < chain.size()) {
+    Block getBlock(int index) const {
+        shared_lock<shared_timed_mutex> lock(chainMutex);
+        if (index >= 0 && (size_t)index < chain.size()) {
             return chain[index];
         }
         throw std::out_of_range("Block index out of range");
     }
+
+    // Columnar copy of blocks [start, start + count), stopping at limit or the
+    // chain tip (see collectBlocks for the layout)
+    py::dict getBlocks(size_t start, size_t count, size_t limit = SIZE_MAX) const {
+        vector<Block> blocks;
+        vector<char> verified;
+        {
+            py::gil_scoped_release release;
+            shared_lock<shared_timed_mutex> lock(chainMutex);
+            size_t end = min(chain.size(), limit);
+            if (start > end) {
+                start = end;
+            }
+            if (count < end - start) {
+                end = start + count;
+            }
+            vector<size_t> positions;
+            positions.reserve(end - start);
+            for (size_t i = start; i < end; ++i) {
+                positions.push_back(i);
+            }
+            blocks = copyBlocks(positions, verified);
+        }
+        return collectBlocks(blocks, verified);
+    }
+
+    // Columnar copy of an arbitrary set of blocks, in the order given
+    py::dict getBlocksAt(const vector<size_t>& positions) const {
+        vector<Block> blocks;
+        vector<char> verified;
+        {
+            py::gil_scoped_release release;
+            shared_lock<shared_timed_mutex> lock(chainMutex);
+            blocks = copyBlocks(positions, verified);
+        }
+        return collectBlocks(blocks, verified);
+    }
+
+    // Merkle inclusion proof for one transaction of a block, with everything
+    // needed to check it against the block header
+    py::dict getMerkleProof(size_t blockIndex, size_t txIndex) const {
+        Block block = [&]() {
+            py::gil_scoped_release release;
+            return getBlock((int)min(blockIndex, (size_t)INT32_MAX));
+        }();
+        vector<MerkleProofStep> steps = block.getMerkleProof(txIndex);
+        py::list path;
+        for (const MerkleProofStep& step : steps) {
+            py::dict entry;
+            entry["hash"] = hashToHex(step.sibling);
+            entry["position"] = step.siblingOnLeft ? "left" : "right";
+            path.append(entry);
+        }
+
+        py::dict proof;
+        proof["blockIndex"] = blockIndex;
+        proof["txIndex"] = txIndex;
+        proof["leafHash"] = hashToHex(hashTransaction(block.getTransactionsRef()[txIndex]));
+        proof["merkleRoot"] = block.getMerkleRootHex();
+        proof["blockHash"] = block.getHashHex();
+        proof["path"] = path;
+        return proof;
+    }
+};
+
+// Iterates over the chain in columnar batches (see Blockchain::getBlocks),
+// up to end or the live chain tip, whichever comes first
+class BlockBatchIterator {
+private:
+    const Blockchain& chain;
+    size_t position;
+    size_t end;
+    size_t batchSize;
+
+public:
+    BlockBatchIterator(const Blockchain& bc, size_t start, size_t batch, size_t endPosition = SIZE_MAX)
+        : chain(bc), position(start), end(endPosition), batchSize(batch > 0 ? batch : 1) {}
+
+    py::dict next() {
+        if (position >= min(end, chain.getChainSize())) {
+            throw py::stop_iteration();
+        }
+        py::dict batch = chain.getBlocks(position, batchSize, end);
+        position += batchSize;
+        return batch;
+    }
+};
+
+// Read-only view of the first `size` blocks of a chain. Blocks are only ever
+// appended, so the view stays consistent while the chain keeps growing.
+class BlockchainSnapshot {
+private:
+    const Blockchain& chain;
+    size_t size;
+
+public:
+    BlockchainSnapshot(const Blockchain& bc) : chain(bc), size(bc.getChainSize()) {}
+
+    size_t getSize() const {
+        return size;
+    }
+
+    Block getBlock(long index) const {
+        if (index < 0) {
+            index += (long)size;
+        }
+        if (index < 0 || (size_t)index >= size) {
+            throw std::out_of_range("Block index out of range");
+        }
+        return chain.getBlock((int)index);
+    }
+
+    py::dict getBlocks(size_t start, size_t count) const {
+        return chain.getBlocks(start, count, size);
+    }
+
+    BlockBatchIterator iterBlocks(size_t start, size_t batchSize) const {
+        return BlockBatchIterator(chain, start, batchSize, size);
+    }
 };
 
 PYBIND11_MODULE(blockchain, m) {
@@ -155,19 +1290,71 @@ PYBIND11_MODULE(blockchain, m) {
         .def_readwrite("receiverKey", &TransactionData::receiverKey)
         .def_readwrite("timestamp", &TransactionData::timestamp);
     
+    m.def("hashTransaction", [](const TransactionData& d) { return hashToHex(hashTransaction(d)); },
+          "Merkle leaf hash of a transaction, as hex");
+
     py::class_<Block>(m, "Block")
-        .def(py::init<int, TransactionData, size_t>())
-        .def("getHash", &Block::getHash)
-        .def("getPreviousHash", &Block::getPreviousHash)
+        .def(py::init([](int idx, TransactionData d, const string& previousHash) {
+            return Block(idx, d, hexToHash(previousHash));
+        }))
+        .def(py::init([](int idx, vector<TransactionData> transactions, const string& previousHash, time_t timestamp) {
+            return Block(idx, std::move(transactions), hexToHash(previousHash), timestamp);
+        }))
+        .def("getHash", &Block::getHashHex)
+        .def("getPreviousHash", &Block::getPreviousHashHex)
+        .def("getMerkleRoot", &Block::getMerkleRootHex)
         .def("getData", &Block::getData)
+        .def("getTransactions", &Block::getTransactions)
+        .def("getTransactionCount", &Block::getTransactionCount)
+        .def("getTimestamp", &Block::getTimestamp)
         .def("isHashValid", &Block::isHashValid)
         .def("getIndex", &Block::getIndex);
     
+    py::class_<BlockBatchIterator>(m, "BlockBatchIterator")
+        .def("__iter__", [](BlockBatchIterator& it) -> BlockBatchIterator& { return it; })
+        .def("__next__", &BlockBatchIterator::next);
+
+    py::class_<BlockchainSnapshot>(m, "BlockchainSnapshot")
+        .def("__len__", &BlockchainSnapshot::getSize)
+        .def("__getitem__", &BlockchainSnapshot::getBlock, py::call_guard<py::gil_scoped_release>())
+        .def("getChainSize", &BlockchainSnapshot::getSize)
+        .def("getBlock", &BlockchainSnapshot::getBlock, py::call_guard<py::gil_scoped_release>())
+        .def("getBlocks", &BlockchainSnapshot::getBlocks, py::arg("start"), py::arg("count"))
+        .def("iterBlocks", &BlockchainSnapshot::iterBlocks,
+             py::arg("start") = 0, py::arg("batch_size") = 1000, py::keep_alive<0, 1>());
+
+    // Everything that hashes, waits on the chain lock or touches the log runs
+    // with the GIL released; argument and result conversion still holds it
     py::class_<Blockchain>(m, "Blockchain")
         .def(py::init<>())
-        .def("addBlock", &Blockchain::addBlock)
-        .def("isChainValid", &Blockchain::isChainValid)
-        .def("getChainSize", &Blockchain::getChainSize)
-        .def("getBlock", &Blockchain::getBlock)
-        .def_readwrite("chain", &Blockchain::chain);
-}
\ No newline at end of file
+        .def(py::init<const string&, size_t, bool>(), py::arg("log_path"), py::arg("sync_every") = 1,
+             py::arg("shared") = false, py::call_guard<py::gil_scoped_release>())
+        .def("addBlock", &Blockchain::addBlock, py::call_guard<py::gil_scoped_release>())
+        .def("sealBlock", &Blockchain::sealBlock, py::arg("transactions"), py::call_guard<py::gil_scoped_release>())
+        .def("sync", &Blockchain::sync, py::call_guard<py::gil_scoped_release>())
+        .def("isPersistent", &Blockchain::isPersistent)
+        .def("isShared", &Blockchain::isShared)
+        .def("refresh", &Blockchain::refresh, py::call_guard<py::gil_scoped_release>())
+        .def("getLogPath", &Blockchain::getLogPath)
+        .def("isChainValid", &Blockchain::isChainValid, py::call_guard<py::gil_scoped_release>())
+        .def("isChainValidCached", &Blockchain::isChainValidCached, py::call_guard<py::gil_scoped_release>())
+        .def("verifyRange", &Blockchain::verifyRange, py::call_guard<py::gil_scoped_release>())
+        .def("getValidatedUpTo", &Blockchain::getValidatedUpTo, py::call_guard<py::gil_scoped_release>())
+        .def("getValidatedFrom", &Blockchain::getValidatedFrom, py::call_guard<py::gil_scoped_release>())
+        .def("getChainSize", &Blockchain::getChainSize, py::call_guard<py::gil_scoped_release>())
+        .def("getBlock", &Blockchain::getBlock, py::call_guard<py::gil_scoped_release>())
+        .def("getBlocks", [](const Blockchain& bc, size_t start, size_t count) {
+            return bc.getBlocks(start, count);
+        }, py::arg("start"), py::arg("count"))
+        .def("getBlocksAt", &Blockchain::getBlocksAt, py::arg("indexes"))
+        .def("getMerkleProof", &Blockchain::getMerkleProof, py::arg("block_index"), py::arg("tx_index"))
+        .def("iterBlocks", [](const Blockchain& bc, size_t start, size_t batchSize) {
+            return BlockBatchIterator(bc, start, batchSize);
+        }, py::arg("start") = 0, py::arg("batch_size") = 1000, py::keep_alive<0, 1>())
+        .def("snapshot", [](const Blockchain& bc) {
+            return BlockchainSnapshot(bc);
+        }, py::keep_alive<0, 1>(), "Read-only view of the blocks present at the time of the call")
+        .def_property_readonly("chain", py::cpp_function([](const Blockchain& bc) {
+            return BlockchainSnapshot(bc);
+        }, py::keep_alive<0, 1>()));
+}
@@ -0,0 +1,11 @@
+import os
+
+# Run api.py against in-memory stores so importing it leaves no files behind
+for name in ("BLOCKCHAIN_LOG_PATH", "CONTRACTS_DB_PATH", "USERS_DB_PATH", "LIGHTRAG_LEDGER_PATH", "ANALYSIS_JOBS_DB_PATH"):
+    os.environ.setdefault(name, "")
+os.environ.setdefault("BLOCKCHAIN_AUDIT_INTERVAL", "0")
+
+# These scripts exercise a running server and are run directly, not by pytest
+collect_ignore = ["test_api.py", "test_blockchain_integration.py"]
+# LightRAG has its own dependencies and tests; run them from LightRAG/
+collect_ignore_glob = ["LightRAG/*"]
@@ -99,14 +99,37 @@ export interface PendingContract {
   uploader: string;
   company_signatures: { [key: string]: string[] }; // {"company_name": ["user1", "user2"]}
   created_at: string;
-  status: string; // "pending", "completed", "cancelled"
+  status: string; // "pending", "sealing", "completed", "cancelled"
   blockchain_index?: number;
+  blockchain_tx_index?: number;
+}
+
+export interface BlockTransaction {
+  tx_index: number;
+  data: {
+    amount: number;
+    senderKey: string;
+    receiverKey: string;
+    timestamp: number;
+    timestamp_readable?: string;
+  };
+  contract_info?: {
+    contract_id?: string;
+    uploader_company?: string;
+    type?: string;
+    partner_company?: string;
+    company?: string;
+  };
 }
 
 export interface Block {
   index: number;
   hash: string;
   previousHash: string;
+  merkleRoot?: string;
+  timestamp?: number;
+  transaction_count?: number;
+  transactions?: BlockTransaction[];
   data: {
     amount: number;
     senderKey: string;
@@ -126,7 +149,9 @@ export interface Block {
 
 export interface BlockchainContract {
   block_index: number;
+  tx_index?: number;
   hash: string;
+  merkleRoot?: string;
   data: {
     amount: number;
     senderKey: string;
@@ -224,6 +249,7 @@ export interface WordAnalysisRequest {
   contract_id: string;
   analysis_type: 'sensitive_word_detection';
   use_lightrag?: boolean;
+  force_lightrag?: boolean;
   lightrag_api_url?: string;
 }
 
@@ -238,6 +264,18 @@ export interface WordAnalysisResult {
   recommendations: string[];
   analysis_details: string;
   analysis_timestamp: string;
+  sensitive_words?: SensitiveWordMatch[];
+}
+
+export interface SensitiveWordMatch {
+  term: string;
+  category: string;
+  label: string;
+  start: number;
+  end: number;
+  canonical?: string;
+  fuzzy?: boolean;
+  weight?: number;
 }
 
 export interface WordAnalysisResponse {
@@ -332,14 +370,22 @@ export const blockchainAPI = {
     return response.data;
   },
 
-  exploreBlockchain: async (): Promise<{
+  exploreBlockchain: async (cursor?: number | null, limit: number = 50): Promise<{
     message: string;
     chain_size: number;
     is_valid: boolean;
     blocks: Block[];
+    cursor: number;
+    limit: number;
+    next_cursor: number | null;
+    has_more: boolean;
     using: string;
   }> => {
-    const response = await api.get('/api/blockchain/explore');
+    const params: { limit: number; cursor?: number } = { limit };
+    if (cursor !== undefined && cursor !== null) {
+      params.cursor = cursor;
+    }
+    const response = await api.get('/api/blockchain/explore', { params });
     return response.data;
   },
 
@@ -46,6 +46,9 @@ export function BlockchainExplorerPage() {
   const [userContracts, setUserContracts] = useState<BlockchainContract[]>([]);
   const [blockchainInfo, setBlockchainInfo] = useState<any>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
+  const [chainSize, setChainSize] = useState(0);
   const [isExporting, setIsExporting] = useState(false);
   const [error, setError] = useState('');
   const [searchTerm, setSearchTerm] = useState('');
@@ -69,6 +72,8 @@ export function BlockchainExplorerPage() {
 
       if (explorerResponse.status === 'fulfilled') {
         setBlocks(explorerResponse.value.blocks || []);
+        setNextCursor(explorerResponse.value.next_cursor);
+        setChainSize(explorerResponse.value.chain_size);
       }
 
       if (contractsResponse.status === 'fulfilled') {
@@ -87,25 +92,29 @@ export function BlockchainExplorerPage() {
     }
   };
 
+  const loadMoreBlocks = async () => {
+    if (nextCursor === null) {
+      return;
+    }
+    try {
+      setIsLoadingMore(true);
+      const response = await blockchainAPI.exploreBlockchain(nextCursor);
+      setBlocks(prev => [...prev, ...(response.blocks || [])]);
+      setNextCursor(response.next_cursor);
+    } catch (err) {
+      console.error('Failed to load more blocks:', err);
+      setError('Failed to load more blocks');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const exportBlockchainData = async (includeUserContracts: boolean = true) => {
     try {
       setIsExporting(true);
 
-      const exportData: BlockchainExportData = {
-        exported_at: new Date().toISOString(),
-        blockchain_info: blockchainInfo || { chain_size: 0, is_valid: false, using: 'unknown' },
-        blocks: blocks,
-        export_metadata: {
-          user: user?.user_id || 'unknown',
-          company: user?.company || 'unknown',
-          total_blocks: blocks.length,
-          total_contracts: userContracts.length
-        }
-      };
-
-      if (includeUserContracts) {
-        exportData.user_contracts = userContracts;
-      }
+      // The explorer only holds the pages loaded so far, so export from the server
+      const exportData: BlockchainExportData = await blockchainAPI.exportBlockchainData(includeUserContracts);
 
       const blob = new Blob([JSON.stringify(exportData, null, 2)], {
         type: 'application/json'
@@ -255,7 +264,7 @@ export function BlockchainExplorerPage() {
             </div>
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold">{blocks.length}</div>
+            <div className="text-2xl font-bold">{chainSize}</div>
             <p className="text-xs text-gray-600">
               {blockchainInfo?.is_valid ? '✓ Valid chain' : '✗ Invalid chain'}
             </p>
@@ -345,7 +354,7 @@ export function BlockchainExplorerPage() {
           </div>
 
           <div className="mt-4 text-sm text-gray-600">
-            Showing {filteredBlocks.length} of {blocks.length} blocks
+            Showing {filteredBlocks.length} of {chainSize} blocks
           </div>
         </CardContent>
       </Card>
@@ -462,6 +471,18 @@ export function BlockchainExplorerPage() {
                             <span className="text-gray-500">Current Hash:</span>
                             <span className="ml-2 font-mono text-xs">{block.hash}</span>
                           </div>
+                          {block.merkleRoot && (
+                            <div>
+                              <span className="text-gray-500">Merkle Root:</span>
+                              <span className="ml-2 font-mono text-xs">{block.merkleRoot}</span>
+                            </div>
+                          )}
+                          {block.transaction_count !== undefined && block.transaction_count > 1 && (
+                            <div>
+                              <span className="text-gray-500">Transactions:</span>
+                              <span className="ml-2 font-medium">{block.transaction_count}</span>
+                            </div>
+                          )}
                           <div>
                             <span className="text-gray-500">Sender Key:</span>
                             <span className="ml-2 font-mono text-xs">{block.data.senderKey}</span>
@@ -500,6 +521,14 @@ export function BlockchainExplorerPage() {
         </div>
       )}
 
+      {nextCursor !== null && (
+        <div className="mt-6 text-center">
+          <Button variant="outline" onClick={loadMoreBlocks} disabled={isLoadingMore}>
+            {isLoadingMore ? 'Loading...' : 'Load more blocks'}
+          </Button>
+        </div>
+      )}
+
       {/* Export Options */}
       <Card className="mt-8">
         <CardHeader>
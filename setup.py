@@ -17,7 +17,8 @@ ext_modules = [
         sources=["blockchain.cpp"],
         include_dirs=include_dirs,
         language='c++',
-        extra_compile_args=['-std=c++14', '-fPIC'],
+        extra_compile_args=['-std=c++14', '-fPIC', '-pthread'],
+        extra_link_args=['-pthread'],
     ),
 ]
 
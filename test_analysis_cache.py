@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+import api
+from api import AnalysisResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(api.time, "time", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = AnalysisResultCache(ttl=60, max_entries=10)
+    cache.put("key", "answer")
+    clock[0] += 59
+    assert cache.get("key") == "answer"
+    clock[0] += 2
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnalysisResultCache(ttl=60, max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.evictions == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = AnalysisResultCache(ttl=60, max_entries=10)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["answer"] * 5
+    assert calls == 1
+    assert (cache.misses, cache.coalesced) == (1, 4)
+    assert asyncio.run(cache.get_or_compute("key", compute)) == "answer"
+    assert (calls, cache.hits) == (1, 1)
+
+
+def test_failed_load_is_not_cached():
+    cache = AnalysisResultCache(ttl=60, max_entries=10)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("LightRAG unavailable")
+
+    async def run():
+        leader = asyncio.ensure_future(cache.get_or_compute("key", fail))
+        await asyncio.sleep(0)
+        waiter = await cache.get_or_compute("key", fail)
+        with pytest.raises(RuntimeError):
+            await leader
+        return waiter
+
+    # Waiters see the failure as a miss
+    assert asyncio.run(run()) is None
+    assert cache.get("key") is None
+    assert not cache.inflight
+
+
+def test_persistent_entries_survive_restart(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    AnalysisResultCache(ttl=60, max_entries=10, path=path).put("key", "answer")
+    assert AnalysisResultCache(ttl=60, max_entries=10, path=path).get("key") == "answer"
+    clock[0] += 61
+    assert AnalysisResultCache(ttl=60, max_entries=10, path=path).get("key") is None
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import api
+from api import AnalysisJobQueue
+
+
+@pytest.fixture(autouse=True)
+def users(monkeypatch):
+    monkeypatch.setattr(api, "users_db", {"alice": {"user_id": "alice"}, "bob": {"user_id": "bob"}})
+
+
+async def wait_until_finished(queue, job_ids):
+    for job_id in job_ids:
+        while (status := queue.lookup(job_id)["status"]) not in api.ANALYSIS_JOB_FINISHED_STATUSES:
+            await queue.wait_for_change(job_id, status, 1)
+
+
+def test_full_queue_rejects_with_429():
+    async def run():
+        queue = AnalysisJobQueue(workers=0, limit=2, result_ttl=60)
+        queue.start()
+        queue.submit("word_analysis", {}, "alice", 5)
+        queue.submit("word_analysis", {}, "alice", 5)
+        with pytest.raises(HTTPException) as rejected:
+            queue.submit("word_analysis", {}, "alice", 5)
+        await queue.stop()
+        return rejected.value, queue.stats()
+
+    error, stats = asyncio.run(run())
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == str(api.ANALYSIS_JOB_RETRY_AFTER)
+    assert (stats["queued"], stats["rejected"]) == (2, 1)
+
+
+def test_jobs_run_by_priority_then_submission_order():
+    order = []
+
+    async def handler(params, user):
+        order.append(params["name"])
+        return {"name": params["name"]}
+
+    async def run():
+        queue = AnalysisJobQueue(workers=1, limit=10, result_ttl=60)
+        queue.register("word_analysis", handler)
+        # Queue everything before the worker starts so priorities decide the order
+        queue.queue = asyncio.PriorityQueue()
+        jobs = [
+            queue.submit("word_analysis", {"name": name}, "alice", priority)
+            for name, priority in (("low", 9), ("first", 1), ("second", 1), ("middle", 5))
+        ]
+        queue.tasks = [asyncio.create_task(queue.worker())]
+        await wait_until_finished(queue, [job["job_id"] for job in jobs])
+        await queue.stop()
+
+    asyncio.run(run())
+    assert order == ["first", "second", "middle", "low"]
+
+
+def test_failures_are_reported_on_the_job():
+    async def handler(params, user):
+        raise HTTPException(status_code=503, detail="LightRAG unavailable")
+
+    async def run():
+        queue = AnalysisJobQueue(workers=1, limit=10, result_ttl=60)
+        queue.register("word_analysis", handler)
+        queue.start()
+        job = queue.submit("word_analysis", {}, "alice", 5)
+        await wait_until_finished(queue, [job["job_id"]])
+        await queue.stop()
+        return queue.get(job["job_id"], "alice")
+
+    job = asyncio.run(run())
+    assert job["status"] == "failed"
+    assert job["error"] == {"status_code": 503, "detail": "LightRAG unavailable"}
+
+
+def test_store_lets_other_workers_report_jobs(tmp_path):
+    path = str(tmp_path / "jobs.db")
+
+    async def handler(params, user):
+        return {"owner": user["user_id"]}
+
+    async def run():
+        queue = AnalysisJobQueue(workers=1, limit=10, result_ttl=60, store_path=path)
+        queue.register("word_analysis", handler)
+        queue.start()
+        job = queue.submit("word_analysis", {}, "alice", 5)
+        await wait_until_finished(queue, [job["job_id"]])
+        await queue.stop()
+        return job["job_id"]
+
+    job_id = asyncio.run(run())
+    other_worker = AnalysisJobQueue(workers=0, limit=10, result_ttl=60, store_path=path)
+    job = other_worker.get(job_id, "alice")
+    assert job["status"] == "completed"
+    assert job["result"] == {"owner": "alice"}
+    with pytest.raises(HTTPException) as not_found:
+        other_worker.get(job_id, "bob")
+    assert not_found.value.status_code == 404
+
+
+def test_expired_results_are_purged(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(api.time, "time", lambda: now[0])
+    path = str(tmp_path / "jobs.db")
+
+    async def handler(params, user):
+        return {}
+
+    async def run():
+        queue = AnalysisJobQueue(workers=1, limit=10, result_ttl=60, store_path=path)
+        queue.register("word_analysis", handler)
+        queue.start()
+        job = queue.submit("word_analysis", {}, "alice", 5)
+        await wait_until_finished(queue, [job["job_id"]])
+        now[0] += 61
+        queue.purge()
+        await queue.stop()
+        return queue, job["job_id"]
+
+    queue, job_id = asyncio.run(run())
+    assert queue.lookup(job_id) is None
+    assert AnalysisJobQueue(workers=0, limit=10, result_ttl=60, store_path=path).lookup(job_id) is None
+
+
+def test_stream_sees_a_job_that_finished_between_reads(monkeypatch):
+    class ConnectedRequest:
+        async def is_disconnected(self):
+            return False
+
+    async def run():
+        queue = AnalysisJobQueue(workers=0, limit=10, result_ttl=60)
+        monkeypatch.setattr(api, "analysis_jobs", queue)
+        queue.start()
+        job = queue.submit("word_analysis", {}, "alice", 5)
+        response = await api.stream_analysis_job(job["job_id"], ConnectedRequest(), {"user_id": "alice"})
+        events = response.body_iterator
+        first = await events.__anext__()
+
+        # The job runs and finishes while the stream is suspended at its yield
+        queue.update(job["job_id"], status="running")
+        queue.update(job["job_id"], status="completed", result={})
+        second = await asyncio.wait_for(events.__anext__(), 1)
+        await events.aclose()
+        await queue.stop()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.startswith("event: status") and '"queued"' in first
+    assert second.startswith("event: result") and '"completed"' in second
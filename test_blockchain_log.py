@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import resource
+import signal
+import struct
+import zlib
+
+import blockchain
+
+
+def make_transaction(sender, amount=1.0):
+    transaction = blockchain.TransactionData()
+    transaction.amount = amount
+    transaction.senderKey = sender
+    transaction.receiverKey = "RECEIVER"
+    transaction.timestamp = 0
+    return transaction
+
+
+def senders(chain):
+    return [chain.getBlock(i).getTransactions()[0].senderKey for i in range(1, chain.getChainSize())]
+
+
+def test_blocks_are_reloaded_from_the_log(tmp_path):
+    path = str(tmp_path / "blocks.log")
+    chain = blockchain.Blockchain(path)
+    for sender in ("A", "B", "C"):
+        chain.addBlock(make_transaction(sender))
+    chain.sealBlock([make_transaction("D"), make_transaction("E")])
+    tip = chain.getBlock(4).getHash()
+    del chain
+
+    reopened = blockchain.Blockchain(path)
+    assert reopened.getChainSize() == 5
+    assert reopened.getBlock(4).getHash() == tip
+    assert reopened.getBlock(4).getTransactionCount() == 2
+    assert reopened.isChainValid()
+
+
+def test_torn_tail_is_truncated_on_reload(tmp_path):
+    path = str(tmp_path / "blocks.log")
+    chain = blockchain.Blockchain(path)
+    chain.addBlock(make_transaction("A"))
+    del chain
+    good_size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00partial record")
+
+    reopened = blockchain.Blockchain(path)
+    assert reopened.getChainSize() == 2
+    assert os.path.getsize(path) == good_size
+    assert reopened.addBlock(make_transaction("B")) == 2
+    del reopened
+    assert senders(blockchain.Blockchain(path)) == ["A", "B"]
+
+
+def append_past_file_size_limit(path, results):
+    chain = blockchain.Blockchain(path)
+    size = os.path.getsize(path)
+    # Writes past the limit fail with EFBIG, like a full disk
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (size + 50, resource.RLIM_INFINITY))
+    try:
+        chain.addBlock(make_transaction("X" * 200))
+        results.put("appended")
+    except RuntimeError:
+        results.put((chain.getChainSize(), os.path.getsize(path) == size))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (resource.RLIM_INFINITY, resource.RLIM_INFINITY))
+    results.put(chain.addBlock(make_transaction("A")))
+
+
+def test_failed_write_leaves_no_block_behind(tmp_path):
+    path = str(tmp_path / "blocks.log")
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=append_past_file_size_limit, args=(path, results))
+    process.start()
+    process.join(30)
+
+    # The block is not added and its partial record is truncated away
+    assert results.get(timeout=1) == (1, True)
+    assert results.get(timeout=1) == 1
+    assert senders(blockchain.Blockchain(path)) == ["A"]
+
+
+def test_shared_writers_replace_a_torn_record(tmp_path):
+    path = str(tmp_path / "blocks.log")
+    first = blockchain.Blockchain(path, 1, True)
+    second = blockchain.Blockchain(path, 1, True)
+    assert first.addBlock(make_transaction("A")) == 1
+    # A writer died partway through its record
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00partial record")
+
+    assert second.addBlock(make_transaction("B")) == 2
+    assert first.addBlock(make_transaction("C")) == 3
+    assert second.refresh() == 1
+    assert senders(first) == senders(second) == ["A", "B", "C"]
+    del first, second
+
+    reopened = blockchain.Blockchain(path, 1, True)
+    assert senders(reopened) == ["A", "B", "C"]
+    assert reopened.isChainValid()
+
+
+def test_refresh_loads_blocks_from_other_writers(tmp_path):
+    path = str(tmp_path / "blocks.log")
+    writer = blockchain.Blockchain(path, 1, True)
+    reader = blockchain.Blockchain(path, 1, True)
+    writer.addBlock(make_transaction("A"))
+    writer.sealBlock([make_transaction("B"), make_transaction("C")])
+
+    assert reader.refresh() == 2
+    assert reader.refresh() == 0
+    assert reader.getBlock(2).getHash() == writer.getBlock(2).getHash()
+
+
+def test_reopened_prefix_is_unverified_until_audited(tmp_path):
+    path = str(tmp_path / "blocks.log")
+    chain = blockchain.Blockchain(path, 100)
+    for i in range(1200):
+        chain.addBlock(make_transaction(f"S{i}"))
+    del chain
+
+    # Rewrite an early block's amount and fix up its CRC
+    with open(path, "r+b") as f:
+        data = bytearray(f.read())
+        offset = 16
+        for _ in range(150):
+            offset += 8 + struct.unpack_from("<I", data, offset)[0]
+        length = struct.unpack_from("<I", data, offset)[0]
+        payload_start = offset + 8
+        struct.pack_into("<d", data, payload_start + 112, 1000000.0)
+        struct.pack_into("<I", data, offset + 4, zlib.crc32(data[payload_start:payload_start + length]))
+        f.seek(0)
+        f.write(data)
+
+    reopened = blockchain.Blockchain(path)
+    assert reopened.getChainSize() == 1201
+    assert reopened.getValidatedFrom() == 1201 - 1024
+    assert reopened.getValidatedUpTo() == 1201
+    batch = reopened.getBlocks(0, 1201)
+    assert not batch["verified"][:177].any()
+    assert batch["verified"][177:].all()
+
+    assert reopened.verifyRange(0, 100)
+    assert reopened.getValidatedFrom() == 177
+    assert not reopened.verifyRange(100, 177)
+    assert not reopened.isChainValidCached()
+
+
+def test_audit_of_the_prefix_verifies_the_whole_chain(tmp_path):
+    path = str(tmp_path / "blocks.log")
+    chain = blockchain.Blockchain(path, 100)
+    for i in range(1100):
+        chain.addBlock(make_transaction(f"S{i}"))
+    del chain
+
+    reopened = blockchain.Blockchain(path)
+    assert reopened.getValidatedFrom() == 77
+    assert reopened.verifyRange(0, 50)
+    assert reopened.verifyRange(50, 77)
+    assert (reopened.getValidatedFrom(), reopened.getValidatedUpTo()) == (0, 1101)
+    assert reopened.getBlocks(0, 1101)["verified"].all()
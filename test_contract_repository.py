@@ -0,0 +1,127 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from api import ContractConflictError, ContractRepository
+
+
+def make_contract(contract_id, status="pending", company="ABC Corporation"):
+    return {
+        "contract_id": contract_id,
+        "contract_title": f"Contract {contract_id}",
+        "uploader": "alice001",
+        "uploader_company": company,
+        "other_company": "XYZ Corporation",
+        "status": status,
+        "created_at": "2024-01-01T00:00:00",
+    }
+
+
+def test_indexes_follow_status_changes():
+    repository = ContractRepository("")
+    for number in range(1, 4):
+        repository.save(make_contract(f"CONT_{number:06d}"))
+
+    contract = repository["CONT_000002"]
+    contract["status"] = "completed"
+    repository["CONT_000002"] = contract
+
+    pending = repository.for_company("XYZ Corporation", "pending")
+    assert [c["contract_id"] for c in pending] == ["CONT_000001", "CONT_000003"]
+    assert [c["contract_id"] for c in repository.for_company("ABC Corporation", "completed")] == ["CONT_000002"]
+    assert [c["contract_id"] for c in repository.for_company("ABC Corporation", after="CONT_000001", limit=1)] == ["CONT_000002"]
+
+
+def test_concurrent_save_raises_conflict(tmp_path):
+    path = str(tmp_path / "contracts.db")
+    first = ContractRepository(path)
+    first.save(make_contract("CONT_000001"))
+    second = ContractRepository(path)
+
+    contract = second["CONT_000001"]
+    contract["status"] = "completed"
+    second["CONT_000001"] = contract
+
+    stale = first["CONT_000001"]
+    stale["status"] = "rejected"
+    with pytest.raises(ContractConflictError):
+        first["CONT_000001"] = stale
+
+    # The losing side is refreshed with the winning write and can retry on it
+    assert first.conflicts == 1
+    assert first["CONT_000001"]["status"] == "completed"
+    assert first.for_company("ABC Corporation", "completed")[0]["contract_id"] == "CONT_000001"
+
+
+def test_refresh_loads_rows_written_elsewhere(tmp_path):
+    path = str(tmp_path / "contracts.db")
+    reader = ContractRepository(path)
+    writer = ContractRepository(path)
+    writer.save(make_contract("CONT_000001"))
+    writer.save(make_contract("CONT_000002"))
+
+    assert reader.refresh() == 2
+    assert reader.refresh() == 0
+    assert len(reader) == 2
+
+
+def test_contract_numbers_are_unique_across_repositories(tmp_path):
+    path = str(tmp_path / "contracts.db")
+    first = ContractRepository(path)
+    first.save(make_contract("CONT_000041"))
+    second = ContractRepository(path)
+
+    numbers = [first.next_contract_number(), second.next_contract_number(), first.next_contract_number()]
+    assert numbers == [42, 43, 44]
+
+
+def test_conflicting_sign_returns_409():
+    with TestClient(api.app, base_url="http://localhost") as client:
+        response = client.post("/auth/login", json={"user_id": "alice001", "user_password": "password123"})
+        headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        response = client.post("/api/contract/upload", headers=headers, json={
+            "contract_title": "Conflict test",
+            "contract_content": "Contract body",
+            "contract_amount": 10.0,
+            "contract_type": "cross-company",
+            "other_company": "XYZ Corporation",
+            "uploader": "alice001",
+            "timestamp": "0",
+        })
+        contract_id = response.json()["contract_id"]
+
+        # Another worker saves the contract after this one loaded it
+        with api.contracts_db.lock:
+            api.contracts_db.connection.execute(
+                "UPDATE contracts SET version = version + 1000 WHERE contract_id = ?", (contract_id,)
+            )
+            api.contracts_db.connection.commit()
+
+        response = client.post(f"/api/contract/sign/{contract_id}", headers=headers)
+        assert response.status_code == 409
+        # Reloaded after the conflict, so a retry goes through
+        response = client.post(f"/api/contract/sign/{contract_id}", headers=headers)
+        assert response.status_code == 200, response.text
+
+
+def test_contracts_left_mid_seal_are_settled_for_every_worker(tmp_path):
+    path = str(tmp_path / "contracts.db")
+    crashed = ContractRepository(path)
+    crashed.save(make_contract("CONT_000001", status="sealing"))
+    crashed.save(make_contract("CONT_000002", status="sealing"))
+    crashed.save(make_contract("CONT_000003", status="pending"))
+    other_worker = ContractRepository(path)
+
+    # Only the first contract's transaction reached the chain before the crash
+    on_chain = {"CONT_000001": (7, 2)}
+    restarted = ContractRepository(path)
+    assert restarted.recover_sealing(on_chain.get) == 2
+    assert restarted.recover_sealing(on_chain.get) == 0
+
+    other_worker.refresh()
+    for repository in (restarted, other_worker, ContractRepository(path)):
+        sealed = repository["CONT_000001"]
+        assert sealed["status"] == "completed"
+        assert (sealed["blockchain_index"], sealed["blockchain_tx_index"]) == (7, 2)
+        assert repository["CONT_000002"]["status"] == "pending"
+        assert not repository.for_company("ABC Corporation", "sealing")
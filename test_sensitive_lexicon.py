@@ -0,0 +1,53 @@
+import pytest
+
+from api import DEFAULT_SENSITIVE_LEXICON, WORD_PRESCREEN_THRESHOLD, SensitiveLexicon
+
+
+@pytest.fixture(scope="module")
+def lexicon():
+    return SensitiveLexicon(DEFAULT_SENSITIVE_LEXICON)
+
+
+def labels(lexicon, text):
+    return [(match["canonical"], match["fuzzy"]) for match in lexicon.match(text)]
+
+
+def test_exact_terms_and_phrases(lexicon):
+    matches = lexicon.match("A kickback was paid through a Shell Company, off-the-books.")
+    assert [match["canonical"] for match in matches] == ["kickback", "shell company", "off the books"]
+    assert [match["term"] for match in matches] == ["kickback", "Shell Company", "off-the-books"]
+    assert not any(match["fuzzy"] for match in matches)
+
+
+def test_plurals_and_verb_forms_share_one_stem(lexicon):
+    assert SensitiveLexicon.normalize("nominees") == SensitiveLexicon.normalize("nominee")
+    assert SensitiveLexicon.normalize("bribing") == SensitiveLexicon.normalize("bribes") == SensitiveLexicon.normalize("bribe")
+    assert labels(lexicon, "Two nominees bribed officials; payoffs and kickbacks followed") == [
+        ("nominee", False), ("bribe", False), ("payoff", False), ("kickback", False),
+    ]
+
+
+def test_misspellings_match_as_fuzzy(lexicon):
+    assert labels(lexicon, "a kickbak and a smal offshorre shel company") == [
+        ("kickback", True), ("offshore", True), ("shell company", True),
+    ]
+    assert labels(lexicon, "Pay-off and k1ckback") == [("payoff", False), ("kickback", False)]
+
+
+def test_fuzzy_matches_cannot_escalate_alone(lexicon):
+    prescreen = lexicon.prescreen("kickbak payof kikback")
+    assert all(match["fuzzy"] for match in prescreen["matches"])
+    assert prescreen["score"] >= WORD_PRESCREEN_THRESHOLD
+    assert not prescreen["escalate"]
+    assert lexicon.prescreen("a kickback")["escalate"]
+
+
+@pytest.mark.parametrize("text", [
+    "layoff",
+    "Layoffs were announced",
+    "the shall company deliver",
+    "pay off the balance",
+    "the shelf and the shells",
+])
+def test_ordinary_words_do_not_match(lexicon, text):
+    assert lexicon.match(text) == []